@@ -1,10 +1,11 @@
 from django.contrib import admin
-from backbase_app.models import CurrencyExchangeRate, Currency, ProviderExchange
+from backbase_app.models import BackfillJob, CurrencyExchangeRate, Currency, LatestRate, ProviderExchange
 from django.contrib import admin
 from django.shortcuts import render
 from django.contrib import messages
 from django.urls import path
 from backbase_app.forms import CurrencyConverterForm
+from backbase_app.api.circuit_breaker import circuit_breakers
 
 class CurrencyAdmin(admin.ModelAdmin):
     list_display = ('code', 'name', 'symbol') 
@@ -13,11 +14,39 @@ class CurrencyAdmin(admin.ModelAdmin):
     ordering = ('code',)
 
 class ProviderExchangeAdmin(admin.ModelAdmin):
-    list_display = ('id_name', 'name', 'priority', 'activated') 
+    list_display = ('id_name', 'name', 'priority', 'activated', 'timeout', 'hedge_delay', 'breaker_state', 'health_score') 
     list_filter = ('name',) 
     search_fields = ('name', 'priority',) 
     ordering = ('-priority',) 
 
+    @admin.display(description="Circuit breaker")
+    def breaker_state(self, obj):
+        return circuit_breakers.get(obj.id_name).stats()["state"]
+
+    @admin.display(description="Health")
+    def health_score(self, obj):
+        return circuit_breakers.get(obj.id_name).stats()["health_score"]
+
+class BackfillJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'base', 'start_date', 'end_date', 'status', 'rows', 'rows_per_second', 'chunks_left', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+
+    @admin.display(description="Chunks left")
+    def chunks_left(self, obj):
+        return obj.chunks.exclude(status=BackfillJob.DONE).count()
+
+class LatestRateAdmin(admin.ModelAdmin):
+    list_display = ('source_currency', 'exchanged_currency', 'valuation_date', 'rate_value', 'updated_at')
+    list_filter = ('source_currency',)
+    ordering = ('source_currency', 'exchanged_currency')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 class CurrencyConverterAdmin(admin.ModelAdmin):
     list_display = ('id', 'source_currency', 'exchanged_currency', 'valuation_date', 'rate_value') 
     list_filter = ('valuation_date',) 
@@ -41,11 +70,11 @@ class CurrencyConverterAdmin(admin.ModelAdmin):
             if form.is_valid():
                 base_currency = form.cleaned_data["base_currency"]
                 target_currencies = form.cleaned_data["target_currencies"]
-                amount = float(form.cleaned_data["amount"])
+                amount = form.cleaned_data["amount"]
 
                 target_currencies_list = list(target_currencies.values_list("symbol", flat=True))
 
-                from backbase_app.api.generic_api import GenericAPI
+                from backbase_app.api.generic_api import get_generic_api
                 from backbase_app.api.providers_api import run_asyncio_task
 
                 data_return = {
@@ -55,21 +84,15 @@ class CurrencyConverterAdmin(admin.ModelAdmin):
                     "conversions" : {}
                 }
 
-                conversions_data = {}
-
-                for target_symbol in target_currencies_list:
-                    params = {
-                        "currency_base" : base_currency.symbol,
-                        "currency_to_convert" : target_symbol,
-                        "amount" : amount
-                    }
+                data = run_asyncio_task(get_generic_api().get_convert_amount_batch, base_currency.symbol, target_currencies_list, [amount])
+                conversions_data = {
+                    target_symbol: conversion["values"][0]
+                    for target_symbol, conversion in data["conversions"].items()
+                    if conversion["values"] is not None
+                }
 
-                    generic_api = GenericAPI()
-                    data = run_asyncio_task(generic_api.get_convert_amount, base_currency.symbol, target_symbol, amount)
-                    conversions_data[params["currency_to_convert"]] = round(float(data["value"]),6)
-                    
                 data_return["conversions"] = conversions_data
-                if data_return:
+                if conversions_data:
                     context.update(data_return)
                 else:
                     messages.error(request, "Exchange rates could not be obtained.")
@@ -79,3 +102,5 @@ class CurrencyConverterAdmin(admin.ModelAdmin):
 admin.site.register(Currency, CurrencyAdmin)
 admin.site.register(ProviderExchange, ProviderExchangeAdmin)
 admin.site.register(CurrencyExchangeRate, CurrencyConverterAdmin)
+admin.site.register(BackfillJob, BackfillJobAdmin)
+admin.site.register(LatestRate, LatestRateAdmin)
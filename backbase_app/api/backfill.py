@@ -0,0 +1,181 @@
+import logging
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from backbase_app.api.generic_api import GenericAPI
+from backbase_app.api.providers_api import save_data_time_series
+from backbase_app.api.time_series import iter_dates
+from backbase_app.models import BackfillChunk, BackfillJob
+
+logger = logging.getLogger(__name__)
+
+ChunkPlan = Tuple[date, date, List[str]]
+
+def plan_chunks(start_date: date, end_date: date, symbols: List[str], chunk_days: int, chunk_symbols: int) -> List[ChunkPlan]:
+    """
+    Split a (date range x symbols) backfill into chunks a provider can answer in one call.
+
+    Args:
+        start_date: First date to backfill
+        end_date: Last date to backfill
+        symbols: Target currency codes
+        chunk_days: Maximum number of dates of a chunk
+        chunk_symbols: Maximum number of symbols of a chunk
+
+    Returns:
+        List[ChunkPlan]: (start date, end date, symbols) of each chunk, in date order
+    """
+    chunks: List[ChunkPlan] = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+        for index in range(0, len(symbols), chunk_symbols):
+            chunks.append((chunk_start, chunk_end, symbols[index:index + chunk_symbols]))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+def create_backfill_job(base: str, start_date: date, end_date: date, symbols: List[str]) -> BackfillJob:
+    """
+    Create a backfill and its chunks, sized by BACKFILL_CHUNK_DAYS and BACKFILL_CHUNK_SYMBOLS.
+
+    Args:
+        base: The base currency code
+        start_date: First date to backfill
+        end_date: Last date to backfill
+        symbols: Target currency codes
+
+    Returns:
+        BackfillJob: The created backfill
+
+    Raises:
+        ValueError: If start_date is after end_date or no symbol is given
+    """
+    if start_date > end_date:
+        raise ValueError("start_date must be less than or equal to end_date")
+    if not symbols:
+        raise ValueError("At least one symbol is required")
+
+    job = BackfillJob.objects.create(base=base, start_date=start_date, end_date=end_date, symbols=",".join(symbols))
+    BackfillChunk.objects.bulk_create([
+        BackfillChunk(job=job, start_date=chunk_start, end_date=chunk_end, symbols=",".join(chunk_symbols))
+        for chunk_start, chunk_end, chunk_symbols in plan_chunks(
+            start_date, end_date, symbols, settings.BACKFILL_CHUNK_DAYS, settings.BACKFILL_CHUNK_SYMBOLS
+        )
+    ])
+    return job
+
+def start_backfill_run(job_id: int) -> List[int]:
+    """
+    Mark a backfill as running and get the chunks that still have to be fetched.
+
+    Args:
+        job_id: The backfill ID
+
+    Returns:
+        List[int]: IDs of the chunks that are not done, empty if the backfill is complete
+    """
+    chunk_ids = list(
+        BackfillChunk.objects.filter(job_id=job_id).exclude(status=BackfillJob.DONE).order_by('id').values_list('id', flat=True)
+    )
+    BackfillJob.objects.filter(id=job_id).update(status=BackfillJob.RUNNING, started_at=timezone.now(), finished_at=None)
+    return chunk_ids
+
+def count_missing_cells(series: Dict[str, Dict[str, Any]], start_date: str, end_date: str, symbols: List[str]) -> int:
+    """
+    Count the (date, symbol) cells of a chunk that a time series has no rate for.
+
+    Args:
+        series: Dictionary of exchange rates for each date and currency
+        start_date: First date of the chunk in YYYY-MM-DD format
+        end_date: Last date of the chunk in YYYY-MM-DD format
+        symbols: Symbols of the chunk
+
+    Returns:
+        int: Number of missing cells, 0 if the time series covers the whole chunk
+    """
+    return sum(
+        1 for current_date in iter_dates(start_date, end_date) for symbol in symbols
+        if series.get(current_date, {}).get(symbol) is None
+    )
+
+async def run_backfill_chunk(chunk_id: int) -> int:
+    """
+    Fetch the rates of a chunk from the providers and store them with one bulk upsert.
+
+    A chunk that is already done is skipped, so a chunk delivered twice after
+    a worker crash is only fetched once. The next provider is tried while the
+    answer misses dates or symbols of the chunk, and a chunk that is still
+    incomplete is stored as far as it goes but marked failed, so resuming the
+    backfill fetches it again.
+
+    Args:
+        chunk_id: The chunk ID
+
+    Returns:
+        int: Number of rates stored
+    """
+    chunk = await BackfillChunk.objects.select_related('job').aget(id=chunk_id)
+    if chunk.status == BackfillJob.DONE:
+        return 0
+
+    generic_api = GenericAPI()
+    base = chunk.job.base
+    symbols = chunk.symbols.split(",")
+    start_date, end_date = chunk.start_date.isoformat(), chunk.end_date.isoformat()
+    started = time.perf_counter()
+    data: Optional[Dict[str, Any]] = await generic_api.call_providers(
+        lambda provider_name: generic_api.providers_api.get_time_series(start_date, end_date, base, symbols, provider_name, save_data=False),
+        lambda series: not count_missing_cells(series, start_date, end_date, symbols)
+    )
+    rows = await save_data_time_series(data, base, replace=True) if data else 0
+    missing = count_missing_cells(data or {}, start_date, end_date, symbols)
+    if missing:
+        logger.warning("backfill chunk %s: %d rates missing from %s to %s", chunk.id, missing, start_date, end_date)
+
+    chunk.status = BackfillJob.FAILED if missing else BackfillJob.DONE
+    chunk.attempts += 1
+    chunk.rows = rows
+    chunk.seconds = time.perf_counter() - started
+    chunk.finished_at = timezone.now()
+    await chunk.asave(update_fields=['status', 'attempts', 'rows', 'seconds', 'finished_at'])
+    return rows
+
+def fail_backfill_chunk(chunk_id: int) -> None:
+    """
+    Mark a chunk whose run raised as failed, so the run can finish and be resumed.
+
+    Args:
+        chunk_id: The chunk ID
+    """
+    BackfillChunk.objects.filter(id=chunk_id).exclude(status=BackfillJob.DONE).update(
+        status=BackfillJob.FAILED, attempts=F('attempts') + 1, finished_at=timezone.now()
+    )
+
+def finish_backfill_run(job_id: int) -> Dict[str, Any]:
+    """
+    Record the outcome and the throughput of the last run of a backfill.
+
+    Args:
+        job_id: The backfill ID
+
+    Returns:
+        Dict[str, Any]: Status, stored rows, chunks not done and rows per second of the run
+    """
+    job = BackfillJob.objects.get(id=job_id)
+    chunks = job.chunks.all()
+    job.finished_at = timezone.now()
+    job.rows = chunks.filter(status=BackfillJob.DONE).aggregate(rows=Sum('rows'))['rows'] or 0
+    run_rows = chunks.filter(finished_at__gte=job.started_at).aggregate(rows=Sum('rows'))['rows'] or 0
+    elapsed = (job.finished_at - job.started_at).total_seconds()
+    job.rows_per_second = run_rows / elapsed if elapsed > 0 else 0
+    remaining = chunks.exclude(status=BackfillJob.DONE).count()
+    job.status = BackfillJob.FAILED if remaining else BackfillJob.DONE
+    job.save(update_fields=['status', 'finished_at', 'rows', 'rows_per_second'])
+
+    logger.info("backfill %s %s: %d rows in %.1fs (%.0f rows/s), %d chunks left", job.id, job.status, run_rows, elapsed, job.rows_per_second, remaining)
+    return {"status": job.status, "rows": job.rows, "remaining_chunks": remaining, "rows_per_second": job.rows_per_second}
@@ -0,0 +1,52 @@
+from typing import List
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from backbase_app.models import CurrencyExchangeRate, LatestRate
+
+RATE_COLUMNS = "source_currency_id, exchanged_currency_id, valuation_date, rate_value"
+
+def insert_rates(rates: List[CurrencyExchangeRate]) -> None:
+    """
+    Insert exchange rates, skipping the ones already stored.
+
+    On PostgreSQL, BULK_COPY_MIN_ROWS rows or more are loaded with COPY,
+    otherwise they are inserted with bulk_create. The latest rate of each pair
+    is refreshed in the same transaction, keeping the stored one on its date.
+
+    Args:
+        rates: Unsaved exchange rates
+    """
+    with transaction.atomic(savepoint=False):
+        if connection.vendor == "postgresql" and len(rates) >= settings.BULK_COPY_MIN_ROWS:
+            copy_rates(rates)
+        else:
+            CurrencyExchangeRate.objects.bulk_create(rates, batch_size=100, ignore_conflicts=True)
+        LatestRate.objects.refresh(rates, replace=False)
+
+def copy_rates(rates: List[CurrencyExchangeRate]) -> None:
+    """
+    Load exchange rates with PostgreSQL COPY, skipping the ones already stored.
+
+    COPY cannot skip conflicting rows, so the rates are copied into a temporary
+    table and moved with a single INSERT ... ON CONFLICT DO NOTHING.
+
+    Args:
+        rates: Unsaved exchange rates
+    """
+    table = connection.ops.quote_name(CurrencyExchangeRate._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMPORARY TABLE rate_load ("
+            "source_currency_id bigint, exchanged_currency_id bigint, valuation_date date, rate_value numeric(18, 6)"
+            ") ON COMMIT DROP"
+        )
+        with cursor.copy(f"COPY rate_load ({RATE_COLUMNS}) FROM STDIN") as copy:
+            for rate in rates:
+                copy.write_row((rate.source_currency_id, rate.exchanged_currency_id, rate.valuation_date, rate.rate_value))
+        cursor.execute(
+            f"INSERT INTO {table} ({RATE_COLUMNS}) SELECT {RATE_COLUMNS} FROM rate_load "
+            "ON CONFLICT (source_currency_id, exchanged_currency_id, valuation_date) DO NOTHING"
+        )
+        cursor.execute("DROP TABLE rate_load")
@@ -0,0 +1,352 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+logger = logging.getLogger(__name__)
+
+ProviderT = TypeVar("ProviderT")
+SharedState = Tuple[str, float]
+
+class CircuitBreaker:
+    """
+    Circuit breaker and health score of one provider.
+
+    Calls are recorded in a rolling window of CIRCUIT_BREAKER_WINDOW seconds.
+    When at least CIRCUIT_BREAKER_MIN_CALLS calls were made and their error rate
+    reaches CIRCUIT_BREAKER_ERROR_RATE, the breaker opens and the provider is
+    skipped. After CIRCUIT_BREAKER_OPEN_SECONDS it becomes half-open and lets a
+    single trial call through: a success closes it, a failure opens it again.
+
+    When CIRCUIT_BREAKER_SHARED_ALIAS names a Django cache, the state is shared
+    with the other web and Celery processes through it. Async callers use
+    aallow and arecord, which reach the shared cache with aget/aset so the
+    event loop is not blocked.
+
+    Attributes:
+        id_name (str): The provider ID
+        state (str): closed, open or half_open
+        opened_at (float): Wall-clock time the breaker was last opened
+        trial_started_at (Optional[float]): Wall-clock time the half-open trial call started
+        calls (Deque[Tuple[float, bool, float]]): Recent calls as (time, succeeded, latency)
+    """
+
+    def __init__(self, id_name: str) -> None:
+        """
+        Initialize a closed breaker for a provider.
+
+        Args:
+            id_name: The provider ID
+        """
+        self.id_name: str = id_name
+        self.state: str = CLOSED
+        self.opened_at: float = 0
+        self.trial_started_at: Optional[float] = None
+        self.calls: Deque[Tuple[float, bool, float]] = deque()
+        self.lock = threading.Lock()
+
+    @property
+    def shared_cache(self) -> Any:
+        """
+        Get the shared Django cache, None if it is disabled.
+        """
+        if not settings.CIRCUIT_BREAKER_SHARED_ALIAS:
+            return None
+        return caches[settings.CIRCUIT_BREAKER_SHARED_ALIAS]
+
+    def shared_key(self) -> str:
+        """
+        Get the key of the breaker state in the shared cache.
+        """
+        return f"circuit_breaker:{self.id_name}"
+
+    def pull_state(self) -> Optional[SharedState]:
+        """
+        Read the state published in the shared cache.
+
+        Returns:
+            Optional[SharedState]: The (state, opened_at) of the breaker, None if the cache is disabled or empty
+        """
+        shared_cache = self.shared_cache
+        return shared_cache.get(self.shared_key()) if shared_cache is not None else None
+
+    async def apull_state(self) -> Optional[SharedState]:
+        """
+        Read the state published in the shared cache without blocking the event loop.
+
+        Returns:
+            Optional[SharedState]: The (state, opened_at) of the breaker, None if the cache is disabled or empty
+        """
+        shared_cache = self.shared_cache
+        return await shared_cache.aget(self.shared_key()) if shared_cache is not None else None
+
+    def push_state(self, shared_state: SharedState) -> None:
+        """
+        Publish a state to the shared cache.
+
+        Args:
+            shared_state: The (state, opened_at) of the breaker
+        """
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            shared_cache.set(self.shared_key(), shared_state, timeout=None)
+
+    async def apush_state(self, shared_state: SharedState) -> None:
+        """
+        Publish a state to the shared cache without blocking the event loop.
+
+        Args:
+            shared_state: The (state, opened_at) of the breaker
+        """
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            await shared_cache.aset(self.shared_key(), shared_state, timeout=None)
+
+    def prune(self, now: float) -> None:
+        """
+        Drop the calls that left the rolling window.
+
+        Args:
+            now: The current wall-clock time
+        """
+        while self.calls and self.calls[0][0] < now - settings.CIRCUIT_BREAKER_WINDOW:
+            self.calls.popleft()
+
+    def allow(self) -> bool:
+        """
+        Tell whether the provider may be called now.
+
+        Returns:
+            bool: False while the breaker is open or a half-open trial call is running
+        """
+        return self.admit(self.pull_state())
+
+    async def aallow(self) -> bool:
+        """
+        Tell whether the provider may be called now, reading the shared state without blocking the event loop.
+
+        Returns:
+            bool: False while the breaker is open or a half-open trial call is running
+        """
+        return self.admit(await self.apull_state())
+
+    def admit(self, shared_state: Optional[SharedState]) -> bool:
+        """
+        Apply the shared state, then tell whether the provider may be called now.
+
+        Args:
+            shared_state: The state read from the shared cache, None to keep the local one
+
+        Returns:
+            bool: False while the breaker is open or a half-open trial call is running
+        """
+        with self.lock:
+            if shared_state is not None:
+                self.state, self.opened_at = shared_state
+            now = time.time()
+            if self.state == OPEN and now - self.opened_at >= settings.CIRCUIT_BREAKER_OPEN_SECONDS:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN:
+                trial_running = self.trial_started_at is not None and now - self.trial_started_at < settings.CIRCUIT_BREAKER_OPEN_SECONDS
+                if not trial_running:
+                    self.trial_started_at = now
+                    return True
+            return False
+
+    def record(self, succeeded: bool, latency: float) -> None:
+        """
+        Record the outcome of a provider call and update the breaker state.
+
+        Args:
+            succeeded: Whether the provider answered without error
+            latency: Seconds the call took
+        """
+        shared_state = self.update(succeeded, latency)
+        if shared_state is not None:
+            self.push_state(shared_state)
+
+    async def arecord(self, succeeded: bool, latency: float) -> None:
+        """
+        Record the outcome of a provider call, publishing a state change without blocking the event loop.
+
+        Args:
+            succeeded: Whether the provider answered without error
+            latency: Seconds the call took
+        """
+        shared_state = self.update(succeeded, latency)
+        if shared_state is not None:
+            await self.apush_state(shared_state)
+
+    def update(self, succeeded: bool, latency: float) -> Optional[SharedState]:
+        """
+        Add a call to the rolling window and update the breaker state.
+
+        Args:
+            succeeded: Whether the provider answered without error
+            latency: Seconds the call took
+
+        Returns:
+            Optional[SharedState]: The new (state, opened_at) to publish, None if the state did not change
+        """
+        with self.lock:
+            now = time.time()
+            self.calls.append((now, succeeded, latency))
+            self.prune(now)
+            previous_state = self.state
+
+            if self.state == HALF_OPEN:
+                if succeeded:
+                    self.state = CLOSED
+                    self.calls.clear()
+                else:
+                    self.state = OPEN
+                    self.opened_at = now
+                self.trial_started_at = None
+            elif self.state == CLOSED and len(self.calls) >= settings.CIRCUIT_BREAKER_MIN_CALLS:
+                if self.error_rate() >= settings.CIRCUIT_BREAKER_ERROR_RATE:
+                    self.state = OPEN
+                    self.opened_at = now
+
+            if self.state == previous_state:
+                return None
+            logger.info("circuit breaker of provider %s is now %s", self.id_name, self.state)
+            return self.state, self.opened_at
+
+    def error_rate(self) -> float:
+        """
+        Get the rate of failed calls in the rolling window.
+
+        Returns:
+            float: Failed calls over recorded calls, 0 without calls
+        """
+        if not self.calls:
+            return 0.0
+        return sum(1 for _, succeeded, _ in self.calls if not succeeded) / len(self.calls)
+
+    def mean_latency(self) -> Optional[float]:
+        """
+        Get the mean latency of the calls in the rolling window.
+
+        Returns:
+            Optional[float]: Mean latency in seconds, None without calls
+        """
+        if not self.calls:
+            return None
+        return sum(latency for _, _, latency in self.calls) / len(self.calls)
+
+    def health_score(self) -> float:
+        """
+        Get the health of the provider, from 0 (unusable) to 1 (healthy).
+
+        The score is the success rate, reduced when the mean latency exceeds
+        CIRCUIT_BREAKER_SLOW_CALL seconds. Providers with fewer than
+        CIRCUIT_BREAKER_MIN_CALLS recent calls are considered healthy.
+
+        Returns:
+            float: The health score
+        """
+        if self.state == OPEN:
+            return 0.0
+        if len(self.calls) < settings.CIRCUIT_BREAKER_MIN_CALLS:
+            return 1.0
+        score = 1 - self.error_rate()
+        mean_latency = self.mean_latency()
+        if mean_latency and mean_latency > settings.CIRCUIT_BREAKER_SLOW_CALL:
+            score *= settings.CIRCUIT_BREAKER_SLOW_CALL / mean_latency
+        return round(score, 4)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the state and rolling window statistics of the breaker.
+
+        Returns:
+            Dict[str, Any]: State, health score, error rate, mean latency and number of calls
+        """
+        shared_state = self.pull_state()
+        with self.lock:
+            if shared_state is not None:
+                self.state, self.opened_at = shared_state
+            self.prune(time.time())
+            mean_latency = self.mean_latency()
+            return {
+                "state": self.state,
+                "health_score": self.health_score(),
+                "error_rate": round(self.error_rate(), 4),
+                "mean_latency": round(mean_latency, 4) if mean_latency is not None else None,
+                "calls": len(self.calls),
+            }
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers of every provider, created on first use.
+
+    Attributes:
+        breakers (Dict[str, CircuitBreaker]): Breaker of each provider ID
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the registry without any breaker.
+        """
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    def get(self, id_name: str) -> CircuitBreaker:
+        """
+        Get the breaker of a provider.
+
+        Args:
+            id_name: The provider ID
+
+        Returns:
+            CircuitBreaker: The breaker of the provider
+        """
+        breaker = self.breakers.get(id_name)
+        if breaker is None:
+            with self.lock:
+                breaker = self.breakers.setdefault(id_name, CircuitBreaker(id_name))
+        return breaker
+
+    def order(self, providers: Sequence[ProviderT]) -> List[ProviderT]:
+        """
+        Order providers by health, keeping their static priority within each group.
+
+        Healthy providers come first, then providers whose health score is below
+        CIRCUIT_BREAKER_DEMOTE_SCORE, then providers whose breaker is open.
+
+        Args:
+            providers: Providers with an id_name attribute, highest priority first
+
+        Returns:
+            List[ProviderT]: The providers in the order they should be tried
+        """
+        def rank(provider: Any) -> int:
+            breaker = self.get(provider.id_name)
+            if breaker.state == OPEN:
+                return 2
+            if breaker.health_score() < settings.CIRCUIT_BREAKER_DEMOTE_SCORE:
+                return 1
+            return 0
+
+        return sorted(providers, key=rank)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of every breaker.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics of each provider's breaker
+        """
+        return {id_name: breaker.stats() for id_name, breaker in list(self.breakers.items())}
+
+circuit_breakers = CircuitBreakerRegistry()
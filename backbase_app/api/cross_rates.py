@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.utils import timezone
+
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.decimals import quantize_rate
+
+class RateVector(NamedTuple):
+    """
+    Rates of every currency against the cross-rate base for one date.
+
+    Attributes:
+        symbols (Tuple[str, ...]): Currency symbols, the base currency included
+        index (Mapping[str, int]): Position of each symbol in the vector
+        rates (Tuple[Decimal, ...]): Base to currency rates as stored, in symbol order
+    """
+    symbols: Tuple[str, ...]
+    index: Mapping[str, int]
+    rates: Tuple[Decimal, ...]
+
+class CrossRateEngine:
+    """
+    Derives the rate of any currency pair from the rates of a single base currency.
+
+    save_data_today stores every currency against CROSS_RATE_BASE, so the rate
+    of a pair (A, B) on a date is base->B / base->A. The rates of the base for a
+    date are loaded with one query into a vector indexed by currency; a pair is
+    then computed exactly with Decimal and rounded half-even to the 6 decimal
+    places of the rate_value column.
+
+    Vectors are kept in a bounded LRU for RATE_CACHE_TTL_TODAY seconds for today
+    and RATE_CACHE_TTL_HISTORY seconds for past dates, and dropped when rates of
+    the base for their date are written.
+
+    Attributes:
+        base (str): The currency every vector is expressed in
+        max_dates (int): Maximum number of dates kept in memory
+        vectors (OrderedDict): Loaded vectors in LRU order, mapping a date to (expires_at, RateVector)
+    """
+
+    def __init__(self, base: Optional[str] = None, max_dates: Optional[int] = None) -> None:
+        """
+        Initialize the engine, using the CROSS_RATE_* settings for missing arguments.
+        """
+        self.base: str = base if base is not None else settings.CROSS_RATE_BASE
+        self.max_dates: int = max_dates if max_dates is not None else settings.CROSS_RATE_MAX_DATES
+        self.vectors: "OrderedDict[str, Tuple[float, RateVector]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def load_vector(self, valuation_date: str) -> RateVector:
+        """
+        Load the stored rates of the base currency for a date.
+
+        Args:
+            valuation_date: The date in YYYY-MM-DD format
+
+        Returns:
+            RateVector: The rates of the base, empty if the base currency does not exist
+        """
+        from backbase_app.models import CurrencyExchangeRate
+
+        base_id = currency_registry.find_id(self.base)
+        if base_id is None:
+            return RateVector((), MappingProxyType({}), ())
+
+        symbols = [self.base]
+        rates = [Decimal(1)]
+        rows = CurrencyExchangeRate.objects.filter(
+            source_currency_id=base_id,
+            valuation_date=valuation_date
+        ).exclude(exchanged_currency_id=base_id).values_list('exchanged_currency_id', 'rate_value')
+        for exchanged_currency_id, rate_value in rows:
+            if rate_value:
+                symbols.append(currency_registry.get_symbol(exchanged_currency_id))
+                rates.append(rate_value)
+
+        return RateVector(
+            tuple(symbols),
+            MappingProxyType({symbol: position for position, symbol in enumerate(symbols)}),
+            tuple(rates),
+        )
+
+    def get_vector(self, valuation_date: Union[str, date]) -> RateVector:
+        """
+        Get the rates of the base currency for a date, loading them on a miss.
+
+        Args:
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+
+        Returns:
+            RateVector: The rates of the base
+        """
+        valuation_date = str(valuation_date)
+        with self.lock:
+            entry = self.vectors.get(valuation_date)
+            if entry is not None and entry[0] > time.monotonic():
+                self.vectors.move_to_end(valuation_date)
+                return entry[1]
+
+        vector = self.load_vector(valuation_date)
+        if valuation_date < str(timezone.now().date()):
+            ttl = settings.RATE_CACHE_TTL_HISTORY
+        else:
+            ttl = settings.RATE_CACHE_TTL_TODAY
+        with self.lock:
+            self.vectors[valuation_date] = (time.monotonic() + ttl, vector)
+            self.vectors.move_to_end(valuation_date)
+            while len(self.vectors) > self.max_dates:
+                self.vectors.popitem(last=False)
+        return vector
+
+    def rate(self, source_currency: str, exchanged_currency: str, valuation_date: Union[str, date]) -> Optional[Decimal]:
+        """
+        Derive the rate of a currency pair from the rates of the base.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+
+        Returns:
+            Optional[Decimal]: The rate rounded to 6 decimal places, None if either currency has no rate against the base
+        """
+        vector = self.get_vector(valuation_date)
+        source_position = vector.index.get(source_currency)
+        exchanged_position = vector.index.get(exchanged_currency)
+        if source_position is None or exchanged_position is None:
+            return None
+        return quantize_rate(vector.rates[exchanged_position] / vector.rates[source_position])
+
+    def invalidate(self, source_currency: str, valuation_dates: Iterable[Union[str, date]]) -> None:
+        """
+        Drop the vectors of the dates whose rates were written.
+
+        Only rates of the base currency are part of a vector, so writes of other
+        source currencies are ignored.
+
+        Args:
+            source_currency: The source currency of the written rates
+            valuation_dates: The dates of the written rates
+        """
+        if source_currency != self.base:
+            return
+        with self.lock:
+            for valuation_date in valuation_dates:
+                self.vectors.pop(str(valuation_date), None)
+
+    def clear(self) -> None:
+        """
+        Drop every loaded vector.
+        """
+        with self.lock:
+            self.vectors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the number of loaded vectors.
+
+        Returns:
+            Dict[str, Any]: The base currency, the loaded and maximum number of dates
+        """
+        return {"base": self.base, "dates": len(self.vectors), "max_dates": self.max_dates}
+
+cross_rates = CrossRateEngine()
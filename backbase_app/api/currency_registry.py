@@ -0,0 +1,212 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional
+
+from django.conf import settings
+
+class CurrencyEntry(NamedTuple):
+    """
+    Identifiers of a currency kept by the registry.
+
+    Attributes:
+        id (int): Primary key of the currency
+        code (str): Unique code of the currency
+    """
+    id: int
+    code: str
+
+class CurrencySnapshot(NamedTuple):
+    """
+    Immutable view of the Currency table.
+
+    Attributes:
+        by_symbol (Mapping[str, CurrencyEntry]): Currency identifiers for each symbol
+        by_id (Mapping[int, str]): Currency symbol for each primary key
+    """
+    by_symbol: Mapping[str, CurrencyEntry]
+    by_id: Mapping[int, str]
+
+class CurrencyRegistry:
+    """
+    Process-wide map of currency symbols to their ids and codes.
+
+    The Currency table is small and rarely changes, so it is loaded once into an
+    immutable snapshot shared by every read and write path, which then filter and
+    build rows with *_id fields instead of fetching Currency objects. The snapshot
+    is dropped by the post_save/post_delete signals of Currency and reloaded on
+    the next lookup. A symbol missing from the snapshot triggers one reload, so
+    currencies created by another process are found as well. A symbol still
+    missing after the reload is remembered for miss_ttl seconds, during which
+    it does not reload the table again.
+
+    Attributes:
+        snapshot (Optional[CurrencySnapshot]): The loaded snapshot, None until first use
+        miss_ttl (float): Seconds a symbol or id missing after a reload is not looked up again
+        misses (Dict[Hashable, float]): Expiry time of each missing symbol or id
+    """
+
+    def __init__(self, miss_ttl: Optional[float] = None) -> None:
+        """
+        Initialize the registry without loading the Currency table.
+
+        Args:
+            miss_ttl: Seconds a missing symbol is remembered, CURRENCY_REGISTRY_MISS_TTL if None
+        """
+        self.snapshot: Optional[CurrencySnapshot] = None
+        self.miss_ttl: float = miss_ttl if miss_ttl is not None else settings.CURRENCY_REGISTRY_MISS_TTL
+        self.misses: Dict[Hashable, float] = {}
+        self.lock = threading.Lock()
+
+    def load(self) -> CurrencySnapshot:
+        """
+        Load the Currency table into a new snapshot.
+
+        Returns:
+            CurrencySnapshot: The loaded snapshot
+        """
+        from backbase_app.models import Currency
+
+        by_symbol: Dict[str, CurrencyEntry] = {}
+        by_id: Dict[int, str] = {}
+        for currency_id, symbol, code in Currency.objects.values_list('id', 'symbol', 'code'):
+            by_symbol[symbol] = CurrencyEntry(currency_id, code)
+            by_id[currency_id] = symbol
+        snapshot = CurrencySnapshot(MappingProxyType(by_symbol), MappingProxyType(by_id))
+        self.snapshot = snapshot
+        return snapshot
+
+    def get_snapshot(self) -> CurrencySnapshot:
+        """
+        Get the current snapshot, loading it on first use.
+
+        Returns:
+            CurrencySnapshot: The current snapshot
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            with self.lock:
+                snapshot = self.snapshot or self.load()
+        return snapshot
+
+    def reload_missing(self, keys: Iterable[Hashable], mapping: str) -> CurrencySnapshot:
+        """
+        Reload the snapshot for keys missing from it, unless all of them were missing after a recent reload.
+
+        Args:
+            keys: The missing symbols or ids
+            mapping: The snapshot mapping the keys are looked up in, 'by_symbol' or 'by_id'
+
+        Returns:
+            CurrencySnapshot: The reloaded snapshot, or the current one if every key is a recent miss
+        """
+        keys = list(keys)
+        now = time.monotonic()
+        with self.lock:
+            if all(self.misses.get(key, 0) > now for key in keys):
+                return self.snapshot or self.load()
+            snapshot = self.load()
+            found = getattr(snapshot, mapping)
+            for key in keys:
+                if key in found:
+                    self.misses.pop(key, None)
+                else:
+                    self.misses[key] = now + self.miss_ttl
+        return snapshot
+
+    def find(self, symbol: str) -> Optional[CurrencyEntry]:
+        """
+        Get the identifiers of a currency symbol.
+
+        Args:
+            symbol: The currency symbol
+
+        Returns:
+            Optional[CurrencyEntry]: The currency identifiers or None if the symbol does not exist
+        """
+        entry = self.get_snapshot().by_symbol.get(symbol)
+        if entry is None:
+            entry = self.reload_missing([symbol], 'by_symbol').by_symbol.get(symbol)
+        return entry
+
+    def find_id(self, symbol: str) -> Optional[int]:
+        """
+        Get the primary key of a currency symbol.
+
+        Args:
+            symbol: The currency symbol
+
+        Returns:
+            Optional[int]: The currency id or None if the symbol does not exist
+        """
+        entry = self.find(symbol)
+        return entry.id if entry else None
+
+    def get_id(self, symbol: str) -> int:
+        """
+        Get the primary key of a currency symbol that must exist.
+
+        Args:
+            symbol: The currency symbol
+
+        Returns:
+            int: The currency id
+
+        Raises:
+            Currency.DoesNotExist: If the symbol does not exist
+        """
+        entry = self.find(symbol)
+        if entry is None:
+            from backbase_app.models import Currency
+            raise Currency.DoesNotExist(f"Currency {symbol} does not exist")
+        return entry.id
+
+    def get_ids(self, symbols: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the primary keys of several currency symbols.
+
+        Args:
+            symbols: The currency symbols
+
+        Returns:
+            Dict[str, int]: The currency id of each symbol that exists
+        """
+        symbols = list(symbols)
+        by_symbol = self.get_snapshot().by_symbol
+        missing = [symbol for symbol in symbols if symbol not in by_symbol]
+        if missing:
+            by_symbol = self.reload_missing(missing, 'by_symbol').by_symbol
+        return {symbol: by_symbol[symbol].id for symbol in symbols if symbol in by_symbol}
+
+    def get_symbol(self, currency_id: int) -> str:
+        """
+        Get the symbol of a currency primary key.
+
+        Args:
+            currency_id: The currency id
+
+        Returns:
+            str: The currency symbol
+        """
+        by_id = self.get_snapshot().by_id
+        if currency_id not in by_id:
+            by_id = self.reload_missing([currency_id], 'by_id').by_id
+        return by_id[currency_id]
+
+    def symbols(self) -> List[str]:
+        """
+        Get every currency symbol.
+
+        Returns:
+            List[str]: The currency symbols
+        """
+        return list(self.get_snapshot().by_symbol)
+
+    def invalidate(self) -> None:
+        """
+        Drop the snapshot and the remembered misses so the next lookup reloads the Currency table.
+        """
+        self.snapshot = None
+        self.misses = {}
+
+currency_registry = CurrencyRegistry()
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.generic_api import GenericAPI
+from backbase_app.api.providers_api import save_data_snapshot
+
+logger = logging.getLogger(__name__)
+
+class SnapshotIncomplete(Exception):
+    """
+    Raised when no provider could give the rate of some symbols of the daily snapshot.
+
+    Attributes:
+        missing (Dict[str, List[str]]): The symbols without a rate, for each base currency
+    """
+    def __init__(self, missing: Dict[str, List[str]]) -> None:
+        super().__init__(missing)
+        self.missing: Dict[str, List[str]] = missing
+
+    def __str__(self) -> str:
+        details = "; ".join(f"{base}: {', '.join(symbols)}" for base, symbols in self.missing.items())
+        return f"No provider could fill the rates of {details}"
+
+async def fetch_base_rates(generic_api: GenericAPI, base: str, symbols: List[str], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Get the latest rates of one base currency from the providers, without storing them.
+
+    Symbols a provider misses or fails are asked to the next provider.
+
+    Args:
+        generic_api: The API used to call the providers
+        base: The base currency code
+        symbols: Target currency codes
+        semaphore: Limits the number of bases fetched at once
+
+    Returns:
+        Dict[str, Any]: The rates found ("rates"), the symbols no provider could fill ("missing")
+            and the seconds taken ("seconds")
+    """
+    async with semaphore:
+        started = time.perf_counter()
+        rates, missing = await generic_api.fill_from_providers(
+            lambda provider_name, missing_symbols: generic_api.providers_api.get_latest_rates(base, missing_symbols, provider_name, save_data=False),
+            symbols
+        )
+        return {"rates": rates, "missing": missing, "seconds": time.perf_counter() - started}
+
+async def take_daily_snapshot(symbols_by_base: Optional[Dict[str, List[str]]] = None, valuation_date: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Fetch today's rates of several base currencies at once and store them in a single transaction.
+
+    Every base is fetched concurrently on one event loop, at most
+    DAILY_SNAPSHOT_CONCURRENCY at a time. The rates found are stored even when
+    some symbols are missing, so a retry only has to fetch those. The run is
+    reported as too slow when it takes longer than DAILY_SNAPSHOT_SLOT_SECONDS.
+
+    Args:
+        symbols_by_base: The symbols to fetch for each base currency
+            (defaults to every currency for each DAILY_SNAPSHOT_BASES currency)
+        valuation_date: Date of the stored rates (defaults to the current date)
+
+    Returns:
+        Dict[str, Any]: Stored rows, the symbols no provider could fill for each base, and the seconds
+            taken by each base, by the fetch, by the save and in total
+    """
+    started = time.perf_counter()
+    if symbols_by_base is None:
+        symbols = await sync_to_async(currency_registry.symbols)()
+        symbols_by_base = {base: [symbol for symbol in symbols if symbol != base] for base in settings.DAILY_SNAPSHOT_BASES}
+    bases = list(symbols_by_base)
+    generic_api = GenericAPI()
+    semaphore = asyncio.Semaphore(settings.DAILY_SNAPSHOT_CONCURRENCY)
+
+    results = await asyncio.gather(*(fetch_base_rates(generic_api, base, symbols_by_base[base], semaphore) for base in bases))
+    fetched = time.perf_counter()
+    snapshot = {base: result["rates"] for base, result in zip(bases, results) if result["rates"]}
+    rows = await save_data_snapshot(snapshot, valuation_date or timezone.now().date())
+    finished = time.perf_counter()
+
+    report = {
+        "rows": rows,
+        "missing": {base: result["missing"] for base, result in zip(bases, results) if result["missing"]},
+        "bases": {base: round(result["seconds"], 3) for base, result in zip(bases, results)},
+        "fetch_seconds": round(fetched - started, 3),
+        "save_seconds": round(finished - fetched, 3),
+        "total_seconds": round(finished - started, 3),
+    }
+    logger.info("daily snapshot: %d rows for %d bases in %ss (fetch %ss, save %ss)",
+                rows, len(bases), report['total_seconds'], report['fetch_seconds'], report['save_seconds'])
+    for base, missing in report["missing"].items():
+        logger.warning("daily snapshot: no provider could fill %s rates for %s", base, ', '.join(missing))
+    if report["total_seconds"] > settings.DAILY_SNAPSHOT_SLOT_SECONDS:
+        logger.warning("daily snapshot: took %ss, longer than its %ss slot", report['total_seconds'], settings.DAILY_SNAPSHOT_SLOT_SECONDS)
+    return report
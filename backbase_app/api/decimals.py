@@ -0,0 +1,179 @@
+import json
+import re
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from functools import partial
+from json.encoder import encode_basestring_ascii
+from operator import methodcaller
+from typing import Any, Callable, Union
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# rate_value is a DecimalField with 6 decimal places
+RATE_QUANTUM = Decimal("0.000001")
+
+DecimalLike = Union[Decimal, int, float, str]
+
+# Amounts to convert: plain ASCII digits with at most 6 decimal places, below AMOUNT_MAX, so that
+# an amount times a rate stays within the 28 digits of the default context once quantized
+AMOUNT_PATTERN = re.compile(r"[0-9]+(?:\.[0-9]{1,6})?")
+AMOUNT_MAX = Decimal("1000000000000")
+
+# Rounds a rate or a converted amount half-even to the 6 decimal places of rate_value
+# (positional arguments, a partial with keywords is about twice as slow)
+quantize_rate: Callable[[Decimal], Decimal] = methodcaller("quantize", RATE_QUANTUM, ROUND_HALF_EVEN)
+
+# Parses JSON numbers with a fraction as Decimal instead of float
+loads_json: Callable[[str], Any] = partial(json.loads, parse_float=Decimal)
+
+def to_decimal(value: DecimalLike) -> Decimal:
+    """
+    Convert a number from a provider or a request to Decimal.
+
+    Floats are converted from their shortest representation, so 0.1 becomes
+    Decimal("0.1") rather than its binary expansion.
+
+    Args:
+        value: The number
+
+    Returns:
+        Decimal: The number as Decimal
+
+    Raises:
+        ValueError: If the value is not a finite number
+    """
+    if type(value) is not Decimal:
+        try:
+            value = Decimal(repr(value) if isinstance(value, float) else value)
+        except (InvalidOperation, TypeError):
+            raise ValueError(f"Invalid number: {value!r}")
+    if not value.is_finite():
+        raise ValueError(f"Invalid number: {value!r}")
+    return value
+
+def to_rate(value: DecimalLike) -> Decimal:
+    """
+    Convert a rate from a provider to Decimal, rounded like the stored rates.
+
+    Args:
+        value: The rate
+
+    Returns:
+        Decimal: The rate rounded to 6 decimal places
+
+    Raises:
+        ValueError: If the value is not a finite number
+    """
+    return quantize_rate(to_decimal(value))
+
+def to_amount(value: str) -> Decimal:
+    """
+    Parse an amount to convert received in a request.
+
+    Unlike to_decimal, only plain positive numbers are accepted: no sign,
+    exponent, underscore or surrounding whitespace.
+
+    Args:
+        value: The amount, as received in the query string
+
+    Returns:
+        Decimal: The amount as Decimal
+
+    Raises:
+        ValueError: If the value is not a plain number, is zero or is not below AMOUNT_MAX
+    """
+    if not AMOUNT_PATTERN.fullmatch(value):
+        raise ValueError(f"Invalid amount: {value!r}")
+    amount = Decimal(value)
+    if not 0 < amount < AMOUNT_MAX:
+        raise ValueError(f"Amount out of range: {value!r}")
+    return amount
+
+def encode_scalar(value: Any, value_type: type) -> Union[str, None]:
+    """
+    Encode a JSON scalar, Decimals as JSON numbers.
+
+    Args:
+        value: The value
+        value_type: The exact type of the value
+
+    Returns:
+        Union[str, None]: The encoded value, None if it is not a scalar
+    """
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    if value_type is Decimal:
+        if not value.is_finite():
+            raise ValueError(f"Out of range decimal values are not JSON compliant: {value!r}")
+        return str(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value_type is int:
+        return int.__repr__(value)
+    if value_type is float:
+        return json.dumps(value)
+    return None
+
+def encode_into(value: Any, append: Callable[[str], None], default: Callable[[Any], Any]) -> None:
+    """
+    Encode a value as JSON, appending the encoded parts.
+
+    Args:
+        value: The value
+        append: Receives each encoded part
+        default: Converts the values JSON has no type for
+    """
+    value_type = type(value)
+    if value_type is dict:
+        separator = "{"
+        for key, item in value.items():
+            item_type = type(item)
+            key_text = separator + encode_basestring_ascii(key if type(key) is str else str(key)) + ": "
+            text = encode_scalar(item, item_type) if item_type is not dict and item_type is not list else None
+            if text is None:
+                append(key_text)
+                encode_into(item, append, default)
+            else:
+                append(key_text + text)
+            separator = ", "
+        append("{}" if separator == "{" else "}")
+        return
+    if value_type is list or value_type is tuple:
+        separator = "["
+        for item in value:
+            append(separator)
+            encode_into(item, append, default)
+            separator = ", "
+        append("[]" if separator == "[" else "]")
+        return
+    text = encode_scalar(value, value_type)
+    if text is None:
+        encode_into(default(value), append, default)
+    else:
+        append(text)
+
+class DecimalJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder writing Decimals as JSON numbers, digit for digit.
+
+    DjangoJSONEncoder writes Decimals as strings and the standard encoder
+    only writes them through float. Dates and the other types are encoded like
+    DjangoJSONEncoder does.
+    """
+
+    def encode(self, o: Any) -> str:
+        """
+        Encode a value as JSON.
+
+        Args:
+            o: The value
+
+        Returns:
+            str: The JSON document
+        """
+        parts = []
+        encode_into(o, parts.append, self.default)
+        return "".join(parts)
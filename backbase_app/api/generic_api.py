@@ -9,14 +9,26 @@ django.setup()
 
 from backbase_app.api.providers_api import ProvidersAPI
 from backbase_app.api.internal_api import InternalAPI
+from backbase_app.api.repository_api import RateKey, RepositoryAPI
+from backbase_app.api.provider_registry import provider_registry, ProviderConfig
+from backbase_app.api.circuit_breaker import circuit_breakers
+from backbase_app.api.single_flight import single_flight
+from backbase_app.api.time_series import GapRange, coalesce_gaps, find_gaps
+from backbase_app.api.decimals import loads_json, quantize_rate
 from backbase_app.models import ProviderExchange
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Set, Tuple, Union
 
 import aiohttp
 import asyncio
+import logging
+import time
+from decimal import Decimal
 from django.conf import settings
+from django.utils import timezone
 from asgiref.sync import sync_to_async
 
+logger = logging.getLogger(__name__)
+
 @sync_to_async
 def get_provider_exchange(providers: Optional[List[str]] = None) -> Optional[ProviderExchange]:
     """
@@ -46,9 +58,25 @@ def get_all_providers() -> List[str]:
         providers = ProviderExchange.objects.filter(activated=True).order_by('-priority').values_list('id_name', flat=True)
         return list(providers)
     except Exception as e:
-        print(e)
+        logger.warning("could not load the active providers: %s", e)
         return []
 
+async def get_active_providers() -> List[ProviderConfig]:
+    """
+    Get all active providers ordered by priority from the provider registry.
+    
+    The database is only queried when the registry snapshot is missing or stale.
+    
+    Returns:
+        List[ProviderConfig]: List of active providers, highest priority first
+    """
+    snapshot = provider_registry.get_cached_snapshot()
+    if snapshot is None:
+        snapshot = await sync_to_async(provider_registry.get_snapshot)()
+    return list(snapshot.providers)
+
+ProviderOperation = Callable[[str], Awaitable[Dict[str, Any]]]
+
 class GenericAPI:
     """
     A generic API class that coordinates between internal and external providers.
@@ -58,7 +86,8 @@ class GenericAPI:
     
     Attributes:
         base_url (str): The base URL for internal API endpoints
-        internal_api (InternalAPI): Instance of the internal API client
+        internal_api (Union[RepositoryAPI, InternalAPI]): Instance of the internal data source,
+            in-process by default or over HTTP when INTERNAL_API_MODE is "http"
         providers_api (ProvidersAPI): Instance of the providers API client
     """
     
@@ -67,7 +96,9 @@ class GenericAPI:
         Initialize the GenericAPI with internal and provider API clients.
         """
         self.base_url: str = settings.API_URL_INTERNAL + settings.API_VERSION_INTERNAL
-        self.internal_api: InternalAPI = InternalAPI()
+        self.internal_api: Union[RepositoryAPI, InternalAPI] = RepositoryAPI()
+        if settings.INTERNAL_API_MODE == "http":
+            self.internal_api = InternalAPI()
         self.providers_api: ProvidersAPI = ProvidersAPI()
 
     async def fetch(self, session: aiohttp.ClientSession, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
@@ -80,16 +111,147 @@ class GenericAPI:
             params: Query parameters for the request
             
         Returns:
-            Dict[str, Any]: The JSON response from the API
+            Dict[str, Any]: The JSON response from the API, with its fractional numbers as Decimal
         """
         url = f"{self.base_url}{endpoint}"
         async with session.get(url, params=params) as response:
-            return await response.json()
+            return await response.json(loads=loads_json)
+
+    async def call_provider(self, provider: ProviderConfig, operation: ProviderOperation) -> Optional[Dict[str, Any]]:
+        """
+        Call one provider, giving up after its configured timeout.
+        
+        The provider is skipped while its circuit breaker is open, and the outcome
+        and latency of the call are recorded in the breaker.
+        
+        Args:
+            provider: The provider to call
+            operation: Async function receiving the provider ID and returning its data
+            
+        Returns:
+            Optional[Dict[str, Any]]: The provider data or None if the call was skipped, failed or timed out
+        """
+        breaker = circuit_breakers.get(provider.id_name)
+        if not await breaker.aallow():
+            logger.info("provider %s skipped, its circuit breaker is %s", provider.id_name, breaker.state)
+            return None
+
+        started = time.monotonic()
+        try:
+            data = await asyncio.wait_for(operation(provider.id_name), timeout=provider.timeout)
+            await breaker.arecord(True, time.monotonic() - started)
+            return data
+        except asyncio.TimeoutError:
+            logger.warning("provider %s timed out after %ss", provider.id_name, provider.timeout)
+        except Exception as e:
+            logger.warning("provider %s failed: %s", provider.id_name, e)
+        await breaker.arecord(False, time.monotonic() - started)
+        return None
+
+    async def call_providers(self, operation: ProviderOperation, is_valid: Callable[[Dict[str, Any]], bool]) -> Optional[Dict[str, Any]]:
+        """
+        Get data from the active providers, in priority order, until one gives a valid answer.
+        
+        Providers whose circuit breaker is open or whose health score is low are
+        moved after the healthy ones until they recover.
+        
+        PROVIDER_FAILOVER_MODE selects how providers are tried:
+        - "sequential": the next provider is called only after the previous one failed
+        - "hedged": the next provider is also called when the previous one has not
+          answered after its hedge_delay
+        - "all": every provider is called at once
+        In the concurrent modes the first valid answer wins (the highest priority one
+        if several arrive together) and the calls still running are cancelled.
+        
+        Args:
+            operation: Async function receiving the provider ID and returning its data
+            is_valid: Function telling whether the data of a provider can be used
+            
+        Returns:
+            Optional[Dict[str, Any]]: The first valid data, otherwise the data of the last provider that answered
+        """
+        providers = circuit_breakers.order(await get_active_providers())
+        mode = settings.PROVIDER_FAILOVER_MODE
+        data: Optional[Dict[str, Any]] = None
+
+        if mode == "sequential":
+            for provider in providers:
+                logger.debug("trying to get data from provider %s", provider.id_name)
+                result = await self.call_provider(provider, operation)
+                if result is not None:
+                    data = result
+                    if is_valid(result):
+                        break
+            return data
+
+        tasks: Dict[asyncio.Task, int] = {}
+        pending: Set[asyncio.Task] = set()
+
+        def start_next() -> None:
+            index = len(tasks)
+            logger.debug("trying to get data from provider %s", providers[index].id_name)
+            task = asyncio.ensure_future(self.call_provider(providers[index], operation))
+            tasks[task] = index
+            pending.add(task)
+
+        try:
+            while len(tasks) < len(providers) and (mode == "all" or not pending):
+                start_next()
+            while pending:
+                hedge_delay = None
+                if len(tasks) < len(providers):
+                    hedge_delay = providers[len(tasks) - 1].hedge_delay
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for task in sorted(done, key=tasks.get):
+                    result = task.result()
+                    if result is None:
+                        continue
+                    data = result
+                    if is_valid(result):
+                        return result
+                if len(tasks) < len(providers):
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+        return data
+
+    async def fill_from_providers(self, operation: Callable[[str, List[str]], Awaitable[Dict[str, Any]]], symbols: List[str]) -> Tuple[Dict[str, Decimal], List[str]]:
+        """
+        Get a rate for every symbol, asking each provider in turn only for the symbols still missing.
+        
+        Providers are tried in priority order, healthy ones first, until every
+        symbol has a rate. A provider that fails or misses symbols only leaves
+        those symbols to the next one.
+        
+        Args:
+            operation: Async function receiving the provider ID and the missing symbols, returning rates by symbol
+            symbols: The symbols that need a rate
+            
+        Returns:
+            Tuple[Dict[str, Decimal], List[str]]: The rates found and the symbols no provider could fill
+        """
+        rates: Dict[str, Decimal] = {}
+        missing = list(symbols)
+        for provider in circuit_breakers.order(await get_active_providers()):
+            if not missing:
+                break
+            logger.debug("trying to get %d rates from provider %s", len(missing), provider.id_name)
+            requested = list(missing)
+            result = await self.call_provider(provider, lambda provider_name: operation(provider_name, requested))
+            if not result:
+                continue
+            rates.update({symbol: result[symbol] for symbol in requested if result.get(symbol) is not None})
+            missing = [symbol for symbol in requested if symbol not in rates]
+        return rates, missing
 
     async def get_exchange_rate_data(self, source_currency: str, exchanged_currency: str, valuation_date: str) -> Dict[str, Any]:
         """
         Get exchange rate data, trying internal sources first and falling back to providers.
         
+        Concurrent requests missing the same rate wait for a single provider call.
+        
         Args:
             source_currency: The source currency code
             exchanged_currency: The target currency code
@@ -102,27 +264,122 @@ class GenericAPI:
         if data["rate_value"] is not None:
             return data
 
-        providers_exclude: List[str] = []
-        providers = await get_all_providers()
-        providers_totals = len(providers)
-        count_providers = 0
-
-        while data["rate_value"] is None and count_providers < providers_totals:
-            print(f"trying to get data excluding providers: {providers_exclude}")
-            provider = await get_provider_exchange(providers=providers_exclude)
-            provider_name = str(provider.id_name)
-            data = await self.providers_api.get_historical_rates(valuation_date, source_currency, [exchanged_currency], provider_name)
-            providers_exclude.append(provider.id_name)
-            count_providers += 1
-            data["rate_value"] = data[exchanged_currency]
-            del data[exchanged_currency]
+        provider_data = await single_flight.do(
+            single_flight.make_key("historical-pair", source_currency, [exchanged_currency], valuation_date),
+            lambda: self.call_providers(
+                lambda provider_name: self.providers_api.get_historical_rates(valuation_date, source_currency, [exchanged_currency], provider_name),
+                lambda rates: rates.get(exchanged_currency) is not None
+            )
+        )
+        if provider_data:
+            data = dict(provider_data)
+            data["rate_value"] = data.pop(exchanged_currency, None)
 
         return data
 
-    async def get_currency_rates_list(self, start_date: str, end_date: str, base: str, symbols: str) -> Dict[str, Dict[str, float]]:
+    async def fetch_missing_rates(self, source_currency: str, valuation_date: str, symbols: List[str], semaphore: asyncio.Semaphore) -> Dict[RateKey, Decimal]:
+        """
+        Get the rates of several currencies on one date from the providers, with one call per provider.
+        
+        Args:
+            source_currency: The source currency code
+            valuation_date: The date in YYYY-MM-DD format
+            symbols: The target currency codes
+            semaphore: Limits the number of provider calls made at once
+            
+        Returns:
+            Dict[RateKey, Decimal]: The rates found, by (source, target, date) triple
+        """
+        async with semaphore:
+            rates, _ = await single_flight.do(
+                single_flight.make_key("historical-fill", source_currency, symbols, valuation_date),
+                lambda: self.fill_from_providers(
+                    lambda provider_name, missing_symbols: self.providers_api.get_historical_rates(valuation_date, source_currency, missing_symbols, provider_name),
+                    symbols
+                )
+            )
+        return {(source_currency, symbol, valuation_date): rate_value for symbol, rate_value in rates.items()}
+
+    async def get_exchange_rate_data_bulk(self, triples: List[RateKey]) -> List[Dict[str, Any]]:
+        """
+        Get the exchange rates of many (source, target, date) triples at once.
+        
+        Duplicated triples are looked up once. The internal source resolves them
+        with a few set-based queries, and the missing rates are fetched from the
+        providers with one call per source currency and date, several at once.
+        
+        Args:
+            triples: (source currency, target currency, date in YYYY-MM-DD format) of each rate
+            
+        Returns:
+            List[Dict[str, Any]]: The source currency, target currency, date and rate (None if unavailable)
+                of each triple, in the order of the triples
+        """
+        started = time.perf_counter()
+        unique = list(dict.fromkeys(triples))
+        rates = await self.internal_api.get_rate_values_bulk(unique)
+
+        missing: Dict[Tuple[str, str], List[str]] = {}
+        for source_currency, exchanged_currency, valuation_date in unique:
+            if rates.get((source_currency, exchanged_currency, valuation_date)) is None:
+                missing.setdefault((source_currency, valuation_date), []).append(exchanged_currency)
+        if missing:
+            semaphore = asyncio.Semaphore(settings.BULK_RATES_CONCURRENCY)
+            for provider_rates in await asyncio.gather(*(
+                self.fetch_missing_rates(source_currency, valuation_date, symbols, semaphore)
+                for (source_currency, valuation_date), symbols in missing.items()
+            )):
+                rates.update(provider_rates)
+
+        elapsed = time.perf_counter() - started
+        logger.info("bulk rates: %d triples (%d unique, %d provider calls) in %.3fs, %.0f triples/s",
+                    len(triples), len(unique), len(missing), elapsed, len(triples) / elapsed if elapsed > 0 else 0)
+        return [
+            {"source_currency": source_currency, "exchanged_currency": exchanged_currency,
+             "valuation_date": valuation_date, "rate_value": rates.get((source_currency, exchanged_currency, valuation_date))}
+            for source_currency, exchanged_currency, valuation_date in triples
+        ]
+
+    async def fetch_gap_range(self, gap_range: GapRange, base: str) -> Dict[str, Dict[str, Decimal]]:
+        """
+        Get the rates of a range of missing cells from the providers.
+
+        A single date is fetched with get_historical_rates, a longer range with
+        get_time_series. Both store the rates they get.
+
+        Args:
+            gap_range: The dates and symbols to fetch
+            base: The base currency code
+
+        Returns:
+            Dict[str, Dict[str, Decimal]]: Dictionary of exchange rates for each date, empty if no provider answered
+        """
+        symbols = list(gap_range.symbols)
+
+        if gap_range.start_date == gap_range.end_date:
+            rates = await self.call_providers(
+                lambda provider_name: self.providers_api.get_historical_rates(gap_range.start_date, base, symbols, provider_name),
+                lambda rates: all(rates.get(symbol) is not None for symbol in symbols)
+            )
+            return {gap_range.start_date: rates} if rates else {}
+
+        def fills_gaps(series: Dict[str, Dict[str, Decimal]]) -> bool:
+            return all(series.get(date, {}).get(symbol) is not None for date in gap_range.dates for symbol in symbols)
+
+        series = await self.call_providers(
+            lambda provider_name: self.providers_api.get_time_series(gap_range.start_date, gap_range.end_date, base, symbols, provider_name),
+            fills_gaps
+        )
+        return series or {}
+
+    async def get_currency_rates_list(self, start_date: str, end_date: str, base: str, symbols: str) -> Dict[str, Dict[str, Decimal]]:
         """
         Get currency rates for a date range, trying internal sources first and falling back to providers.
         
+        Only the (date, symbol) cells missing from the internal data are fetched,
+        coalesced into as few contiguous provider calls as possible (see
+        TIME_SERIES_GAP_MERGE_DAYS), and merged into the internal data.
+        
         Args:
             start_date: Start date in YYYY-MM-DD format
             end_date: End date in YYYY-MM-DD format
@@ -130,43 +387,32 @@ class GenericAPI:
             symbols: Comma-separated string of currency codes
             
         Returns:
-            Dict[str, Dict[str, float]]: Dictionary of exchange rates for each date
+            Dict[str, Dict[str, Decimal]]: Dictionary of exchange rates for each date, empty if some rates could not be found
         """
         data = await self.internal_api.get_currency_rates_list(start_date, end_date, base, symbols)
 
-        symbols_list = symbols.split(", ")
-        error = False
-        if data:
-            # check if exists data for all dates
-            for date in data:
-                if not data[date] or set(symbols_list) != set(list(data[date].keys())):
-                    error = True
-                    break
-
-        if error:
-            providers_exclude: List[str] = []
-            providers = await get_all_providers()
-            providers_totals = len(providers)
-            count_providers = 0
-
-            while error and count_providers < providers_totals:
-                print(f"trying to get data excluding providers: {providers_exclude}")
-                provider = await get_provider_exchange(providers=providers_exclude)
-                provider_name = str(provider.id_name)
-                data = await self.providers_api.get_time_series(start_date, end_date, base, symbols_list, provider_name)
-                providers_exclude.append(provider.id_name)
-                count_providers += 1
-                error = False
-                for date in data:
-                    if not data[date] or set(symbols_list) != set(list(data[date].keys())):
-                        error = True
-                        break
-        if error:
+        symbols_list = list(map(str.strip, symbols.split(',')))
+        gaps = find_gaps(data, symbols_list)
+        if not data or not gaps:
+            return data
+
+        gap_ranges = coalesce_gaps(gaps, settings.TIME_SERIES_GAP_MERGE_DAYS)
+        logger.debug("fetching %d missing rates in %d provider calls", sum(map(len, gaps.values())), len(gap_ranges))
+        results = await asyncio.gather(*(self.fetch_gap_range(gap_range, base) for gap_range in gap_ranges))
+
+        for gap_range, series in zip(gap_ranges, results):
+            for date in gap_range.dates:
+                rates = series.get(date, {})
+                for symbol in gaps[date]:
+                    if rates.get(symbol) is not None:
+                        data[date][symbol] = rates[symbol]
+
+        if find_gaps(data, symbols_list):
             return {}
 
         return data
 
-    async def get_convert_amount(self, currency_base: str, currency_to_convert: str, amount: Union[int, float]) -> Dict[str, Any]:
+    async def get_convert_amount(self, currency_base: str, currency_to_convert: str, amount: Decimal) -> Dict[str, Any]:
         """
         Convert an amount between currencies, trying internal sources first and falling back to providers.
         
@@ -182,19 +428,78 @@ class GenericAPI:
 
         if data["value"] is not None:
             return data
+
+        provider_data = await self.call_providers(
+            lambda provider_name: self.providers_api.convert_currency(currency_base, currency_to_convert, amount, provider_name),
+            lambda conversion: conversion.get("value") is not None
+        )
+
+        return provider_data or data
+
+    async def get_convert_amount_batch(self, currency_base: str, currencies_to_convert: List[str], amounts: List[Decimal]) -> Dict[str, Any]:
+        """
+        Convert amounts from one currency into several currencies at their latest rates.
+        
+        The rates are read from the internal source in one lookup of the latest
+        rates (stored or derived from the cross-rate base, no older than
+        LATEST_RATE_MAX_AGE_DAYS), and the missing ones are fetched with one
+        latest rates call, to the next provider only for the rates it missed.
         
-        providers_exclude: List[str] = []
-        providers = await get_all_providers()
-        providers_totals = len(providers)
-        count_providers = 0
+        Args:
+            currency_base: The source currency code
+            currencies_to_convert: The target currency codes
+            amounts: The amounts to convert
+            
+        Returns:
+            Dict[str, Any]: The date, the source currency, the amounts and, for each target currency,
+                the date of its rate, its rate and the converted amounts rounded to 6 decimal places
+                (None if no rate is available)
+        """
+        valuation_date = str(timezone.now().date())
+        latest = await self.internal_api.get_latest_rate_values(currency_base, currencies_to_convert)
+        rates = {symbol: value[1] if value is not None else None for symbol, value in latest.items()}
+        rate_dates = {symbol: value[0] for symbol, value in latest.items() if value is not None}
 
-        while data["value"] is None and count_providers < providers_totals:
-            print(f"trying to get data excluding providers: {providers_exclude}")
-            provider = await get_provider_exchange(providers=providers_exclude)
-            provider_name = str(provider.id_name)
-            data = await self.providers_api.convert_currency(currency_base, currency_to_convert, amount, provider_name)
-            providers_exclude.append(provider.id_name)
-            count_providers += 1
-            data["value"] = data["value"]
+        missing = [symbol for symbol in currencies_to_convert if rates.get(symbol) is None]
+        if missing:
+            provider_rates, _ = await single_flight.do(
+                single_flight.make_key("latest-fill", currency_base, missing, valuation_date),
+                lambda: self.fill_from_providers(
+                    lambda provider_name, missing_symbols: self.providers_api.get_latest_rates(currency_base, missing_symbols, provider_name),
+                    missing
+                )
+            )
+            rates.update(provider_rates)
 
-        return data
+        date_obj = timezone.datetime.strptime(valuation_date, '%Y-%m-%d')
+        return {
+            "timestamp": int(timezone.datetime.timestamp(date_obj)),
+            "date": valuation_date,
+            "from": currency_base,
+            "amounts": amounts,
+            "conversions": {
+                symbol: {
+                    "valuation_date": rate_dates.get(symbol, valuation_date) if rates.get(symbol) is not None else None,
+                    "rate": rates.get(symbol),
+                    "values": [quantize_rate(rates[symbol] * amount) for amount in amounts] if rates.get(symbol) is not None else None,
+                }
+                for symbol in currencies_to_convert
+            },
+        }
+
+_generic_api: Optional[GenericAPI] = None
+
+def get_generic_api() -> GenericAPI:
+    """
+    Get the process-wide GenericAPI instance, creating it on first use.
+
+    The instance holds no per-request state, so views share it instead of
+    building new provider clients on every request.
+
+    Returns:
+        GenericAPI: The shared GenericAPI instance
+    """
+    global _generic_api
+    if _generic_api is None:
+        _generic_api = GenericAPI()
+    return _generic_api
@@ -1,6 +1,7 @@
 import aiohttp
 import asyncio
-from typing import Dict, List, Any, Optional, Union
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple
 
 import sys
 import os
@@ -13,6 +14,9 @@ django.setup()
 
 from django.conf import settings
 from django.utils import timezone
+from backbase_app.external_services.http_session import session_manager
+from backbase_app.api.time_series import assemble_time_series
+from backbase_app.api.decimals import loads_json, quantize_rate, to_decimal, to_rate
 
 class InternalAPI:
     """
@@ -41,11 +45,11 @@ class InternalAPI:
             params: Query parameters for the request
             
         Returns:
-            Dict[str, Any]: The JSON response from the API
+            Dict[str, Any]: The JSON response from the API, with its fractional numbers as Decimal
         """
         url = f"{self.base_url}{endpoint}"
         async with session.get(url, params=params) as response:
-            return await response.json()
+            return await response.json(loads=loads_json)
 
     async def get_exchange_rate_data(self, source_currency: str, exchanged_currency: str, valuation_date: str) -> Dict[str, Any]:
         """
@@ -60,10 +64,9 @@ class InternalAPI:
             Dict[str, Any]: The exchange rate data from the API
         """
         params = {'source_currency': source_currency, 'exchanged_currency': exchanged_currency, 'valuation_date': valuation_date}
-        async with aiohttp.ClientSession() as session:
-            return await self.fetch(session, 'currency_exchange_api', params)
+        return await self.fetch(session_manager.get_session(), 'currency_exchange_api', params)
 
-    async def get_currency_rates_list(self, start_date: str, end_date: str, base: str, symbols: str) -> Dict[str, Dict[str, float]]:
+    async def get_currency_rates_list(self, start_date: str, end_date: str, base: str, symbols: str) -> Dict[str, Dict[str, Decimal]]:
         """
         Get a list of currency rates for a date range.
         
@@ -74,33 +77,82 @@ class InternalAPI:
             symbols: Comma-separated string of target currency codes
             
         Returns:
-            Dict[str, Dict[str, float]]: Dictionary of exchange rates for each date and currency
+            Dict[str, Dict[str, Decimal]]: Dictionary of exchange rates for each date and currency
         """
         params = {'start_date': start_date, 'end_date': end_date, 'base': base, 'symbols': symbols}
 
-        async with aiohttp.ClientSession() as session:
-            data = await self.fetch(session, 'currency_rates_list_api', params)
+        data = await self.fetch(session_manager.get_session(), 'currency_rates_list_api', params)
 
-        current_date = start_date
-        current_date = timezone.datetime.strptime(current_date, '%Y-%m-%d')
-        end_date = timezone.datetime.strptime(end_date, '%Y-%m-%d')
-        date_list: List[str] = []
-        data_return: Dict[str, Dict[str, float]] = {}
+        # the endpoint returns the newest date first, the assembler needs the oldest first
+        if data and data[0]["valuation_date"] > data[-1]["valuation_date"]:
+            data = reversed(data)
+        rows = ((rate["valuation_date"], rate["exchanged_currency__symbol"], to_rate(rate["rate_value"])) for rate in data)
+
+        return dict(assemble_time_series(rows, start_date, end_date))
+
+    async def get_rate_values(self, source_currency: str, exchanged_currencies: List[str], valuation_date: str) -> Dict[str, Optional[Decimal]]:
+        """
+        Get the stored exchange rates from one currency to several currencies on a date, in one request.
         
-        while current_date <= end_date:
-            date_list.append(current_date.strftime('%Y-%m-%d'))
-            current_date += timezone.timedelta(days=1)
-        for date in date_list:
-            data_return[date] = {}
-            for rate in data:
-                if rate["valuation_date"] == date:
-                    data_return[date][rate["exchanged_currency__symbol"]] = rate["rate_value"]
+        Args:
+            source_currency: The source currency code
+            exchanged_currencies: The target currency codes
+            valuation_date: The date in YYYY-MM-DD format
+            
+        Returns:
+            Dict[str, Optional[Decimal]]: The rate of each target currency, None if it is not stored
+        """
+        rates = (await self.get_currency_rates_list(valuation_date, valuation_date, source_currency, ','.join(exchanged_currencies)))[valuation_date]
+        return {exchanged_currency: rates.get(exchanged_currency) for exchanged_currency in exchanged_currencies}
 
-        return data_return
+    async def get_rate_values_bulk(self, triples: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Optional[Decimal]]:
+        """
+        Get the stored exchange rates of many (source, target, date) triples, with one request per source and date.
+        
+        Args:
+            triples: (source currency, target currency, date in YYYY-MM-DD format) of each rate
+            
+        Returns:
+            Dict[Tuple[str, str, str], Optional[Decimal]]: The rate of each triple, None if it is not stored
+        """
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        for source_currency, exchanged_currency, valuation_date in triples:
+            groups.setdefault((source_currency, valuation_date), []).append(exchanged_currency)
+        results = await asyncio.gather(*(
+            self.get_rate_values(source_currency, exchanged_currencies, valuation_date)
+            for (source_currency, valuation_date), exchanged_currencies in groups.items()
+        ))
+        return {
+            (source_currency, exchanged_currency, valuation_date): rates[exchanged_currency]
+            for (source_currency, valuation_date), rates in zip(groups, results)
+            for exchanged_currency in rates
+        }
+
+    async def get_latest_rate_values(self, source_currency: str, exchanged_currencies: List[str]) -> Dict[str, Optional[Tuple[str, Decimal]]]:
+        """
+        Get the newest rates from one currency to several currencies, no older than LATEST_RATE_MAX_AGE_DAYS, in one request.
+        
+        Args:
+            source_currency: The source currency code
+            exchanged_currencies: The target currency codes
+            
+        Returns:
+            Dict[str, Optional[Tuple[str, Decimal]]]: The date and rate of each target currency, None if it is not available
+        """
+        params = {'source_currency': source_currency, 'symbols': ','.join(exchanged_currencies)}
+        data = await self.fetch(session_manager.get_session(), 'latest_rate_api', params)
+        return {
+            exchanged_currency: (data[exchanged_currency]["valuation_date"], to_rate(data[exchanged_currency]["rate_value"]))
+            if data.get(exchanged_currency) else None
+            for exchanged_currency in exchanged_currencies
+        }
 
-    async def get_convert_amount(self, currency_base: str, currency_to_convert: str, amount: Union[int, float]) -> Dict[str, Any]:
+    async def get_convert_amount(self, currency_base: str, currency_to_convert: str, amount: Decimal) -> Dict[str, Any]:
         """
-        Convert an amount between currencies using current exchange rates.
+        Convert an amount between currencies using the latest rate of the pair.
+        
+        The rate may be up to LATEST_RATE_MAX_AGE_DAYS old, the date of the
+        response is the date of the rate.
         
         Args:
             currency_base: The source currency code
@@ -108,20 +160,19 @@ class InternalAPI:
             amount: The amount to convert
             
         Returns:
-            Dict[str, Any]: Dictionary containing conversion details including timestamp, date, currencies, and converted value
+            Dict[str, Any]: Dictionary containing conversion details including timestamp, date, currencies, and
+                converted value rounded to 6 decimal places
         """
         source_currency = currency_base
         exchanged_currency = currency_to_convert
         valuation_date = str(timezone.now().date())
 
-        params = {'source_currency': source_currency, 'exchanged_currency': exchanged_currency, 'valuation_date': valuation_date}
-
-        async with aiohttp.ClientSession() as session:
-            data = await self.fetch(session, 'currency_exchange_api', params)
+        latest = (await self.get_latest_rate_values(source_currency, [exchanged_currency]))[exchanged_currency]
 
-        rate_value: Optional[float] = None
-        if data["rate_value"] is not None:
-            rate_value = float(data["rate_value"]) * float(amount)
+        rate_value: Optional[Decimal] = None
+        if latest is not None:
+            valuation_date, latest_rate = latest
+            rate_value = quantize_rate(latest_rate * to_decimal(amount))
 
         date_obj = timezone.datetime.strptime(valuation_date, '%Y-%m-%d')
         data_return = {
@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+class ProviderConfig(NamedTuple):
+    """
+    Configuration of an active provider, copied from ProviderExchange.
+
+    Attributes:
+        id_name (str): Unique identifier for the provider
+        name (str): Display name of the provider
+        priority (int): Priority order for the provider (higher number = higher priority)
+        timeout (float): Seconds to wait for an answer of the provider
+        hedge_delay (float): Seconds to wait before also asking the next provider
+    """
+    id_name: str
+    name: str
+    priority: int
+    timeout: float
+    hedge_delay: float
+
+class ProviderSnapshot(NamedTuple):
+    """
+    Immutable list of the active providers at a given version.
+
+    Attributes:
+        version (int): Version of the registry the snapshot was loaded at
+        providers (Tuple[ProviderConfig, ...]): Active providers, highest priority first
+        loaded_at (float): Monotonic time the snapshot was loaded at
+    """
+    version: int
+    providers: Tuple[ProviderConfig, ...]
+    loaded_at: float
+
+class ProviderRegistry:
+    """
+    In-memory registry of the exchange rate providers.
+
+    Provider configuration only changes through the admin, so the active
+    providers are loaded once into a versioned snapshot that GenericAPI walks in
+    priority order. The post_save/post_delete signals of ProviderExchange bump
+    the version, and snapshots older than PROVIDER_REGISTRY_TTL seconds are
+    reloaded so changes made by another process are picked up too.
+
+    The registry also maps provider IDs to their API client classes: the ones
+    listed in the PROVIDER_CLIENTS setting plus any added with register_client.
+
+    Attributes:
+        version (int): Current version, bumped on every provider change
+        snapshot (Optional[ProviderSnapshot]): The loaded snapshot, None until first use
+        clients (Dict[str, Any]): Client classes registered in code, by provider ID
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the registry without loading the providers.
+        """
+        self.version: int = 0
+        self.snapshot: Optional[ProviderSnapshot] = None
+        self.clients: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def load(self) -> ProviderSnapshot:
+        """
+        Load the active providers into a new snapshot.
+
+        Returns:
+            ProviderSnapshot: The loaded snapshot
+        """
+        from backbase_app.models import ProviderExchange
+
+        version = self.version
+        providers = tuple(
+            ProviderConfig(*values)
+            for values in ProviderExchange.objects.filter(activated=True).order_by('-priority').values_list(
+                'id_name', 'name', 'priority', 'timeout', 'hedge_delay'
+            )
+        )
+        snapshot = ProviderSnapshot(version, providers, time.monotonic())
+        if version == self.version:
+            self.snapshot = snapshot
+        return snapshot
+
+    def get_cached_snapshot(self) -> Optional[ProviderSnapshot]:
+        """
+        Get the current snapshot if it is loaded and fresh, without querying the database.
+
+        Returns:
+            Optional[ProviderSnapshot]: The current snapshot or None if it must be loaded
+        """
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version != self.version:
+            return None
+        if time.monotonic() - snapshot.loaded_at > settings.PROVIDER_REGISTRY_TTL:
+            return None
+        return snapshot
+
+    def get_snapshot(self) -> ProviderSnapshot:
+        """
+        Get the current snapshot, loading it when missing or stale.
+
+        Returns:
+            ProviderSnapshot: The current snapshot
+        """
+        snapshot = self.get_cached_snapshot()
+        if snapshot is None:
+            with self.lock:
+                snapshot = self.get_cached_snapshot() or self.load()
+        return snapshot
+
+    def invalidate(self) -> None:
+        """
+        Bump the version so the next lookup reloads the providers.
+        """
+        with self.lock:
+            self.version += 1
+            self.snapshot = None
+
+    def register_client(self, id_name: str, client_class: Union[str, Any]) -> None:
+        """
+        Register the API client class of a provider.
+
+        Args:
+            id_name: The provider ID, as in ProviderExchange.id_name
+            client_class: The client class or its dotted import path
+        """
+        self.clients[id_name] = client_class
+
+    def get_client_classes(self) -> Dict[str, Any]:
+        """
+        Get the API client class of every known provider.
+
+        Returns:
+            Dict[str, Any]: Client class for each provider ID
+        """
+        client_classes = {**settings.PROVIDER_CLIENTS, **self.clients}
+        return {
+            id_name: import_string(client_class) if isinstance(client_class, str) else client_class
+            for id_name, client_class in client_classes.items()
+        }
+
+provider_registry = ProviderRegistry()
@@ -7,18 +7,32 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
 import django
 django.setup()
 
-from backbase_app.models import CurrencyExchangeRate, Currency
-from backbase_app.external_services.api_currencybeacon import CurrencyBeaconAPI
-from backbase_app.external_services.api_mock import MockAPI
-from typing import Dict, List, Optional, Any, Union, Callable
+from backbase_app.models import CurrencyExchangeRate
+from backbase_app.api.provider_registry import provider_registry
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.bulk_load import insert_rates
+from backbase_app.api.decimals import quantize_rate, to_decimal, to_rate
+from typing import Dict, Iterable, List, Optional, Any, Callable, Set, Tuple, Union
 import asyncio
+import logging
+import threading
 from datetime import date
+from decimal import Decimal
 from asgiref.sync import sync_to_async
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
+_thread_loops = threading.local()
+
 def run_asyncio_task(async_func: Callable, *args: Any, **kwargs: Any) -> Any:
     """
-    Run an async function in a new event loop.
+    Run an async function in the long-lived event loop of the current thread.
+    
+    The loop is reused across calls so the pooled HTTP sessions bound to it
+    keep their connections alive between tasks.
     
     Args:
         async_func: The async function to run
@@ -28,14 +42,79 @@ def run_asyncio_task(async_func: Callable, *args: Any, **kwargs: Any) -> Any:
     Returns:
         Any: The result of the async function
     """
-    loop = asyncio.new_event_loop()
+    loop = getattr(_thread_loops, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_loops.loop = loop
     asyncio.set_event_loop(loop)
     return loop.run_until_complete(async_func(*args, **kwargs))
 
 
 
+# (base currency, target currency, valuation date as a date object or in YYYY-MM-DD format, rate) of a provider rate
+RateCell = Tuple[str, str, Union[str, date], Optional[Decimal]]
+
+def build_rate_rows(cells: Iterable[RateCell]) -> Tuple[List[CurrencyExchangeRate], List[RateCell]]:
+    """
+    Build the CurrencyExchangeRate rows of provider rates, resolving every currency with one registry lookup.
+    
+    Cells without a rate or whose currencies are not registered are skipped.
+    
+    Args:
+        cells: The rates to store
+        
+    Returns:
+        Tuple[List[CurrencyExchangeRate], List[RateCell]]: The rows, and the cells they were built from with their
+            dates as date objects
+    """
+    cells = list(cells)
+    codes = {code for base, symbol, _, _ in cells for code in (base, symbol)}
+    currencies = currency_registry.get_ids(codes)
+    for code in sorted(codes - currencies.keys()):
+        logger.warning("Currency %s does not exist", code)
+
+    rows: List[CurrencyExchangeRate] = []
+    stored: List[RateCell] = []
+    for base, symbol, valuation_date, rate_value in cells:
+        if rate_value is None or base not in currencies or symbol not in currencies:
+            continue
+        if isinstance(valuation_date, str):
+            valuation_date = date.fromisoformat(valuation_date)
+        rows.append(CurrencyExchangeRate(
+            source_currency_id=currencies[base],
+            exchanged_currency_id=currencies[symbol],
+            valuation_date=valuation_date,
+            rate_value=rate_value
+        ))
+        stored.append((base, symbol, valuation_date, rate_value))
+    return rows, stored
+
+def store_rate_rows(rows: List[CurrencyExchangeRate], cells: List[RateCell], replace: bool = True) -> None:
+    """
+    Write rate rows in one transaction, then drop the cached rates and cross-rate vectors they change.
+    
+    Both write paths refresh LatestRate in their transaction.
+    
+    Args:
+        rows: The rows, built with build_rate_rows
+        cells: The cells the rows were built from
+        replace: Whether stored rates are replaced (bulk upsert) or kept (insert, with COPY for large
+            batches on PostgreSQL)
+    """
+    if replace:
+        CurrencyExchangeRate.objects.bulk_upsert(rows)
+    else:
+        insert_rates(rows)
+
+    rate_cache.invalidate_many(rate_cache.make_key(base, symbol, valuation_date) for base, symbol, valuation_date, _ in cells)
+    dates_by_base: Dict[str, Set[Union[str, date]]] = {}
+    for base, _, valuation_date, _ in cells:
+        dates_by_base.setdefault(base, set()).add(valuation_date)
+    for base, valuation_dates in dates_by_base.items():
+        cross_rates.invalidate(base, valuation_dates)
+
 @sync_to_async
-def save_data_rate(base: str, symbol: str, rate_value: float, date: Optional[date] = None) -> Dict[str, Optional[float]]:
+def save_data_rate(base: str, symbol: str, rate_value: Decimal, date: Optional[date] = None) -> Dict[str, Optional[Decimal]]:
     """
     Save or update a currency exchange rate in the database.
     
@@ -46,153 +125,132 @@ def save_data_rate(base: str, symbol: str, rate_value: float, date: Optional[dat
         date: Optional date for the exchange rate (defaults to current date)
         
     Returns:
-        Dict[str, Optional[float]]: Dictionary containing the saved rate value or None if error occurs
+        Dict[str, Optional[Decimal]]: Dictionary containing the saved rate value or None if error occurs
     """
-    source_currency_obj = Currency.objects.get(symbol=base)
-    exchanged_currency_obj = Currency.objects.get(symbol=symbol)
-
-    try:
-        if not date:
-            date = timezone.now().date()
-
-        """ # other method with similar results
-        try:
-            CurrencyExchangeRate.objects.create(
-                    source_currency=source_currency_obj,
-                    exchanged_currency=exchanged_currency_obj,
-                    valuation_date=date,
-                    rate_value=rate_value
-                )
-        except Exception as e:
-            #print(e)
-            pass
-        """
-
-        currency_exchange_exists = CurrencyExchangeRate.objects.filter(
-            source_currency=source_currency_obj,
-            exchanged_currency=exchanged_currency_obj,
-            valuation_date=date,
-        ).first()
-
-        if currency_exchange_exists:
-            currency_exchange_exists.rate_value = float(rate_value)
-            currency_exchange_exists.save()
-        else:
-            CurrencyExchangeRate.objects.create(
-                source_currency=source_currency_obj,
-                exchanged_currency=exchanged_currency_obj,
-                valuation_date=date,
-                rate_value=rate_value
-            )
-
-        return {"rate_value": rate_value}
-    except Exception as e:
-        print(e)
-
-    return {"rate_value": None}
+    return {"rate_value": save_data_rates.func(base, {symbol: rate_value}, date)[symbol]}
 
 @sync_to_async
-def save_data_time_series(data: Dict[str, Dict[str, float]], base: str) -> None:
+def save_data_rates(base: str, rates: Dict[str, Decimal], date: Optional[date] = None) -> Dict[str, Optional[Decimal]]:
     """
-    Save multiple currency exchange rates for a time series in the database.
+    Save or update the rates of a whole provider response in one transaction.
+    
+    Currencies are resolved through the currency registry and the rates are
+    written with a single bulk upsert on the unique (source_currency,
+    exchanged_currency, valuation_date) key instead of one save per symbol.
     
     Args:
-        data: Dictionary containing exchange rates for different dates and currencies
         base: The base currency code
+        rates: Dictionary of exchange rates for each target currency code
+        date: Optional date for the exchange rates (defaults to current date)
+        
+    Returns:
+        Dict[str, Optional[Decimal]]: The saved rate value for each symbol, None for symbols that could not be saved
     """
+    valuation_date = date or timezone.now().date()
+    data_rate_value: Dict[str, Optional[Decimal]] = {symbol: None for symbol in rates}
+    rows, cells = build_rate_rows((base, symbol, valuation_date, rate_value) for symbol, rate_value in rates.items())
+    try:
+        store_rate_rows(rows, cells)
+    except Exception:
+        logger.exception("could not save the %s rates of %s", base, valuation_date)
+        return data_rate_value
 
-    data_list = []
-    base_currency_obj = Currency.objects.get(symbol=base)
-    for date_str, symbols in data.items():
-        date_obj = timezone.datetime.strptime(date_str, '%Y-%m-%d')
-        for symbol, rate_value in symbols.items():
-            symbol_obj = Currency.objects.get(symbol=symbol)
-            data_list.append(
-                CurrencyExchangeRate(
-                    source_currency=base_currency_obj,
-                    exchanged_currency=symbol_obj,
-                    valuation_date=date_obj,
-                    rate_value=float(rate_value)
-                )
-            )
-    CurrencyExchangeRate.objects.bulk_create(data_list, batch_size=100, ignore_conflicts=True)
+    data_rate_value.update({symbol: rate_value for _, symbol, _, rate_value in cells})
+    return data_rate_value
 
 @sync_to_async
-def save_data_convert(from_currency: str, to_currency: str, rate_value: float) -> None:
+def save_data_snapshot(snapshot: Dict[str, Dict[str, Decimal]], date: Optional[date] = None) -> int:
     """
-    Save a currency conversion rate in the database.
+    Save or update the rates of several base currencies for one date in a single transaction.
     
     Args:
-        from_currency: The source currency code
-        to_currency: The target currency code
-        rate_value: The conversion rate value
+        snapshot: Dictionary of exchange rates for each target currency, for each base currency
+        date: Optional date for the exchange rates (defaults to current date)
+        
+    Returns:
+        int: Number of rates stored
     """
-    source_currency_obj = Currency.objects.get(symbol=from_currency)
-    exchanged_currency_obj = Currency.objects.get(symbol=to_currency)
+    valuation_date = date or timezone.now().date()
+    rows, cells = build_rate_rows(
+        (base, symbol, valuation_date, rate_value) for base, rates in snapshot.items() for symbol, rate_value in rates.items()
+    )
+    store_rate_rows(rows, cells)
+    return len(rows)
 
-    try:
-        CurrencyExchangeRate.objects.create(
-            source_currency=source_currency_obj,
-            exchanged_currency=exchanged_currency_obj,
-            rate_value=rate_value
-        )
-    except Exception as e:
-        pass
+@sync_to_async
+def save_data_time_series(data: Dict[str, Dict[str, Decimal]], base: str, replace: bool = False) -> int:
+    """
+    Save the rates of a time series in the database.
+    
+    By default rates already stored are kept, and large series are loaded with
+    COPY on PostgreSQL. With replace, stored rates are replaced by one bulk upsert.
+    
+    Args:
+        data: Dictionary containing exchange rates for different dates and currencies
+        base: The base currency code
+        replace: Whether stored rates are replaced
+        
+    Returns:
+        int: Number of rates stored
+    """
+    rows, cells = build_rate_rows(
+        (base, symbol, date_str, rate_value) for date_str, rates in data.items() for symbol, rate_value in rates.items()
+    )
+    store_rate_rows(rows, cells, replace=replace)
+    return len(rows)
 
 class ProvidersAPI:
     """
     A class that manages interactions with different currency exchange rate providers.
     
-    This class coordinates between different API providers (Mock and CurrencyBeacon)
-    and handles saving the exchange rate data to the database.
+    This class coordinates between the API providers registered in the provider
+    registry (PROVIDER_CLIENTS setting) and handles saving the exchange rate data
+    to the database.
     
     Attributes:
-        mock_api (MockAPI): Instance of the mock API client
-        cb_api (CurrencyBeaconAPI): Instance of the CurrencyBeacon API client
         provider_map (Dict[str, Any]): Mapping of provider IDs to their API instances
     """
     
     def __init__(self) -> None:
         """
-        Initialize the ProvidersAPI with available API clients.
+        Initialize the ProvidersAPI with an instance of every registered API client.
         """
-        self.mock_api: MockAPI = MockAPI()
-        self.cb_api: CurrencyBeaconAPI = CurrencyBeaconAPI()
         self.provider_map: Dict[str, Any] = {
-            "MC": self.mock_api,
-            "CB": self.cb_api
+            id_name: client_class()
+            for id_name, client_class in provider_registry.get_client_classes().items()
         }
 
-    async def get_latest_rates(self, base: str, symbols: List[str], provider: str) -> Dict[str, Optional[float]]:
+    async def get_latest_rates(self, base: str, symbols: List[str], provider: str, save_data: bool = True) -> Dict[str, Optional[Decimal]]:
         """
-        Get latest exchange rates from a specific provider and save them to the database.
+        Get latest exchange rates from a specific provider and save them to the database in one bulk upsert.
         
         Args:
             base: The base currency code
             symbols: List of target currency codes
             provider: The provider ID to use
+            save_data: Whether to save the rates, callers storing several responses at once pass False
             
         Returns:
-            Dict[str, Optional[float]]: Dictionary of exchange rates for each currency
+            Dict[str, Optional[Decimal]]: Dictionary of exchange rates for each currency, None for symbols
+                missing in the provider response or that could not be saved
         """
         data = await self.provider_map[provider].get_latest_rates(base, symbols)
-        data_rate_value: Dict[str, Optional[float]] = {}
+        data_rate_value: Dict[str, Optional[Decimal]] = {}
+        if data and not save_data:
+            return {symbol: to_rate(data["rates"][symbol]) if data["rates"].get(symbol) is not None else None for symbol in symbols}
         if data:
-            print(f"save data in database with provider {provider}")
-            for symbol in symbols:
-                rate_value = float(data["rates"][symbol])
-                rate_value_symbol = await save_data_rate(base, symbol, rate_value)
-                if not rate_value_symbol:
-                    print(f"Error to save in database with provider {provider}")
-                    data_rate_value[symbol] = None
-                    continue
-                data_rate_value[symbol] = rate_value_symbol["rate_value"]
+            logger.debug("save data in database with provider %s", provider)
+            rates = {symbol: to_rate(data["rates"][symbol]) for symbol in symbols if symbol in data["rates"]}
+            data_rate_value = {symbol: None for symbol in symbols}
+            data_rate_value.update(await save_data_rates(base, rates))
+            if None in data_rate_value.values():
+                logger.warning("Error to save in database with provider %s", provider)
 
         return data_rate_value
 
-    async def get_historical_rates(self, date: str, base: str, symbols: List[str], provider: str) -> Dict[str, Optional[float]]:
+    async def get_historical_rates(self, date: str, base: str, symbols: List[str], provider: str) -> Dict[str, Optional[Decimal]]:
         """
-        Get historical exchange rates from a specific provider and save them to the database.
+        Get historical exchange rates from a specific provider and save them to the database in one bulk upsert.
         
         Args:
             date: The date in YYYY-MM-DD format
@@ -201,24 +259,22 @@ class ProvidersAPI:
             provider: The provider ID to use
             
         Returns:
-            Dict[str, Optional[float]]: Dictionary of exchange rates for each currency
+            Dict[str, Optional[Decimal]]: Dictionary of exchange rates for each currency, None for symbols
+                missing in the provider response or that could not be saved
         """
         data = await self.provider_map[provider].get_historical_rates(date, base, symbols)
-        data_rate_value: Dict[str, Optional[float]] = {}
+        data_rate_value: Dict[str, Optional[Decimal]] = {}
         if data:
-            print(f"save data in database with provider {provider}")
-            for symbol in symbols:
-                rate_value = float(data["rates"][symbol])
-                rate_value_symbol = await save_data_rate(base, symbol, rate_value, date)
-                if not rate_value_symbol:
-                    print(f"Error to save in database with provider {provider}")
-                    data_rate_value[symbol] = None
-                    continue
-                data_rate_value[symbol] = rate_value_symbol["rate_value"]
+            logger.debug("save data in database with provider %s", provider)
+            rates = {symbol: to_rate(data["rates"][symbol]) for symbol in symbols if symbol in data["rates"]}
+            data_rate_value = {symbol: None for symbol in symbols}
+            data_rate_value.update(await save_data_rates(base, rates, date))
+            if None in data_rate_value.values():
+                logger.warning("Error to save in database with provider %s", provider)
 
         return data_rate_value
 
-    async def convert_currency(self, from_currency: str, to_currency: str, amount: Union[int, float], provider: str) -> Dict[str, Any]:
+    async def convert_currency(self, from_currency: str, to_currency: str, amount: Decimal, provider: str) -> Dict[str, Any]:
         """
         Convert an amount between currencies using a specific provider.
         
@@ -229,17 +285,21 @@ class ProvidersAPI:
             provider: The provider ID to use
             
         Returns:
-            Dict[str, Any]: The conversion result
+            Dict[str, Any]: The conversion result, with the amount and the converted value as Decimal
         """
-        data = await self.provider_map[provider].convert_currency(from_currency, to_currency, amount)
+        data = dict(await self.provider_map[provider].convert_currency(from_currency, to_currency, amount))
+        value = to_decimal(data["value"])
+        data["amount"] = amount
+        data["value"] = quantize_rate(value)
 
-        rate_value = float(data["value"]/amount)
+        # the rate is derived from the unrounded value, rounding it first would lose the rate of small amounts
+        rate_value = quantize_rate(value / amount)
 
-        await save_data_convert(from_currency, to_currency, rate_value)
+        await save_data_rate(from_currency, to_currency, rate_value)
 
         return data
 
-    async def get_time_series(self, start_date: str, end_date: str, base: str, symbols: List[str], provider: str, save_data: bool = True) -> Dict[str, Dict[str, float]]:
+    async def get_time_series(self, start_date: str, end_date: str, base: str, symbols: List[str], provider: str, save_data: bool = True) -> Dict[str, Dict[str, Decimal]]:
         """
         Get exchange rates for a date range from a specific provider.
         
@@ -251,9 +311,10 @@ class ProvidersAPI:
             provider: The provider ID to use
             
         Returns:
-            Dict[str, Dict[str, float]]: Dictionary of exchange rates for each date and currency
+            Dict[str, Dict[str, Decimal]]: Dictionary of exchange rates for each date and currency
         """
         data = await self.provider_map[provider].get_time_series(start_date, end_date, base, symbols)
+        data = {date: {symbol: to_rate(rate_value) for symbol, rate_value in rates.items() if rate_value is not None} for date, rates in data.items()}
         if save_data:
             await save_data_time_series(data, base)
         return data
@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+RateKey = Tuple[str, str, str]
+
+class RateCache:
+    """
+    Read-through cache of exchange rates keyed by (source, exchanged, valuation_date).
+
+    The first tier is a bounded in-process LRU. Rates of past dates never change
+    once stored, so they are kept for RATE_CACHE_TTL_HISTORY seconds, while rates
+    of today (or later) expire after RATE_CACHE_TTL_TODAY seconds. When
+    RATE_CACHE_SHARED_ALIAS names a Django cache, it is used as a second tier
+    shared by every web and Celery process.
+
+    Attributes:
+        max_entries (int): Maximum number of rates kept in process
+        ttl_today (float): Seconds a rate of today is kept
+        ttl_history (float): Seconds a rate of a past date is kept
+        shared_alias (Optional[str]): Alias of the shared Django cache, None to disable it
+        entries (OrderedDict): In-process entries in LRU order, mapping a key to (expires_at, rate_value)
+        counters (Dict[str, int]): Hit, miss and eviction counters
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_today: Optional[float] = None,
+                 ttl_history: Optional[float] = None, shared_alias: Optional[str] = None) -> None:
+        """
+        Initialize the cache, using the RATE_CACHE_* settings for missing arguments.
+        """
+        self.max_entries: int = max_entries if max_entries is not None else settings.RATE_CACHE_MAX_ENTRIES
+        self.ttl_today: float = ttl_today if ttl_today is not None else settings.RATE_CACHE_TTL_TODAY
+        self.ttl_history: float = ttl_history if ttl_history is not None else settings.RATE_CACHE_TTL_HISTORY
+        self.shared_alias: Optional[str] = shared_alias if shared_alias is not None else settings.RATE_CACHE_SHARED_ALIAS
+        self.entries: "OrderedDict[RateKey, Tuple[float, Decimal]]" = OrderedDict()
+        self.counters: Dict[str, int] = {"hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(source_currency: str, exchanged_currency: str, valuation_date: Union[str, date]) -> RateKey:
+        """
+        Build the cache key of a rate.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+
+        Returns:
+            RateKey: The cache key
+        """
+        return (source_currency, exchanged_currency, str(valuation_date))
+
+    @staticmethod
+    def shared_key(key: RateKey) -> str:
+        """
+        Build the key of a rate in the shared cache.
+
+        Args:
+            key: The in-process cache key
+
+        Returns:
+            str: The shared cache key
+        """
+        return "rate:" + ":".join(key)
+
+    def ttl(self, key: RateKey) -> float:
+        """
+        Get the time to live of a rate, long for past dates and short for today.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            float: Seconds the rate is kept
+        """
+        if key[2] < str(timezone.now().date()):
+            return self.ttl_history
+        return self.ttl_today
+
+    @property
+    def shared_cache(self) -> Any:
+        """
+        Get the shared Django cache, None if it is disabled.
+        """
+        if not self.shared_alias:
+            return None
+        return caches[self.shared_alias]
+
+    def get(self, source_currency: str, exchanged_currency: str, valuation_date: Union[str, date]) -> Optional[Decimal]:
+        """
+        Get a cached rate, looking in process first and then in the shared cache.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+
+        Returns:
+            Optional[Decimal]: The cached rate or None on a miss
+        """
+        key = self.make_key(source_currency, exchanged_currency, valuation_date)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return entry[1]
+                del self.entries[key]
+
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            rate_value = shared_cache.get(self.shared_key(key))
+            if rate_value is not None:
+                self.store(key, rate_value)
+                with self.lock:
+                    self.counters["shared_hits"] += 1
+                return rate_value
+
+        with self.lock:
+            self.counters["misses"] += 1
+        return None
+
+    def store(self, key: RateKey, rate_value: Decimal) -> None:
+        """
+        Store a rate in the in-process tier, evicting the least recently used one when full.
+
+        Args:
+            key: The cache key
+            rate_value: The exchange rate
+        """
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl(key), rate_value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def set(self, source_currency: str, exchanged_currency: str, valuation_date: Union[str, date], rate_value: Decimal) -> None:
+        """
+        Store a rate in every tier.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+            rate_value: The exchange rate
+        """
+        key = self.make_key(source_currency, exchanged_currency, valuation_date)
+        self.store(key, rate_value)
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            shared_cache.set(self.shared_key(key), rate_value, timeout=self.ttl(key))
+
+    def get_or_load(self, source_currency: str, exchanged_currency: str, valuation_date: Union[str, date],
+                    loader: Callable[[], Optional[Decimal]]) -> Optional[Decimal]:
+        """
+        Get a rate from the cache, loading and caching it on a miss.
+
+        Missing rates are not cached, so a rate stored later is found on the next call.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+            loader: Function that reads the rate from the database
+
+        Returns:
+            Optional[Decimal]: The exchange rate or None if it is not stored
+        """
+        rate_value = self.get(source_currency, exchanged_currency, valuation_date)
+        if rate_value is None:
+            rate_value = loader()
+            if rate_value is not None:
+                self.set(source_currency, exchanged_currency, valuation_date, rate_value)
+        return rate_value
+
+    def invalidate_many(self, keys: Iterable[RateKey]) -> None:
+        """
+        Remove rates from every tier after they were written.
+
+        Args:
+            keys: Cache keys built with make_key
+        """
+        keys = list(keys)
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        shared_cache = self.shared_cache
+        if shared_cache is not None and keys:
+            shared_cache.delete_many([self.shared_key(key) for key in keys])
+
+    def invalidate(self, source_currency: str, exchanged_currency: str, valuation_date: Union[str, date]) -> None:
+        """
+        Remove a rate from every tier after it was written.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date as a date object or in YYYY-MM-DD format
+        """
+        self.invalidate_many([self.make_key(source_currency, exchanged_currency, valuation_date)])
+
+    def clear(self) -> None:
+        """
+        Remove every in-process entry and reset the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters, used to size the cache.
+
+        Returns:
+            Dict[str, Any]: Hits, shared hits, misses, evictions, current size and hit ratio
+        """
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.counters)
+            stats["size"] = len(self.entries)
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["shared_hits"]) / lookups, 4) if lookups else None
+        return stats
+
+rate_cache = RateCache()
@@ -0,0 +1,399 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from backbase_app.models import CurrencyExchangeRate, LatestRate
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.time_series import assemble_time_series, assemble_time_series_async
+from backbase_app.api.decimals import quantize_rate, to_decimal
+from backbase_app.streaming import iter_chunks
+from decimal import Decimal
+from datetime import timedelta
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+RateKey = Tuple[str, str, str]
+LatestRateValue = Tuple[str, Decimal]
+
+@sync_to_async
+def get_rate_value(source_currency: str, exchanged_currency: str, valuation_date: str) -> Optional[Decimal]:
+    """
+    Get the exchange rate for a currency pair and date, through the rate cache.
+
+    When the pair is not stored, the rate is derived from the rates of the
+    cross-rate base currency for that date.
+
+    Args:
+        source_currency: The source currency code
+        exchanged_currency: The target currency code
+        valuation_date: The date in YYYY-MM-DD format
+
+    Returns:
+        Optional[Decimal]: The exchange rate or None if it is not stored
+    """
+    rate_value = rate_cache.get_or_load(
+        source_currency, exchanged_currency, valuation_date,
+        lambda: next(iter(CurrencyExchangeRate.objects.filter(
+            source_currency_id=currency_registry.find_id(source_currency),
+            exchanged_currency_id=currency_registry.find_id(exchanged_currency),
+            valuation_date=valuation_date
+        ).values_list('rate_value', flat=True)[:1]), None)
+    )
+    if rate_value is None:
+        rate_value = cross_rates.rate(source_currency, exchanged_currency, valuation_date)
+    return rate_value
+
+@sync_to_async
+def get_rate_values(source_currency: str, exchanged_currencies: List[str], valuation_date: str) -> Dict[str, Optional[Decimal]]:
+    """
+    Get the exchange rates from one currency to several currencies on a date.
+
+    Rates missing from the rate cache are read with a single query, and the
+    pairs that are not stored are derived from the rates of the cross-rate base.
+
+    Args:
+        source_currency: The source currency code
+        exchanged_currencies: The target currency codes
+        valuation_date: The date in YYYY-MM-DD format
+
+    Returns:
+        Dict[str, Optional[Decimal]]: The rate of each target currency, None if it is not stored nor derivable
+    """
+    rates: Dict[str, Any] = {}
+    misses: List[str] = []
+    for exchanged_currency in exchanged_currencies:
+        rate_value = rate_cache.get(source_currency, exchanged_currency, valuation_date)
+        if rate_value is None:
+            misses.append(exchanged_currency)
+        else:
+            rates[exchanged_currency] = rate_value
+
+    if misses:
+        rows = CurrencyExchangeRate.objects.filter(
+            source_currency_id=currency_registry.find_id(source_currency),
+            exchanged_currency_id__in=currency_registry.get_ids(misses).values(),
+            valuation_date=valuation_date
+        ).values_list('exchanged_currency_id', 'rate_value')
+        for exchanged_currency_id, rate_value in rows:
+            exchanged_currency = currency_registry.get_symbol(exchanged_currency_id)
+            rate_cache.set(source_currency, exchanged_currency, valuation_date, rate_value)
+            rates[exchanged_currency] = rate_value
+
+    for exchanged_currency in exchanged_currencies:
+        if exchanged_currency not in rates:
+            rates[exchanged_currency] = cross_rates.rate(source_currency, exchanged_currency, valuation_date)
+    return {exchanged_currency: rates[exchanged_currency] for exchanged_currency in exchanged_currencies}
+
+@sync_to_async
+def get_rate_values_bulk(triples: List[RateKey]) -> Dict[RateKey, Optional[Decimal]]:
+    """
+    Get the exchange rates of many (source, target, date) triples.
+
+    Rates missing from the rate cache are read with one query per source
+    currency, and the pairs that are not stored are derived from the rates of
+    the cross-rate base, date by date.
+
+    Args:
+        triples: (source currency, target currency, date in YYYY-MM-DD format) of each rate
+
+    Returns:
+        Dict[RateKey, Optional[Decimal]]: The rate of each triple, None if it is not stored nor derivable
+    """
+    rates: Dict[RateKey, Any] = {}
+    misses: Dict[str, List[RateKey]] = {}
+    for triple in triples:
+        rate_value = rate_cache.get(*triple)
+        if rate_value is None:
+            misses.setdefault(triple[0], []).append(triple)
+        else:
+            rates[triple] = rate_value
+
+    for source_currency, source_triples in misses.items():
+        wanted = set(source_triples)
+        rows = CurrencyExchangeRate.objects.filter(
+            source_currency_id=currency_registry.find_id(source_currency),
+            exchanged_currency_id__in=currency_registry.get_ids({triple[1] for triple in source_triples}).values(),
+            valuation_date__in={triple[2] for triple in source_triples}
+        ).values_list('exchanged_currency_id', 'valuation_date', 'rate_value')
+        for exchanged_currency_id, valuation_date, rate_value in rows:
+            triple = (source_currency, currency_registry.get_symbol(exchanged_currency_id), valuation_date.isoformat())
+            if triple in wanted:
+                rate_cache.set(*triple, rate_value)
+                rates[triple] = rate_value
+
+    # in date order, so the rate vector of each date is loaded once
+    for triple in sorted((triple for triple in triples if triple not in rates), key=lambda triple: triple[2]):
+        rates[triple] = cross_rates.rate(*triple)
+    return {triple: rates[triple] for triple in triples}
+
+def read_latest_rate_values(source_currency: str, exchanged_currencies: List[str], max_age_days: Optional[int] = None) -> Dict[str, Optional[LatestRateValue]]:
+    """
+    Get the newest stored rates from one currency to several currencies, with one query on LatestRate.
+
+    Rates are also derived from the latest rates of the cross-rate base, only
+    when both base rates are of the same date, so a derived rate never mixes
+    two dates. The newer of the stored and the derived rate is served, the
+    stored one on the same date. Rates older than max_age_days are left out,
+    so callers fetch them from the providers.
+
+    Args:
+        source_currency: The source currency code
+        exchanged_currencies: The target currency codes
+        max_age_days: Days a rate may be older than today, LATEST_RATE_MAX_AGE_DAYS by default
+
+    Returns:
+        Dict[str, Optional[LatestRateValue]]: The date (YYYY-MM-DD) and rate of each target currency, None if it is
+            not stored nor derivable, or too old
+    """
+    if max_age_days is None:
+        max_age_days = settings.LATEST_RATE_MAX_AGE_DAYS
+    base = settings.CROSS_RATE_BASE
+    latest: Dict[str, Optional[LatestRateValue]] = {exchanged_currency: None for exchanged_currency in exchanged_currencies}
+    currencies = currency_registry.get_ids([source_currency, base, *exchanged_currencies])
+    if source_currency not in currencies:
+        return latest
+    source_id, base_id = currencies[source_currency], currencies.get(base)
+    exchanged_ids = [currencies[exchanged_currency] for exchanged_currency in exchanged_currencies if exchanged_currency in currencies]
+
+    query = Q(source_currency_id=source_id, exchanged_currency_id__in=exchanged_ids)
+    if source_currency != base and base_id is not None:
+        query |= Q(source_currency_id=base_id, exchanged_currency_id__in=[source_id, *exchanged_ids])
+    rows = LatestRate.objects.filter(
+        query, valuation_date__gte=timezone.now().date() - timedelta(days=max_age_days)
+    ).values_list('source_currency_id', 'exchanged_currency_id', 'valuation_date', 'rate_value')
+
+    stored: Dict[int, Tuple[Any, Decimal]] = {}
+    base_rates: Dict[int, Tuple[Any, Decimal]] = {base_id: (None, Decimal(1))}
+    for row_source_id, exchanged_id, valuation_date, rate_value in rows:
+        (stored if row_source_id == source_id else base_rates)[exchanged_id] = (valuation_date, rate_value)
+
+    for exchanged_currency in exchanged_currencies:
+        exchanged_id = currencies.get(exchanged_currency)
+        candidates = [stored[exchanged_id]] if exchanged_id in stored else []
+        if exchanged_id in base_rates and source_id in base_rates:
+            (source_date, source_rate), (exchanged_date, exchanged_rate) = base_rates[source_id], base_rates[exchanged_id]
+            # the base currency itself has no date, it is worth 1 on any date
+            dates = {valuation_date for valuation_date in (source_date, exchanged_date) if valuation_date is not None}
+            if len(dates) <= 1:
+                valuation_date = dates.pop() if dates else timezone.now().date()
+                candidates.append((valuation_date, quantize_rate(exchanged_rate / source_rate)))
+        if candidates:
+            # the stored pair comes first, so it wins over a derived rate of the same date
+            valuation_date, rate_value = max(candidates, key=lambda candidate: candidate[0])
+            latest[exchanged_currency] = (str(valuation_date), rate_value)
+    return latest
+
+get_latest_rate_values = sync_to_async(read_latest_rate_values)
+
+@sync_to_async
+def get_rates_series(start_date: str, end_date: str, base: str, symbols: List[str]) -> Dict[str, Dict[str, Decimal]]:
+    """
+    Get the stored exchange rates of a base currency for a date range, grouped by date.
+
+    The rows are streamed in valuation date order and grouped in one pass.
+
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        base: The base currency code
+        symbols: List of target currency codes
+
+    Returns:
+        Dict[str, Dict[str, Decimal]]: Dictionary of exchange rates for each date and currency
+    """
+    currency_ids = currency_registry.get_ids(symbols)
+    symbol_by_id = {currency_id: symbol for symbol, currency_id in currency_ids.items()}
+    rows = CurrencyExchangeRate.objects.filter(
+        source_currency_id=currency_registry.find_id(base),
+        exchanged_currency_id__in=currency_ids.values(),
+        valuation_date__gte=start_date,
+        valuation_date__lte=end_date
+    ).order_by('valuation_date').values_list('valuation_date', 'exchanged_currency_id', 'rate_value').iterator(chunk_size=2000)
+    return dict(assemble_time_series(
+        ((valuation_date, symbol_by_id[exchanged_currency_id], rate_value) for valuation_date, exchanged_currency_id, rate_value in rows),
+        start_date, end_date
+    ))
+
+@sync_to_async
+def is_range_stored(start_date: str, end_date: str, base: str, symbols: List[str]) -> bool:
+    """
+    Tell whether every rate of a base currency for a date range is stored, with one count query.
+
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        base: The base currency code
+        symbols: List of target currency codes
+
+    Returns:
+        bool: True if every symbol has a rate on every date of the range
+    """
+    currency_ids = currency_registry.get_ids(symbols)
+    base_id = currency_registry.find_id(base)
+    if base_id is None or len(currency_ids) != len(set(symbols)):
+        return False
+    days = (timezone.datetime.strptime(end_date, '%Y-%m-%d') - timezone.datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+    stored = CurrencyExchangeRate.objects.filter(
+        source_currency_id=base_id,
+        exchanged_currency_id__in=currency_ids.values(),
+        valuation_date__gte=start_date,
+        valuation_date__lte=end_date
+    ).count()
+    return stored >= days * len(currency_ids)
+
+async def iter_rates_series(start_date: str, end_date: str, base: str, symbols: List[str]) -> AsyncIterator[Tuple[str, Dict[str, Decimal]]]:
+    """
+    Stream the stored exchange rates of a base currency for a date range, one date at a time.
+
+    Rows are read in chunks of STREAM_CHUNK_SIZE, so the whole range is never held in memory.
+
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        base: The base currency code
+        symbols: List of target currency codes
+
+    Yields:
+        Tuple[str, Dict[str, Decimal]]: Each date of the range with its rates by symbol
+    """
+    currency_ids = await sync_to_async(currency_registry.get_ids)(symbols)
+    base_id = await sync_to_async(currency_registry.find_id)(base)
+    symbol_by_id = {currency_id: symbol for symbol, currency_id in currency_ids.items()}
+    rows = CurrencyExchangeRate.objects.filter(
+        source_currency_id=base_id,
+        exchanged_currency_id__in=currency_ids.values(),
+        valuation_date__gte=start_date,
+        valuation_date__lte=end_date
+    ).order_by('valuation_date').values_list('valuation_date', 'exchanged_currency_id', 'rate_value').iterator(chunk_size=settings.STREAM_CHUNK_SIZE)
+
+    async def symbol_rows():
+        async for chunk in iter_chunks(rows):
+            for valuation_date, exchanged_currency_id, rate_value in chunk:
+                yield valuation_date, symbol_by_id[exchanged_currency_id], rate_value
+
+    async for item in assemble_time_series_async(symbol_rows(), start_date, end_date):
+        yield item
+
+class RepositoryAPI:
+    """
+    A class that reads currency exchange data directly from the database.
+
+    This class exposes the same methods as InternalAPI, but queries the models
+    in-process instead of making an HTTP request back to this same server.
+    """
+
+    async def get_exchange_rate_data(self, source_currency: str, exchanged_currency: str, valuation_date: str) -> Dict[str, Any]:
+        """
+        Get exchange rate data for a specific currency pair and date.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currency: The target currency code
+            valuation_date: The date in YYYY-MM-DD format
+
+        Returns:
+            Dict[str, Any]: Dictionary with the rate value, None if it is neither stored nor derivable
+        """
+        rate_value = await get_rate_value(source_currency, exchanged_currency, valuation_date)
+        return {'rate_value': rate_value}
+
+    async def get_currency_rates_list(self, start_date: str, end_date: str, base: str, symbols: str) -> Dict[str, Dict[str, Decimal]]:
+        """
+        Get a list of currency rates for a date range.
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            base: The base currency code
+            symbols: Comma-separated string of target currency codes
+
+        Returns:
+            Dict[str, Dict[str, Decimal]]: Dictionary of exchange rates for each date and currency
+        """
+        symbols_list = list(map(str.strip, symbols.split(',')))
+        return await get_rates_series(start_date, end_date, base, symbols_list)
+
+    async def get_rate_values(self, source_currency: str, exchanged_currencies: List[str], valuation_date: str) -> Dict[str, Optional[Decimal]]:
+        """
+        Get the exchange rates from one currency to several currencies on a date, stored or derived.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currencies: The target currency codes
+            valuation_date: The date in YYYY-MM-DD format
+
+        Returns:
+            Dict[str, Optional[Decimal]]: The rate of each target currency, None if it is not available
+        """
+        return await get_rate_values(source_currency, exchanged_currencies, valuation_date)
+
+    async def get_rate_values_bulk(self, triples: List[RateKey]) -> Dict[RateKey, Optional[Decimal]]:
+        """
+        Get the exchange rates of many (source, target, date) triples, stored or derived.
+
+        Args:
+            triples: (source currency, target currency, date in YYYY-MM-DD format) of each rate
+
+        Returns:
+            Dict[RateKey, Optional[Decimal]]: The rate of each triple, None if it is not available
+        """
+        return await get_rate_values_bulk(triples)
+
+    async def get_latest_rate_values(self, source_currency: str, exchanged_currencies: List[str]) -> Dict[str, Optional[LatestRateValue]]:
+        """
+        Get the newest rates from one currency to several currencies, no older than LATEST_RATE_MAX_AGE_DAYS.
+
+        Args:
+            source_currency: The source currency code
+            exchanged_currencies: The target currency codes
+
+        Returns:
+            Dict[str, Optional[LatestRateValue]]: The date and rate of each target currency, None if it is not available
+        """
+        return await get_latest_rate_values(source_currency, exchanged_currencies)
+
+    async def get_convert_amount(self, currency_base: str, currency_to_convert: str, amount: Decimal) -> Dict[str, Any]:
+        """
+        Convert an amount between currencies using the latest rate of the pair.
+
+        The rate may be up to LATEST_RATE_MAX_AGE_DAYS old, the date of the
+        response is the date of the rate.
+
+        Args:
+            currency_base: The source currency code
+            currency_to_convert: The target currency code
+            amount: The amount to convert
+
+        Returns:
+            Dict[str, Any]: Dictionary containing conversion details including timestamp, date, currencies, and
+                converted value rounded to 6 decimal places
+        """
+        valuation_date = str(timezone.now().date())
+        latest = (await get_latest_rate_values(currency_base, [currency_to_convert]))[currency_to_convert]
+
+        value: Optional[Decimal] = None
+        if latest is not None:
+            valuation_date, rate_value = latest
+            value = quantize_rate(rate_value * to_decimal(amount))
+
+        date_obj = timezone.datetime.strptime(valuation_date, '%Y-%m-%d')
+        data_return = {
+            "timestamp": int(timezone.datetime.timestamp(date_obj)),
+            "date": valuation_date,
+            "from": currency_base,
+            "to": currency_to_convert,
+            "amount": amount,
+            "value": value
+        }
+
+        return data_return
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+T = TypeVar("T")
+FlightKey = Tuple[str, str, Tuple[str, ...], str]
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesces concurrent provider calls for the same rates into a single call.
+
+    Calls are keyed by (operation, base, symbols, date). While a call is in
+    flight, the callers of the same key on the same event loop await its result
+    instead of starting their own. When SINGLE_FLIGHT_SHARED_ALIAS names a Django
+    cache, a lock taken in it makes the other web and Celery processes wait for
+    the call too, and read its result from the cache.
+
+    Attributes:
+        flights (Dict[Tuple[asyncio.AbstractEventLoop, FlightKey], asyncio.Task]): Calls in flight by event loop and key
+        counters (Dict[str, int]): Calls made, coalesced in process, read from another process and lock waits given up
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty single-flight group.
+        """
+        self.flights: Dict[Tuple[asyncio.AbstractEventLoop, FlightKey], "asyncio.Task[Any]"] = {}
+        self.counters: Dict[str, int] = {"calls": 0, "coalesced": 0, "shared_hits": 0, "wait_timeouts": 0}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(operation: str, base: str, symbols: Iterable[str], valuation_date: str) -> FlightKey:
+        """
+        Build the key of a provider call.
+
+        Args:
+            operation: Name of the provider operation and of the shape of its result (e.g. "historical-pair"
+                for call_providers, "historical-fill" for fill_from_providers), callers sharing a key share the result
+            base: The base currency code
+            symbols: Target currency codes, in any order
+            valuation_date: The date in YYYY-MM-DD format
+
+        Returns:
+            FlightKey: The flight key
+        """
+        return (operation, base, tuple(sorted(symbols)), valuation_date)
+
+    @staticmethod
+    def shared_key(key: FlightKey, kind: str) -> str:
+        """
+        Build the key of a flight lock or result in the shared cache.
+
+        Args:
+            key: The flight key
+            kind: "lock" or "result"
+
+        Returns:
+            str: The shared cache key
+        """
+        operation, base, symbols, valuation_date = key
+        return f"single-flight:{kind}:{operation}:{base}:{','.join(symbols)}:{valuation_date}"
+
+    @property
+    def shared_cache(self) -> Any:
+        """
+        Get the shared Django cache, None if it is disabled.
+        """
+        if not settings.SINGLE_FLIGHT_SHARED_ALIAS:
+            return None
+        return caches[settings.SINGLE_FLIGHT_SHARED_ALIAS]
+
+    def count(self, counter: str) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            counter: The counter name
+        """
+        with self.lock:
+            self.counters[counter] += 1
+
+    async def do(self, key: FlightKey, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make a provider call, or wait for the same call already in flight.
+
+        The call keeps running when the caller that started it is cancelled, so
+        the other callers still get its result.
+
+        Args:
+            key: The flight key, built with make_key
+            call: Async function making the provider call
+
+        Returns:
+            T: The result of the call
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        task = self.flights.get(flight_key)
+        if task is None:
+            task = loop.create_task(self.call_shared(key, call))
+            self.flights[flight_key] = task
+            task.add_done_callback(lambda _: self.flights.pop(flight_key, None))
+        else:
+            self.count("coalesced")
+        return await asyncio.shield(task)
+
+    async def call_shared(self, key: FlightKey, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make a provider call once across processes, holding a lock in the shared cache.
+
+        A process that finds the lock taken polls for the result of the holder,
+        and makes the call itself once the lock is released without a result or
+        after SINGLE_FLIGHT_WAIT seconds.
+
+        Args:
+            key: The flight key
+            call: Async function making the provider call
+
+        Returns:
+            T: The result of the call
+        """
+        shared_cache = self.shared_cache
+        if shared_cache is None:
+            self.count("calls")
+            return await call()
+
+        lock_key, result_key = self.shared_key(key, "lock"), self.shared_key(key, "result")
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT
+        while not await shared_cache.aadd(lock_key, token, timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT):
+            result: Optional[T] = await shared_cache.aget(result_key)
+            if result is not None:
+                self.count("shared_hits")
+                return result
+            if time.monotonic() >= deadline:
+                logger.warning("single flight: gave up waiting for %s after %ss", lock_key, settings.SINGLE_FLIGHT_WAIT)
+                self.count("wait_timeouts")
+                break
+            await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+        else:
+            try:
+                result = await shared_cache.aget(result_key)
+                if result is not None:
+                    self.count("shared_hits")
+                    return result
+                self.count("calls")
+                result = await call()
+                if result is not None:
+                    await shared_cache.aset(result_key, result, timeout=settings.SINGLE_FLIGHT_RESULT_TTL)
+                return result
+            finally:
+                if await shared_cache.aget(lock_key) == token:
+                    await shared_cache.adelete(lock_key)
+
+        self.count("calls")
+        return await call()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the single-flight counters.
+
+        Returns:
+            Dict[str, Any]: Calls made, coalesced, read from another process, lock waits given up and calls in flight
+        """
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.counters)
+        stats["in_flight"] = len(self.flights)
+        return stats
+
+    def clear(self) -> None:
+        """
+        Reset the counters.
+        """
+        with self.lock:
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+single_flight = SingleFlight()
@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+RateRow = Tuple[Any, str, Any]
+
+class GapRange(NamedTuple):
+    """
+    Contiguous dates to fetch from a provider to fill missing rates.
+
+    Attributes:
+        start_date (str): First date in YYYY-MM-DD format
+        end_date (str): Last date in YYYY-MM-DD format
+        symbols (Tuple[str, ...]): Symbols missing on at least one date of the range
+        dates (Tuple[str, ...]): Dates of the range that have missing symbols
+    """
+    start_date: str
+    end_date: str
+    symbols: Tuple[str, ...]
+    dates: Tuple[str, ...]
+
+def iter_dates(start_date: str, end_date: str) -> Iterator[str]:
+    """
+    Iterate over every date of a range, both ends included.
+
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+
+    Yields:
+        str: Each date in YYYY-MM-DD format
+    """
+    current_date = date.fromisoformat(start_date)
+    last_date = date.fromisoformat(end_date)
+    while current_date <= last_date:
+        yield current_date.isoformat()
+        current_date += timedelta(days=1)
+
+def assemble_time_series(rows: Iterable[RateRow], start_date: str, end_date: str) -> Iterator[Tuple[str, Dict[str, Decimal]]]:
+    """
+    Group rate rows by date in a single pass over the rows and the date range.
+
+    The rows must be ordered by ascending valuation date, as returned by a query
+    ordered by valuation_date, so each date only consumes the rows that follow
+    the previous one. Rows outside the range are skipped.
+
+    Args:
+        rows: (valuation_date, symbol, rate_value) rows, the date as a date object or in YYYY-MM-DD format
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+
+    Yields:
+        Tuple[str, Dict[str, Decimal]]: Each date of the range with its rates by symbol, empty if it has none
+    """
+    rows = iter(rows)
+    row = next(rows, None)
+    for current_date in iter_dates(start_date, end_date):
+        rates: Dict[str, Decimal] = {}
+        while row is not None:
+            row_date = str(row[0])
+            if row_date > current_date:
+                break
+            if row_date == current_date:
+                rates[row[1]] = row[2]
+            row = next(rows, None)
+        yield current_date, rates
+
+async def assemble_time_series_async(rows: AsyncIterable[RateRow], start_date: str, end_date: str) -> AsyncIterator[Tuple[str, Dict[str, Decimal]]]:
+    """
+    Group rate rows by date in a single pass, like assemble_time_series, over an async iterable.
+
+    Args:
+        rows: (valuation_date, symbol, rate_value) rows ordered by ascending valuation date
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+
+    Yields:
+        Tuple[str, Dict[str, Decimal]]: Each date of the range with its rates by symbol, empty if it has none
+    """
+    rows = aiter(rows)
+    row = await anext(rows, None)
+    for current_date in iter_dates(start_date, end_date):
+        rates: Dict[str, Decimal] = {}
+        while row is not None:
+            row_date = str(row[0])
+            if row_date > current_date:
+                break
+            if row_date == current_date:
+                rates[row[1]] = row[2]
+            row = await anext(rows, None)
+        yield current_date, rates
+
+def find_gaps(data: Dict[str, Dict[str, Decimal]], symbols: List[str]) -> Dict[str, Set[str]]:
+    """
+    Find the (date, symbol) cells missing from a time series.
+
+    Args:
+        data: Dictionary of exchange rates for each date and currency
+        symbols: Symbols every date must have
+
+    Returns:
+        Dict[str, Set[str]]: The missing symbols of each date that has any, in date order
+    """
+    gaps: Dict[str, Set[str]] = {}
+    for current_date in sorted(data):
+        missing = {symbol for symbol in symbols if data[current_date].get(symbol) is None}
+        if missing:
+            gaps[current_date] = missing
+    return gaps
+
+def coalesce_gaps(gaps: Dict[str, Set[str]], merge_days: int = 0) -> List[GapRange]:
+    """
+    Coalesce missing cells into the fewest contiguous date ranges.
+
+    Consecutive dates with missing cells form one range, fetched for the union
+    of their missing symbols. Ranges separated by at most merge_days complete
+    dates are merged too, as fetching a few stored rates again is cheaper than
+    another provider call.
+
+    Args:
+        gaps: The missing symbols of each date, as returned by find_gaps
+        merge_days: Number of complete dates a range may span to join the next one
+
+    Returns:
+        List[GapRange]: The ranges to fetch, in date order
+    """
+    runs: List[Tuple[List[str], Set[str]]] = []
+    for current_date in sorted(gaps):
+        if runs:
+            dates, symbols = runs[-1]
+            if (date.fromisoformat(current_date) - date.fromisoformat(dates[-1])).days <= merge_days + 1:
+                dates.append(current_date)
+                symbols.update(gaps[current_date])
+                continue
+        runs.append(([current_date], set(gaps[current_date])))
+    return [GapRange(dates[0], dates[-1], tuple(sorted(symbols)), tuple(dates)) for dates, symbols in runs]
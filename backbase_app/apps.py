@@ -1,6 +1,15 @@
+import atexit
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class BackbaseAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backbase_app'
+
+    def ready(self):
+        from backbase_app.external_services.http_session import session_manager
+        atexit.register(session_manager.close_all)
+
+        from backbase_app.sqlite import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="apply_sqlite_pragmas")
@@ -1,14 +1,18 @@
 import aiohttp
 import asyncio
-from typing import Dict, List, Optional, Any, Union
+from decimal import Decimal
+from typing import Dict, List, Optional, Any
 from django.conf import settings
+from backbase_app.external_services.http_session import session_manager
+from backbase_app.api.decimals import loads_json
 
 class CurrencyBeaconAPI:
     """
     A class to interact with the CurrencyBeacon API.
     
     This class provides methods to fetch currency exchange rates, convert currencies,
-    and retrieve historical exchange rate data.
+    and retrieve historical exchange rate data. Requests go through the pooled
+    session of the shared session manager.
     
     Attributes:
         api_key (str): The API key for authentication
@@ -32,16 +36,17 @@ class CurrencyBeaconAPI:
             params: Query parameters for the request
             
         Returns:
-            Dict[str, Any]: The JSON response from the API
+            Dict[str, Any]: The JSON response from the API, with its fractional numbers as Decimal
+            
+        Raises:
+            aiohttp.ClientResponseError: If the API answers with an error status, so
+                the failure is recorded by the provider's circuit breaker
         """
-        try:
-            url = f"{self.base_url}{endpoint}"
-            params['api_key'] = self.api_key
-            async with session.get(url, params=params) as response:
-                return await response.json()
-        except Exception as e:
-            print(f"Error fetching {url}: {e}")
-            raise
+        url = f"{self.base_url}{endpoint}"
+        params['api_key'] = self.api_key
+        async with session.get(url, params=params) as response:
+            response.raise_for_status()
+            return await response.json(loads=loads_json)
 
     async def get_latest_rates(self, base: str = 'USD', symbols: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -57,11 +62,10 @@ class CurrencyBeaconAPI:
         params: Dict[str, Any] = {'base': base}
         if symbols:
             params['symbols'] = ','.join(symbols)
-        async with aiohttp.ClientSession() as session:
-            data = await self.fetch(session, 'latest', params)
-            return data["response"]
+        data = await self.fetch(session_manager.get_session(), 'latest', params)
+        return data["response"]
 
-    async def convert_currency(self, from_currency: str, to_currency: str, amount: Union[int, float]) -> Dict[str, Any]:
+    async def convert_currency(self, from_currency: str, to_currency: str, amount: Decimal) -> Dict[str, Any]:
         """
         Convert an amount from one currency to another.
         
@@ -73,10 +77,9 @@ class CurrencyBeaconAPI:
         Returns:
             Dict[str, Any]: The conversion result
         """
-        params: Dict[str, Any] = {'from': from_currency, 'to': to_currency, 'amount': amount}
-        async with aiohttp.ClientSession() as session:
-            data = await self.fetch(session, 'convert', params)
-            return data["response"]
+        params: Dict[str, Any] = {'from': from_currency, 'to': to_currency, 'amount': str(amount)}
+        data = await self.fetch(session_manager.get_session(), 'convert', params)
+        return data["response"]
 
     async def get_historical_rates(self, date: str, base: str = 'USD', symbols: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -93,9 +96,8 @@ class CurrencyBeaconAPI:
         params: Dict[str, Any] = {'base': base, 'date': date}
         if symbols:
             params['symbols'] = ','.join(symbols)
-        async with aiohttp.ClientSession() as session:
-            data = await self.fetch(session, 'historical', params)
-            return data["response"]
+        data = await self.fetch(session_manager.get_session(), 'historical', params)
+        return data["response"]
 
     async def get_time_series(self, start_date: str, end_date: str, base: str = 'USD', symbols: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -113,6 +115,5 @@ class CurrencyBeaconAPI:
         params: Dict[str, Any] = {'base': base, 'start_date': start_date, 'end_date': end_date}
         if symbols:
             params['symbols'] = ','.join(symbols)
-        async with aiohttp.ClientSession() as session:
-            data = await self.fetch(session, 'timeseries', params)
-            return data["response"]
+        data = await self.fetch(session_manager.get_session(), 'timeseries', params)
+        return data["response"]
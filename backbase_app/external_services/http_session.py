@@ -0,0 +1,127 @@
+import aiohttp
+import asyncio
+from typing import AsyncGenerator, Dict
+from django.conf import settings
+
+class SessionManager:
+    """
+    Shares long-lived aiohttp sessions between the HTTP API clients.
+
+    An aiohttp session is bound to the event loop that created it, so one pooled
+    session is kept per event loop. Every session uses a TCPConnector with
+    per-host connection limits, keep-alive and DNS caching, so consecutive calls
+    to the same provider reuse open connections instead of paying DNS, TCP and
+    TLS setup again.
+
+    Short-lived loops (async_to_sync under WSGI, asyncio.run) close their
+    session when they shut down, so its connections are not left open.
+
+    Attributes:
+        sessions (Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession]): Open session for each event loop
+        closers (Dict[asyncio.AbstractEventLoop, AsyncGenerator[None, None]]): Closes the session of each event loop at its shutdown
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the SessionManager without any open session.
+        """
+        self.sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self.closers: Dict[asyncio.AbstractEventLoop, AsyncGenerator[None, None]] = {}
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """
+        Create a pooled client session configured from the HTTP_CLIENT_* settings.
+
+        Returns:
+            aiohttp.ClientSession: A new client session
+        """
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_CLIENT_LIMIT,
+            limit_per_host=settings.HTTP_CLIENT_LIMIT_PER_HOST,
+            keepalive_timeout=settings.HTTP_CLIENT_KEEPALIVE_TIMEOUT,
+            use_dns_cache=True,
+            ttl_dns_cache=settings.HTTP_CLIENT_DNS_CACHE_TTL,
+        )
+        timeout = aiohttp.ClientTimeout(total=settings.HTTP_CLIENT_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session of the running event loop, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The shared client session
+
+        Raises:
+            RuntimeError: If called outside of a running event loop
+        """
+        loop = asyncio.get_running_loop()
+        for other_loop in [other_loop for other_loop in self.sessions if other_loop.is_closed()]:
+            # closed without shutting down its async generators, its session can't be used nor closed anymore
+            del self.sessions[other_loop]
+            self.closers.pop(other_loop, None)
+
+        session = self.sessions.get(loop)
+        if session is None or session.closed:
+            session = self.create_session()
+            self.sessions[loop] = session
+            if loop not in self.closers:
+                self.close_at_shutdown(loop)
+        return session
+
+    def close_at_shutdown(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Close the session of an event loop when the loop shuts down.
+
+        asyncio.run and async_to_sync finalize the async generators of their loop
+        (loop.shutdown_asyncgens) before closing it. A generator waiting on its
+        first yield is finalized there, and closes the session while the loop
+        can still run the close.
+
+        Args:
+            loop: The running event loop
+        """
+        async def wait_for_shutdown() -> AsyncGenerator[None, None]:
+            try:
+                yield
+            finally:
+                self.closers.pop(loop, None)
+                session = self.sessions.pop(loop, None)
+                if session is not None and not session.closed:
+                    await session.close()
+
+        closer = wait_for_shutdown()
+        self.closers[loop] = closer
+        asyncio.ensure_future(closer.asend(None))
+
+    async def close(self) -> None:
+        """
+        Close the pooled session of the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        session = self.sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+        closer = self.closers.pop(loop, None)
+        if closer is not None:
+            await closer.aclose()
+
+    def close_all(self) -> None:
+        """
+        Close every pooled session whose event loop is idle.
+
+        Used as a shutdown hook by Django and Celery processes. Sessions of a
+        loop that is still running are left to that loop's own shutdown.
+        """
+        for loop, session in list(self.sessions.items()):
+            if loop.is_running():
+                continue
+            closer = self.closers.pop(loop, None)
+            if not loop.is_closed():
+                if not session.closed:
+                    loop.run_until_complete(session.close())
+                if closer is not None:
+                    loop.run_until_complete(closer.aclose())
+            self.sessions.pop(loop, None)
+
+session_manager = SessionManager()
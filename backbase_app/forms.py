@@ -1,7 +1,8 @@
+from decimal import Decimal
 from django import forms
 from .models import Currency
 
 class CurrencyConverterForm(forms.Form):
     base_currency = forms.ModelChoiceField(queryset=Currency.objects.all(), label="Base Currency")
     target_currencies = forms.ModelMultipleChoiceField(queryset=Currency.objects.all(), label="Target Currency")
-    amount = forms.DecimalField(max_digits=10, decimal_places=2, label="Amount")
\ No newline at end of file
+    amount = forms.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"), label="Amount")
\ No newline at end of file
@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backbase_app.api.backfill import create_backfill_job, finish_backfill_run, run_backfill_chunk, start_backfill_run
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.providers_api import run_asyncio_task
+from backbase_app.models import BackfillJob
+from backbase_app.tasks import backfill_rates
+
+class Command(BaseCommand):
+    help = "Backfill historical exchange rates from the providers, in parallel on the Celery workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to backfill, YYYY-MM-DD")
+        parser.add_argument("--end", help="Last date to backfill, YYYY-MM-DD (default: today)")
+        parser.add_argument("--base", default=settings.CROSS_RATE_BASE, help="Base currency code")
+        parser.add_argument("--symbols", help="Comma separated currency codes (default: every currency)")
+        parser.add_argument("--resume", type=int, help="ID of an interrupted or failed backfill to resume")
+        parser.add_argument("--sync", action="store_true", help="Fetch the chunks one by one in this process instead of on the workers")
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            job = BackfillJob.objects.filter(id=options["resume"]).first()
+            if job is None:
+                raise CommandError(f"Backfill {options['resume']} does not exist")
+        else:
+            if not options["start"]:
+                raise CommandError("--start is required to create a backfill")
+            base = options["base"]
+            symbols = options["symbols"].split(",") if options["symbols"] else [symbol for symbol in currency_registry.symbols() if symbol != base]
+            try:
+                start_date = date.fromisoformat(options["start"])
+                end_date = date.fromisoformat(options["end"]) if options["end"] else date.today()
+                job = create_backfill_job(base, start_date, end_date, symbols)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        if options["sync"]:
+            try:
+                for chunk_id in start_backfill_run(job.id):
+                    run_asyncio_task(run_backfill_chunk, chunk_id)
+            finally:
+                summary = finish_backfill_run(job.id)
+            self.stdout.write(f"Backfill {job.id} {summary['status']}: {summary['rows']} rows, {summary['rows_per_second']:.0f} rows/s")
+            return
+
+        backfill_rates.delay(job.id)
+        self.stdout.write(f"Backfill {job.id} queued with {job.chunks.count()} chunks, resume it with --resume {job.id}")
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backbase_app', '0017_alter_currencyexchangerate_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='providerexchange',
+            name='hedge_delay',
+            field=models.FloatField(default=1),
+        ),
+        migrations.AddField(
+            model_name='providerexchange',
+            name='timeout',
+            field=models.FloatField(default=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backbase_app', '0018_providerexchange_timeout_hedge_delay'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='currencyexchangerate',
+            name='source_currency',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='currency_src', to='backbase_app.currency'),
+        ),
+        migrations.AddIndex(
+            model_name='currencyexchangerate',
+            index=models.Index(fields=['source_currency', 'valuation_date', 'exchanged_currency', 'rate_value'], name='rate_base_date_idx'),
+        ),
+    ]
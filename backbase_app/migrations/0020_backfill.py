@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backbase_app', '0019_currencyexchangerate_covering_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.CharField(max_length=3)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('symbols', models.TextField()),
+                ('status', models.CharField(default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('rows_per_second', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BackfillChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('symbols', models.TextField()),
+                ('status', models.CharField(default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('seconds', models.FloatField(default=0)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='backbase_app.backfilljob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'status'], name='backfill_chunk_status_idx')],
+            },
+        ),
+    ]
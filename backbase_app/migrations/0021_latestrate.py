@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_latest_rates(apps, schema_editor):
+    """
+    Store the newest rate of each pair already stored, reading the rates once in key order.
+    """
+    CurrencyExchangeRate = apps.get_model('backbase_app', 'CurrencyExchangeRate')
+    LatestRate = apps.get_model('backbase_app', 'LatestRate')
+    rows = CurrencyExchangeRate.objects.order_by('source_currency_id', 'exchanged_currency_id', '-valuation_date').values_list(
+        'source_currency_id', 'exchanged_currency_id', 'valuation_date', 'rate_value'
+    ).iterator(chunk_size=2000)
+    latest_rates = []
+    last_pair = None
+    for source_currency_id, exchanged_currency_id, valuation_date, rate_value in rows:
+        if (source_currency_id, exchanged_currency_id) == last_pair:
+            continue
+        last_pair = (source_currency_id, exchanged_currency_id)
+        latest_rates.append(LatestRate(
+            source_currency_id=source_currency_id,
+            exchanged_currency_id=exchanged_currency_id,
+            valuation_date=valuation_date,
+            rate_value=rate_value
+        ))
+    LatestRate.objects.bulk_create(latest_rates, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backbase_app', '0020_backfill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valuation_date', models.DateField()),
+                ('rate_value', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exchanged_currency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_exc', to='backbase_app.currency')),
+                ('source_currency', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='latest_src', to='backbase_app.currency')),
+            ],
+            options={
+                'unique_together': {('source_currency', 'exchanged_currency')},
+            },
+        ),
+        migrations.RunPython(fill_latest_rates, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.utils import timezone
 from django.utils.timezone import now
-from typing import Any
-from django.db.models.signals import pre_save, post_save
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.provider_registry import provider_registry
 
 class Currency(models.Model):
     """
@@ -27,23 +31,87 @@ class Currency(models.Model):
         """
         return self.symbol
 
+class CurrencyExchangeRateManager(models.Manager):
+    """
+    Manager of CurrencyExchangeRate with upserts on the unique
+    (source_currency, exchanged_currency, valuation_date) key.
+    """
+    UNIQUE_FIELDS: List[str] = ['source_currency', 'exchanged_currency', 'valuation_date']
+
+    def upsert(self, pair: Tuple[int, int], valuation_date: Any, rate_value: Any) -> "CurrencyExchangeRate":
+        """
+        Store the rate of a currency pair on a date, replacing the stored one, in one statement.
+
+        Args:
+            pair: (source currency id, exchanged currency id)
+            valuation_date: The date of the rate
+            rate_value: The exchange rate value
+
+        Returns:
+            CurrencyExchangeRate: The stored rate
+        """
+        source_currency_id, exchanged_currency_id = pair
+        return self.bulk_upsert([
+            self.model(
+                source_currency_id=source_currency_id,
+                exchanged_currency_id=exchanged_currency_id,
+                valuation_date=valuation_date,
+                rate_value=rate_value
+            )
+        ])[0]
+
+    def bulk_upsert(self, rates: Iterable["CurrencyExchangeRate"], batch_size: int = 500) -> List["CurrencyExchangeRate"]:
+        """
+        Store rates, replacing the stored ones, in one statement per batch.
+
+        The latest rate of each pair (LatestRate) is refreshed in the same transaction.
+
+        Args:
+            rates: Unsaved exchange rates
+            batch_size: Maximum number of rates per statement
+
+        Returns:
+            List[CurrencyExchangeRate]: The stored rates
+        """
+        with transaction.atomic(savepoint=False):
+            stored = self.bulk_create(
+                rates,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=self.UNIQUE_FIELDS,
+                update_fields=['rate_value']
+            )
+            LatestRate.objects.refresh(stored)
+        return stored
+
 class CurrencyExchangeRate(models.Model):
     """
     Model representing an exchange rate between two currencies.
     
+    Rates are looked up by currency ids, either for a pair on a date, served by
+    the unique key, or for a base currency over a date range (time series, cross
+    rates), served by rate_base_date_idx. That index includes rate_value so the
+    range is read from the index alone, already in date order. The unique key
+    indexes source_currency first, so that foreign key has no index of its own.
+    
     Attributes:
         source_currency (Currency): The base currency for the exchange rate
         exchanged_currency (Currency): The target currency for the exchange rate
         valuation_date (date): The date for which the exchange rate is valid
         rate_value (Decimal): The actual exchange rate value
     """
-    source_currency: Currency = models.ForeignKey(Currency, related_name='currency_src', on_delete=models.CASCADE)
+    source_currency: Currency = models.ForeignKey(Currency, related_name='currency_src', on_delete=models.CASCADE, db_index=False)
     exchanged_currency: Currency = models.ForeignKey(Currency, related_name='currency_exc', on_delete=models.CASCADE)
     valuation_date: Any = models.DateField(db_index=True, default=now, blank=True)
     rate_value: Any = models.DecimalField(decimal_places=6, max_digits=18)
 
+    objects: CurrencyExchangeRateManager = CurrencyExchangeRateManager()
+
     class Meta:
         unique_together = ['source_currency', 'exchanged_currency', 'valuation_date']
+        indexes = [
+            models.Index(fields=['source_currency', 'valuation_date', 'exchanged_currency', 'rate_value'], name='rate_base_date_idx'),
+        ]
 
     def __str__(self) -> str:
         """
@@ -54,6 +122,132 @@ class CurrencyExchangeRate(models.Model):
         """
         return f"{self.source_currency} - {self.exchanged_currency}"
 
+    @classmethod
+    def from_db(cls, db: str, field_names: List[str], values: List[Any]) -> "CurrencyExchangeRate":
+        """
+        Build a rate loaded from the database, remembering its stored key.
+        
+        A save moving the rate to another pair or date then also refreshes
+        what was cached for the former one.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._stored_key = instance.row_key()
+        return instance
+
+    def row_key(self) -> Optional[Tuple[int, int, Any]]:
+        """
+        Get the (source currency id, exchanged currency id, valuation date) key of the rate.
+        
+        Returns:
+            Optional[Tuple[int, int, Any]]: The key, None if one of its fields is not loaded
+        """
+        values = [self.__dict__.get(name) for name in ('source_currency_id', 'exchanged_currency_id', 'valuation_date')]
+        if None in values:
+            return None
+        return values[0], values[1], self._meta.get_field('valuation_date').to_python(values[2])
+
+class LatestRateManager(models.Manager):
+    """
+    Manager of LatestRate keeping the newest stored rate of each currency pair.
+    """
+
+    def refresh(self, rates: Iterable[CurrencyExchangeRate], replace: bool = True, batch_size: int = 500) -> None:
+        """
+        Store the rates that are at least as recent as the latest rate of their pair.
+
+        Called in the transaction writing the rates. Each batch is one upsert
+        that only replaces a latest rate with a more recent one, so concurrent
+        writers cannot replace a newer rate with an older one, without locking.
+
+        Args:
+            rates: Stored exchange rates
+            replace: Whether a rate of the same date replaces the latest one, False when the write kept the stored rates
+            batch_size: Maximum number of pairs per statement
+        """
+        to_date = CurrencyExchangeRate._meta.get_field('valuation_date').to_python
+        newest: Dict[Tuple[int, int], Tuple[Any, Any]] = {}
+        for rate in rates:
+            pair = (rate.source_currency_id, rate.exchanged_currency_id)
+            valuation_date = to_date(rate.valuation_date)
+            if pair not in newest or valuation_date > newest[pair][0]:
+                newest[pair] = (valuation_date, rate.rate_value)
+        if not newest:
+            return
+
+        connection = connections[router.db_for_write(self.model)]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        date_field, rate_field = self.model._meta.get_field('valuation_date'), self.model._meta.get_field('rate_value')
+        updated_at = self.model._meta.get_field('updated_at').get_db_prep_save(timezone.now(), connection)
+        rows = [
+            (source_currency_id, exchanged_currency_id, date_field.get_db_prep_save(valuation_date, connection),
+             rate_field.get_db_prep_save(rate_value, connection), updated_at)
+            for (source_currency_id, exchanged_currency_id), (valuation_date, rate_value) in newest.items()
+        ]
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {table} (source_currency_id, exchanged_currency_id, valuation_date, rate_value, updated_at) "
+                    f"VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))} "
+                    "ON CONFLICT (source_currency_id, exchanged_currency_id) DO UPDATE SET "
+                    "valuation_date = EXCLUDED.valuation_date, rate_value = EXCLUDED.rate_value, updated_at = EXCLUDED.updated_at "
+                    f"WHERE {table}.valuation_date {'<=' if replace else '<'} EXCLUDED.valuation_date",
+                    [value for row in batch for value in row]
+                )
+
+    def rebuild(self, pair: Tuple[int, int]) -> None:
+        """
+        Recompute the latest rate of a pair from its stored rates, after one of them was changed or deleted.
+
+        Args:
+            pair: (source currency id, exchanged currency id)
+        """
+        source_currency_id, exchanged_currency_id = pair
+        with transaction.atomic():
+            self.filter(source_currency_id=source_currency_id, exchanged_currency_id=exchanged_currency_id).delete()
+            newest = CurrencyExchangeRate.objects.filter(
+                source_currency_id=source_currency_id,
+                exchanged_currency_id=exchanged_currency_id
+            ).order_by('-valuation_date').first()
+            if newest is not None:
+                self.refresh([newest])
+
+class LatestRate(models.Model):
+    """
+    Model holding the newest stored rate of each currency pair.
+    
+    Denormalized from CurrencyExchangeRate in the transactions writing the
+    rates, so conversions and latest rate lookups read the rate of a pair with
+    one lookup on the unique (source_currency, exchanged_currency) key,
+    whatever the date of its last rate.
+    
+    Attributes:
+        source_currency (Currency): The base currency for the exchange rate
+        exchanged_currency (Currency): The target currency for the exchange rate
+        valuation_date (date): The date of the newest stored rate of the pair
+        rate_value (Decimal): The newest stored rate of the pair
+        updated_at (datetime): When the rate was last refreshed
+    """
+    source_currency: Currency = models.ForeignKey(Currency, related_name='latest_src', on_delete=models.CASCADE, db_index=False)
+    exchanged_currency: Currency = models.ForeignKey(Currency, related_name='latest_exc', on_delete=models.CASCADE)
+    valuation_date: Any = models.DateField()
+    rate_value: Any = models.DecimalField(decimal_places=6, max_digits=18)
+    updated_at: Any = models.DateTimeField(auto_now=True)
+
+    objects: LatestRateManager = LatestRateManager()
+
+    class Meta:
+        unique_together = ['source_currency', 'exchanged_currency']
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the latest rate.
+        
+        Returns:
+            str: A formatted string showing the currency pair and the date
+        """
+        return f"{self.source_currency} - {self.exchanged_currency} ({self.valuation_date})"
+
 class ProviderExchange(models.Model):
     """
     Model representing an exchange rate provider.
@@ -63,11 +257,15 @@ class ProviderExchange(models.Model):
         name (str): Display name of the provider
         priority (int): Priority order for the provider (higher number = higher priority)
         activated (bool): Whether the provider is currently active
+        timeout (float): Seconds to wait for an answer of the provider before giving up
+        hedge_delay (float): Seconds to wait for an answer before also asking the next provider (hedged mode)
     """
     id_name: str = models.CharField(max_length=10, unique=True, db_index=True)
     name: str = models.CharField(max_length=100)
     priority: int = models.PositiveIntegerField(default=0)
     activated: bool = models.BooleanField(default=True)
+    timeout: float = models.FloatField(default=10)
+    hedge_delay: float = models.FloatField(default=1)
 
     def __str__(self) -> str:
         """
@@ -78,20 +276,153 @@ class ProviderExchange(models.Model):
         """
         return f"{self.name} - {self.priority}"
 
-@receiver(pre_save, sender=CurrencyExchangeRate)
-def update_rate_if_exists(sender, instance, **kwargs):
+class BackfillJob(models.Model):
+    """
+    Model representing a backfill of historical rates, split into BackfillChunk rows.
+    
+    Chunks are marked done as soon as their rates are stored, so a backfill
+    that was interrupted resumes with the chunks that are not done yet.
+    
+    Attributes:
+        base (str): The base currency code
+        start_date (date): First date to backfill
+        end_date (date): Last date to backfill
+        symbols (str): Comma separated target currency codes
+        status (str): pending, running, done or failed (some chunks could not be fetched)
+        created_at (datetime): When the backfill was requested
+        started_at (datetime): When the chunks were last dispatched
+        finished_at (datetime): When the last run ended
+        rows (int): Number of rates stored by the chunks that are done
+        rows_per_second (float): Rows stored per second of wall time by the last run
+    """
+    PENDING: str = "pending"
+    RUNNING: str = "running"
+    DONE: str = "done"
+    FAILED: str = "failed"
+
+    base: str = models.CharField(max_length=3)
+    start_date: Any = models.DateField()
+    end_date: Any = models.DateField()
+    symbols: str = models.TextField()
+    status: str = models.CharField(max_length=10, default=PENDING)
+    created_at: Any = models.DateTimeField(auto_now_add=True)
+    started_at: Any = models.DateTimeField(null=True, blank=True)
+    finished_at: Any = models.DateTimeField(null=True, blank=True)
+    rows: int = models.PositiveIntegerField(default=0)
+    rows_per_second: float = models.FloatField(default=0)
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the backfill.
+        
+        Returns:
+            str: A formatted string showing the base currency and the date range
+        """
+        return f"{self.base} {self.start_date} - {self.end_date}"
+
+class BackfillChunk(models.Model):
+    """
+    Model representing the part of a backfill fetched with one provider call.
+    
+    The (job, status) index also serves the job foreign key.
+    
+    Attributes:
+        job (BackfillJob): The backfill this chunk belongs to
+        start_date (date): First date of the chunk
+        end_date (date): Last date of the chunk
+        symbols (str): Comma separated target currency codes of the chunk
+        status (str): pending, done or failed
+        attempts (int): Number of times the chunk was fetched
+        rows (int): Number of rates stored
+        seconds (float): Time taken to fetch and store the rates
+        finished_at (datetime): When the chunk was last fetched
+    """
+    job: BackfillJob = models.ForeignKey(BackfillJob, related_name='chunks', on_delete=models.CASCADE, db_index=False)
+    start_date: Any = models.DateField()
+    end_date: Any = models.DateField()
+    symbols: str = models.TextField()
+    status: str = models.CharField(max_length=10, default=BackfillJob.PENDING)
+    attempts: int = models.PositiveIntegerField(default=0)
+    rows: int = models.PositiveIntegerField(default=0)
+    seconds: float = models.FloatField(default=0)
+    finished_at: Any = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', 'status'], name='backfill_chunk_status_idx'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the chunk.
+        
+        Returns:
+            str: A formatted string showing the date range and the status
+        """
+        return f"{self.start_date} - {self.end_date} ({self.status})"
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_currency_registry(sender, instance, **kwargs):
     """
+    Drop the cached currency map when a currency is created, changed or deleted.
     """
+    currency_registry.invalidate()
 
-    existing = CurrencyExchangeRate.objects.filter(
-        source_currency=instance.source_currency,
-        exchanged_currency=instance.exchanged_currency,
-        valuation_date=instance.valuation_date
-    ).first()
+@receiver(post_save, sender=ProviderExchange)
+@receiver(post_delete, sender=ProviderExchange)
+def invalidate_provider_registry(sender, instance, **kwargs):
+    """
+    Reload the in-memory providers when a provider is created, changed or deleted.
+    """
+    provider_registry.invalidate()
+
+def invalidate_cached_rates(keys: Iterable[Tuple[int, int, Any]]) -> None:
+    """
+    Drop the cached rates and the cross-rate vectors of rates written one at a time.
+    
+    Args:
+        keys: (source currency id, exchanged currency id, valuation date) of each written rate, None if unknown
+    """
+    keys = [key for key in keys if key is not None]
+    if not keys:
+        return
+    by_id = currency_registry.get_snapshot().by_id
+    for source_currency_id, exchanged_currency_id, valuation_date in keys:
+        if source_currency_id not in by_id or exchanged_currency_id not in by_id:
+            # deleted along with its currency, no rate of it can be looked up anymore
+            continue
+        source_currency = by_id[source_currency_id]
+        rate_cache.invalidate(source_currency, by_id[exchanged_currency_id], valuation_date)
+        cross_rates.invalidate(source_currency, [valuation_date])
 
-    if existing:
-        if existing.rate_value != instance.rate_value:
-            try:
-                CurrencyExchangeRate.objects.filter(id=existing.id).update(rate_value=instance.rate_value)
-            except Exception as e:
-                pass
\ No newline at end of file
+@receiver(post_save, sender=CurrencyExchangeRate)
+def refresh_latest_rate(sender, instance, created, **kwargs):
+    """
+    Refresh the latest rate and drop the cached rates of the pair when a rate is saved one at a time (admin, REST API).
+    
+    A rate moved to another pair or date refreshes the former one too. Rates
+    saved by loaddata (raw) are left alone: their fixtures carry LatestRate rows.
+    """
+    if kwargs.get('raw'):
+        return
+    key = instance.row_key()
+    stored_key = None if created else getattr(instance, '_stored_key', None)
+    if created:
+        LatestRate.objects.refresh([instance])
+    else:
+        LatestRate.objects.rebuild((instance.source_currency_id, instance.exchanged_currency_id))
+        if stored_key is not None and stored_key[:2] != (instance.source_currency_id, instance.exchanged_currency_id):
+            LatestRate.objects.rebuild(stored_key[:2])
+    invalidate_cached_rates({key, stored_key})
+    instance._stored_key = key
+
+@receiver(post_delete, sender=CurrencyExchangeRate)
+def rebuild_latest_rate(sender, instance, **kwargs):
+    """
+    Recompute the latest rate and drop the cached rate of the pair when one of its rates is deleted.
+    """
+    if kwargs.get('raw'):
+        return
+    LatestRate.objects.rebuild((instance.source_currency_id, instance.exchanged_currency_id))
+    invalidate_cached_rates([instance.row_key()])
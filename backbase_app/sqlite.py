@@ -0,0 +1,23 @@
+from typing import Any
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+def apply_sqlite_pragmas(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """
+    Apply the SQLITE_PRAGMAS performance profile to a new SQLite connection.
+
+    Connected to the connection_created signal. With journal_mode=WAL readers
+    keep reading the last committed rates while a Celery worker writes, instead
+    of waiting for the whole database to be unlocked. Other databases are left
+    untouched.
+
+    Args:
+        sender: The database wrapper class
+        connection: The new database connection
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
@@ -0,0 +1,109 @@
+import json
+from decimal import Decimal
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import QueryDict
+from rest_framework.utils.encoders import JSONEncoder
+
+from backbase_app.api.decimals import DecimalJSONEncoder
+
+STREAM_CONTENT_TYPES: Dict[str, str] = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+T = TypeVar("T")
+
+def get_stream_format(params: QueryDict) -> Optional[str]:
+    """
+    Get the streaming format requested with the stream query parameter.
+
+    Args:
+        params: The query parameters of the request
+
+    Returns:
+        Optional[str]: "json" or "ndjson", None when the response must not be streamed
+
+    Raises:
+        ValueError: If the stream parameter is not a supported format
+    """
+    stream_format = params.get('stream', None)
+    if not stream_format:
+        return None
+    if stream_format not in STREAM_CONTENT_TYPES:
+        raise ValueError(f"Invalid stream format. It must be one of: {', '.join(STREAM_CONTENT_TYPES)}.")
+    return stream_format
+
+async def encode_time_series(items: AsyncIterator[Tuple[str, Dict[str, Decimal]]], stream_format: str) -> AsyncIterator[str]:
+    """
+    Encode a time series one date at a time.
+
+    In json format the output is the same object as the non-streaming response,
+    in ndjson format each line is an object with the date and its rates. Rates
+    are written as stored, with DecimalJSONEncoder.
+
+    Args:
+        items: Each date with its rates by symbol, in date order
+        stream_format: "json" or "ndjson"
+
+    Yields:
+        str: The encoded chunks
+    """
+    encode = DecimalJSONEncoder().encode
+    if stream_format == "ndjson":
+        async for date, rates in items:
+            yield encode({"date": date, "rates": rates}) + "\n"
+        return
+
+    separator = "{"
+    async for date, rates in items:
+        yield f"{separator}{json.dumps(date)}: {encode(rates)}"
+        separator = ", "
+    yield "{}" if separator == "{" else "}"
+
+async def iter_chunks(rows: Iterator[T]) -> AsyncIterator[List[T]]:
+    """
+    Pull a synchronous iterator in chunks of STREAM_CHUNK_SIZE items, off the event loop.
+
+    Each chunk is read through sync_to_async on the thread of the request, so a
+    QuerySet.iterator keeps its database cursor while the event loop sends the
+    previous chunk.
+
+    Args:
+        rows: The rows, typically from QuerySet.iterator
+
+    Yields:
+        List[T]: The next rows, never empty
+    """
+    next_chunk = sync_to_async(lambda: list(islice(rows, settings.STREAM_CHUNK_SIZE)))
+    while chunk := await next_chunk():
+        yield chunk
+
+async def encode_rows(chunks: AsyncIterator[List[Dict[str, Any]]], stream_format: str) -> AsyncIterator[str]:
+    """
+    Encode rows one chunk at a time.
+
+    Rows are encoded like the DRF JSON renderer does. In json format the output
+    is an array of the rows, in ndjson format each line is a row.
+
+    Args:
+        chunks: The rows, as returned by QuerySet.values, in chunks
+        stream_format: "json" or "ndjson"
+
+    Yields:
+        str: The encoded chunks
+    """
+    separator, line_end = ("", "\n") if stream_format == "ndjson" else (",", "")
+    first = True
+
+    if stream_format == "json":
+        yield "["
+    async for chunk in chunks:
+        encoded = separator.join(json.dumps(row, cls=JSONEncoder) + line_end for row in chunk)
+        yield encoded if first else separator + encoded
+        first = False
+    if stream_format == "json":
+        yield "]"
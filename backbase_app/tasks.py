@@ -1,42 +1,132 @@
-from celery import shared_task
-import asyncio
+from celery import chord, group, shared_task
 import logging
-from backbase_app.models import Currency, CurrencyExchangeRate, ProviderExchange
+from backbase_app.models import CurrencyExchangeRate, ProviderExchange
+from django.conf import settings
 from django.utils import timezone
 from django.db import IntegrityError
-from typing import Optional, List
+from datetime import date
+from typing import Dict, Optional, List
 from asgiref.sync import sync_to_async
 
 logger = logging.getLogger(__name__)
 
 def run_asyncio_task(async_func, *args, **kwargs):
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    return loop.run_until_complete(async_func(*args, **kwargs))
+    from backbase_app.api.providers_api import run_asyncio_task as run_task
+    return run_task(async_func, *args, **kwargs)
+
+@shared_task(bind=True, max_retries=settings.DAILY_SNAPSHOT_MAX_RETRIES)
+def save_data_today(self, symbols_by_base: Optional[Dict[str, List[str]]] = None, valuation_date: Optional[str] = None) -> dict:
+    """
+    Store today's rates of every DAILY_SNAPSHOT_BASES currency, fetched concurrently on one event loop.
+
+    Symbols no provider could fill are fetched again by a retry, after
+    DAILY_SNAPSHOT_RETRY_BACKOFF seconds doubled at each retry. The task fails
+    when they are still missing after the last retry.
+
+    Args:
+        symbols_by_base: The symbols to fetch for each base currency, set by retries
+        valuation_date: Date of the stored rates in YYYY-MM-DD format, set by retries
+
+    Returns:
+        dict: Stored rows and the timings of the run
+
+    Raises:
+        SnapshotIncomplete: If no provider could fill some symbols after the last retry
+    """
+    from backbase_app.api.daily_snapshot import SnapshotIncomplete, take_daily_snapshot
+
+    valuation_date = valuation_date or timezone.now().date().isoformat()
+    report = run_asyncio_task(take_daily_snapshot, symbols_by_base, date.fromisoformat(valuation_date))
+    if report["missing"]:
+        countdown = min(settings.DAILY_SNAPSHOT_RETRY_BACKOFF * 2 ** self.request.retries, settings.DAILY_SNAPSHOT_RETRY_BACKOFF_MAX)
+        raise self.retry(
+            exc=SnapshotIncomplete(report["missing"]),
+            kwargs={"symbols_by_base": report["missing"], "valuation_date": valuation_date},
+            countdown=countdown
+        )
+    return report
+
+@shared_task
+def backfill_rates(job_id: int) -> Optional[str]:
+    """
+    Fetch the chunks of a backfill that are not done yet, in parallel across workers.
+
+    The chunks run as a chord whose callback records the throughput of the run.
+    When the chord fails anyway (e.g. a chunk task hits its time limit or its
+    worker is lost), its error callback records the run as failed instead.
+    Calling it again for an interrupted or failed backfill resumes it.
+
+    Args:
+        job_id: The backfill ID
+
+    Returns:
+        Optional[str]: ID of the chord callback, None if every chunk is already done
+    """
+    from backbase_app.api.backfill import finish_backfill_run, start_backfill_run
+
+    chunk_ids = start_backfill_run(job_id)
+    if not chunk_ids:
+        finish_backfill_run(job_id)
+        return None
+    result = chord(group(backfill_chunk.s(chunk_id) for chunk_id in chunk_ids))(
+        backfill_done.s(job_id).on_error(backfill_failed.si(job_id))
+    )
+    return result.id
+
+@shared_task(acks_late=True)
+def backfill_chunk(chunk_id: int) -> int:
+    """
+    Fetch and store the rates of one backfill chunk.
+
+    The message is acknowledged once the chunk is stored, so the chunk of a
+    worker that crashed is delivered again. A chunk that raises is marked as
+    failed instead of failing the chord, so the chord callback still records
+    the run.
+
+    Args:
+        chunk_id: The chunk ID
+
+    Returns:
+        int: Number of rates stored
+    """
+    from backbase_app.api.backfill import fail_backfill_chunk, run_backfill_chunk
+
+    try:
+        return run_asyncio_task(run_backfill_chunk, chunk_id)
+    except Exception:
+        logger.exception("backfill chunk %s failed", chunk_id)
+        fail_backfill_chunk(chunk_id)
+        return 0
 
 @shared_task
-def save_data_today():
-    from backbase_app.api.providers_api import ProvidersAPI
-    from backbase_app.api.generic_api import get_all_providers, get_provider_exchange
+def backfill_done(rows: List[int], job_id: int) -> dict:
+    """
+    Record the outcome of a backfill run once all its chunks ran.
+
+    Args:
+        rows: Number of rates stored by each chunk
+        job_id: The backfill ID
 
-    providers_api = ProvidersAPI()
+    Returns:
+        dict: Status, stored rows, chunks not done and rows per second of the run
+    """
+    from backbase_app.api.backfill import finish_backfill_run
 
-    symbols = list(Currency.objects.all().values_list("symbol", flat=True))
-    base = "USD"
+    return finish_backfill_run(job_id)
+
+@shared_task
+def backfill_failed(job_id: int) -> dict:
+    """
+    Record the outcome of a backfill run whose chord failed because a chunk task raised.
 
-    provider = run_asyncio_task(get_provider_exchange)
-    data = run_asyncio_task(providers_api.get_latest_rates, base, symbols, provider.id_name)
+    The chunks that did not finish are not done, so the backfill is recorded as failed.
 
-    providers_exclude = []
-    providers = run_asyncio_task(get_all_providers)
-    providers_totals = len(providers)
-    count_providers = 0
+    Args:
+        job_id: The backfill ID
 
-    while data is None and count_providers < providers_totals:
-        print(f"trying to get data excluding providers: {providers_exclude}")
-        provider = run_asyncio_task(get_provider_exchange,providers_exclude)
-        provider_name = str(provider.id_name)
-        data = run_asyncio_task(providers_api.get_latest_rates, base, symbols, provider_name)
-        providers_exclude.append(provider.id_name)
-        count_providers += 1
+    Returns:
+        dict: Status, stored rows, chunks not done and rows per second of the run
+    """
+    from backbase_app.api.backfill import finish_backfill_run
 
+    return finish_backfill_run(job_id)
@@ -10,10 +10,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
 import django
 django.setup()
 
+import asyncio
+from decimal import Decimal
 from asgiref.sync import sync_to_async
 from backbase_app.api.generic_api import GenericAPI
 from backbase_app.models import ProviderExchange
 from backbase_app.api.providers_api import ProvidersAPI
+from backbase_app.api.circuit_breaker import circuit_breakers
 
 @pytest.fixture
 def mock_providers_api():
@@ -51,6 +54,7 @@ def generic_api(mock_providers_api):
     Returns:
         GenericAPI: An instance of GenericAPI with mocked dependencies.
     """
+    circuit_breakers.breakers.clear()
     with patch('backbase_app.api.generic_api.ProvidersAPI', return_value=mock_providers_api):
         return GenericAPI()
 
@@ -182,3 +186,242 @@ async def test_get_convert_amount(mock_get_convert_amount):
     
     # Verify the mock was called with correct parameters
     mock_get_convert_amount.assert_called_once_with(currency_base, currency_to_convert, amount)
+
+def make_providers(*providers):
+    """Build provider configurations for the failover tests.
+
+    Args:
+        providers: Tuples of (id_name, timeout, hedge_delay) in priority order.
+
+    Returns:
+        List[ProviderExchange]: Unsaved provider instances.
+    """
+    return [ProviderExchange(id_name=id_name, timeout=timeout, hedge_delay=hedge_delay) for id_name, timeout, hedge_delay in providers]
+
+def delayed_operation(answers, calls):
+    """Build a provider operation answering after a delay.
+
+    Args:
+        answers: Mapping of provider ID to (delay, data, exception).
+        calls: List collecting the provider IDs that were called.
+
+    Returns:
+        Callable: The provider operation.
+    """
+    async def operation(provider_name):
+        calls.append(provider_name)
+        delay, data = answers[provider_name]
+        await asyncio.sleep(delay)
+        if isinstance(data, Exception):
+            raise data
+        return data
+    return operation
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.settings.PROVIDER_FAILOVER_MODE', "sequential")
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_call_providers_sequential(mock_get_active_providers, generic_api):
+    mock_get_active_providers.return_value = make_providers(("A", 1, 0.1), ("B", 1, 0.1), ("C", 1, 0.1))
+    calls = []
+    operation = delayed_operation({"A": (0, ValueError("down")), "B": (0, {"EUR": None}), "C": (0, {"EUR": 1.1})}, calls)
+
+    data = await generic_api.call_providers(operation, lambda rates: rates["EUR"] is not None)
+
+    assert data == {"EUR": 1.1}
+    assert calls == ["A", "B", "C"]
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.settings.PROVIDER_FAILOVER_MODE', "sequential")
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_call_providers_timeout(mock_get_active_providers, generic_api):
+    mock_get_active_providers.return_value = make_providers(("A", 0.05, 1), ("B", 1, 1))
+    calls = []
+    operation = delayed_operation({"A": (5, {"EUR": 1.0}), "B": (0, {"EUR": 1.1})}, calls)
+
+    data = await generic_api.call_providers(operation, lambda rates: rates["EUR"] is not None)
+
+    assert data == {"EUR": 1.1}
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.settings.PROVIDER_FAILOVER_MODE', "hedged")
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_call_providers_hedged(mock_get_active_providers, generic_api):
+    mock_get_active_providers.return_value = make_providers(("A", 5, 0.05), ("B", 5, 0.05), ("C", 5, 0.05))
+    calls = []
+    operation = delayed_operation({"A": (2, {"EUR": 1.0}), "B": (0, {"EUR": 1.1}), "C": (0, {"EUR": 1.2})}, calls)
+
+    started = asyncio.get_running_loop().time()
+    data = await generic_api.call_providers(operation, lambda rates: rates["EUR"] is not None)
+
+    assert data == {"EUR": 1.1}
+    assert calls == ["A", "B"]
+    assert asyncio.get_running_loop().time() - started < 1
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.settings.PROVIDER_FAILOVER_MODE', "all")
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_call_providers_all(mock_get_active_providers, generic_api):
+    mock_get_active_providers.return_value = make_providers(("A", 5, 1), ("B", 5, 1), ("C", 5, 1))
+    calls = []
+    operation = delayed_operation({"A": (0, {"EUR": None}), "B": (0, {"EUR": 1.1}), "C": (0, {"EUR": 1.2})}, calls)
+
+    data = await generic_api.call_providers(operation, lambda rates: rates["EUR"] is not None)
+
+    assert data == {"EUR": 1.1}
+    assert calls == ["A", "B", "C"]
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_exchange_rate_data_fallback(mock_get_active_providers, generic_api, mock_providers_api):
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_exchange_rate_data = AsyncMock(return_value={"rate_value": None})
+
+    data = await generic_api.get_exchange_rate_data("USD", "EUR", "2025-03-01")
+
+    assert data == {"rate_value": 1.05}
+    mock_providers_api.get_historical_rates.assert_awaited_once_with("2025-03-01", "USD", ["EUR"], "MC")
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.settings.TIME_SERIES_GAP_MERGE_DAYS', 0)
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_currency_rates_list_backfills_gaps(mock_get_active_providers, generic_api, mock_providers_api):
+    """Test that only the missing rates are fetched, in one call per contiguous range."""
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    stored = {f"2025-03-{day:02d}": {"EUR": 0.85, "GBP": 0.75} for day in range(1, 11)}
+    del stored["2025-03-02"]["EUR"]
+    del stored["2025-03-03"]["GBP"]
+    del stored["2025-03-09"]["EUR"]
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_currency_rates_list = AsyncMock(return_value=stored)
+    mock_providers_api.get_time_series.return_value = {
+        "2025-03-02": {"EUR": 0.9, "GBP": 0.8},
+        "2025-03-03": {"EUR": 0.9, "GBP": 0.8},
+    }
+    mock_providers_api.get_historical_rates.return_value = {"EUR": 0.95}
+
+    data = await generic_api.get_currency_rates_list("2025-03-01", "2025-03-10", "USD", "EUR,GBP")
+
+    assert data["2025-03-02"] == {"EUR": 0.9, "GBP": 0.75}
+    assert data["2025-03-03"] == {"EUR": 0.85, "GBP": 0.8}
+    assert data["2025-03-09"] == {"EUR": 0.95, "GBP": 0.75}
+    assert data["2025-03-10"] == {"EUR": 0.85, "GBP": 0.75}
+    mock_providers_api.get_time_series.assert_awaited_once_with("2025-03-02", "2025-03-03", "USD", ["EUR", "GBP"], "MC")
+    mock_providers_api.get_historical_rates.assert_awaited_once_with("2025-03-09", "USD", ["EUR"], "MC")
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_currency_rates_list_complete(mock_get_active_providers, generic_api, mock_providers_api):
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    stored = {"2025-03-01": {"EUR": 0.85}}
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_currency_rates_list = AsyncMock(return_value=stored)
+
+    data = await generic_api.get_currency_rates_list("2025-03-01", "2025-03-01", "USD", "EUR")
+
+    assert data == stored
+    mock_providers_api.get_time_series.assert_not_awaited()
+    mock_providers_api.get_historical_rates.assert_not_awaited()
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_currency_rates_list_unfilled_gap(mock_get_active_providers, generic_api, mock_providers_api):
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_currency_rates_list = AsyncMock(return_value={"2025-03-01": {}})
+    mock_providers_api.get_historical_rates.return_value = {"EUR": None}
+
+    data = await generic_api.get_currency_rates_list("2025-03-01", "2025-03-01", "USD", "EUR")
+
+    assert data == {}
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_convert_amount_batch(mock_get_active_providers, generic_api, mock_providers_api):
+    """Test that the rates missing from the internal source are fetched with one provider call."""
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_latest_rate_values = AsyncMock(return_value={"EUR": ("2025-03-01", Decimal("0.9")), "GBP": None, "JPY": None})
+    mock_providers_api.get_latest_rates.return_value = {"GBP": Decimal("0.75"), "JPY": None}
+
+    data = await generic_api.get_convert_amount_batch("USD", ["EUR", "GBP", "JPY"], [Decimal("100"), Decimal("10.10")])
+
+    assert data["from"] == "USD"
+    assert data["amounts"] == [Decimal("100"), Decimal("10.10")]
+    assert data["conversions"] == {
+        "EUR": {"valuation_date": "2025-03-01", "rate": Decimal("0.9"), "values": [Decimal("90.000000"), Decimal("9.090000")]},
+        "GBP": {"valuation_date": data["date"], "rate": Decimal("0.75"), "values": [Decimal("75.000000"), Decimal("7.575000")]},
+        "JPY": {"valuation_date": None, "rate": None, "values": None},
+    }
+    mock_providers_api.get_latest_rates.assert_awaited_once_with("USD", ["GBP", "JPY"], "MC")
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_exchange_rate_data_bulk(mock_get_active_providers, generic_api, mock_providers_api):
+    """Test that duplicated triples are looked up once and misses are fetched with one call per source and date."""
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_rate_values_bulk = AsyncMock(return_value={
+        ("USD", "EUR", "2025-03-01"): 0.85,
+        ("USD", "GBP", "2025-03-01"): None,
+        ("USD", "JPY", "2025-03-01"): None,
+        ("EUR", "GBP", "2025-03-02"): None,
+    })
+    mock_providers_api.get_historical_rates.side_effect = lambda date, base, symbols, provider: {symbol: 0.5 for symbol in symbols}
+    triples = [
+        ("USD", "GBP", "2025-03-01"),
+        ("USD", "EUR", "2025-03-01"),
+        ("EUR", "GBP", "2025-03-02"),
+        ("USD", "JPY", "2025-03-01"),
+        ("USD", "EUR", "2025-03-01"),
+    ]
+
+    data = await generic_api.get_exchange_rate_data_bulk(triples)
+
+    assert [(item["source_currency"], item["exchanged_currency"], item["valuation_date"]) for item in data] == triples
+    assert [item["rate_value"] for item in data] == [0.5, 0.85, 0.5, 0.5, 0.85]
+    generic_api.internal_api.get_rate_values_bulk.assert_awaited_once_with(triples[:4])
+    assert sorted(call.args for call in mock_providers_api.get_historical_rates.await_args_list) == [
+        ("2025-03-01", "USD", ["GBP", "JPY"], "MC"),
+        ("2025-03-02", "EUR", ["GBP"], "MC"),
+    ]
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_get_exchange_rate_data_thundering_herd(mock_get_active_providers, generic_api, mock_providers_api):
+    """Test that concurrent requests missing the same rate make a single provider call."""
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_exchange_rate_data = AsyncMock(return_value={"rate_value": None})
+
+    async def get_historical_rates(date, base, symbols, provider):
+        await asyncio.sleep(0.05)
+        return {"EUR": 1.05}
+    mock_providers_api.get_historical_rates.side_effect = get_historical_rates
+
+    results = await asyncio.gather(*(generic_api.get_exchange_rate_data("USD", "EUR", "2025-03-01") for _ in range(50)))
+
+    assert results == [{"rate_value": 1.05}] * 50
+    assert mock_providers_api.get_historical_rates.await_count == 1
+
+@pytest.mark.asyncio
+@patch('backbase_app.api.generic_api.get_active_providers', new_callable=AsyncMock)
+async def test_pair_lookup_and_gap_fill_are_not_coalesced(mock_get_active_providers, generic_api, mock_providers_api):
+    """Test that a pair lookup and a gap fill of the same rate run concurrently each get their own result shape."""
+    mock_get_active_providers.return_value = make_providers(("MC", 5, 1))
+    generic_api.internal_api = MagicMock()
+    generic_api.internal_api.get_exchange_rate_data = AsyncMock(return_value={"rate_value": None})
+    generic_api.internal_api.get_rate_values_bulk = AsyncMock(return_value={("USD", "EUR", "2025-03-01"): None})
+
+    async def get_historical_rates(date, base, symbols, provider):
+        await asyncio.sleep(0.05)
+        return {"EUR": 1.05}
+    mock_providers_api.get_historical_rates.side_effect = get_historical_rates
+
+    pair, bulk = await asyncio.gather(
+        generic_api.get_exchange_rate_data("USD", "EUR", "2025-03-01"),
+        generic_api.get_exchange_rate_data_bulk([("USD", "EUR", "2025-03-01")]),
+    )
+
+    assert pair == {"rate_value": 1.05}
+    assert bulk == [{"source_currency": "USD", "exchanged_currency": "EUR", "valuation_date": "2025-03-01", "rate_value": 1.05}]
@@ -1,5 +1,6 @@
 import pytest
 import re
+from decimal import Decimal
 from aioresponses import aioresponses
 import sys
 import os
@@ -30,7 +31,7 @@ async def test_get_exchange_rate_data():
     assert response["source_currency"] == "USD"
     assert response["exchanged_currency"] == "EUR"
     assert response["valuation_date"] == "2025-03-31"
-    assert response["rate_value"] == 0.85
+    assert response["rate_value"] == Decimal("0.85")
 
 @pytest.mark.asyncio
 async def test_get_currency_rates_list():
@@ -45,20 +46,42 @@ async def test_get_currency_rates_list():
         m.get(re.compile(r".*currency_rates_list_api.*"), payload=mock_response)
         response = await api.get_currency_rates_list("2025-03-30", "2025-03-31", "USD", "EUR")
     
-    assert response["2025-03-30"]["EUR"] == 0.85
-    assert response["2025-03-31"]["EUR"] == 0.86
+    assert response["2025-03-30"]["EUR"] == Decimal("0.85")
+    assert response["2025-03-31"]["EUR"] == Decimal("0.86")
+
+@pytest.mark.asyncio
+async def test_get_currency_rates_list_newest_first():
+    """Test that the rates are grouped when the endpoint returns the newest date first."""
+    api = InternalAPI()
+
+    mock_response = [
+        {"valuation_date": "2025-04-01", "exchanged_currency__symbol": "EUR", "rate_value": "0.870000"},
+        {"valuation_date": "2025-03-30", "exchanged_currency__symbol": "GBP", "rate_value": "0.750000"},
+        {"valuation_date": "2025-03-30", "exchanged_currency__symbol": "EUR", "rate_value": "0.850000"}
+    ]
+
+    with aioresponses() as m:
+        m.get(re.compile(r".*currency_rates_list_api.*"), payload=mock_response)
+        response = await api.get_currency_rates_list("2025-03-30", "2025-04-01", "USD", "EUR,GBP")
+
+    assert response == {
+        "2025-03-30": {"EUR": Decimal("0.85"), "GBP": Decimal("0.75")},
+        "2025-03-31": {},
+        "2025-04-01": {"EUR": Decimal("0.87")},
+    }
 
 @pytest.mark.asyncio
 async def test_get_convert_amount():
     api = InternalAPI()
     
-    mock_response = {"rate_value": 0.85}
+    mock_response = {"EUR": {"valuation_date": "2025-03-01", "rate_value": 0.85}}
     
     with aioresponses() as m:
-        m.get(re.compile(r".*currency_exchange_api.*"), payload=mock_response)
-        response = await api.get_convert_amount("USD", "EUR", 100)
+        m.get(re.compile(r".*latest_rate_api.*"), payload=mock_response)
+        response = await api.get_convert_amount("USD", "EUR", Decimal("100"))
     
+    assert response["date"] == "2025-03-01"    
     assert response["from"] == "USD"
     assert response["to"] == "EUR"
     assert response["amount"] == 100
-    assert response["value"] == 85.0  # 100 * 0.85
+    assert response["value"] == Decimal("85")  # 100 * 0.85
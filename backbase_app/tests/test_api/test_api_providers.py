@@ -10,7 +10,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
 import django
 django.setup()
 
-from backbase_app.api.providers_api import ProvidersAPI
+from decimal import Decimal
+from datetime import date
+from backbase_app.api.providers_api import ProvidersAPI, build_rate_rows, save_data_rates, save_data_time_series
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.provider_registry import provider_registry
+from backbase_app.models import Currency, CurrencyExchangeRate, LatestRate
 from backbase_app.external_services.api_mock import MockAPI
 from backbase_app.external_services.api_currencybeacon import CurrencyBeaconAPI
 
@@ -53,130 +59,163 @@ def providers_api(mock_api, mock_cb_api):
     Returns:
         ProvidersAPI: An instance of ProvidersAPI with mocked dependencies.
     """
-    with patch('backbase_app.api.providers_api.MockAPI', return_value=mock_api), \
-         patch('backbase_app.api.providers_api.CurrencyBeaconAPI', return_value=mock_cb_api):
+    client_classes = {"MC": MagicMock(return_value=mock_api), "CB": MagicMock(return_value=mock_cb_api)}
+    with patch.object(provider_registry, 'get_client_classes', return_value=client_classes):
         api = ProvidersAPI()
         return api
 
 @pytest.mark.asyncio
-@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
-async def test_get_latest_rates_mc(mock_save_data_rate, providers_api):
+@patch("backbase_app.api.providers_api.save_data_rates", new_callable=AsyncMock)
+async def test_get_latest_rates_mc(mock_save_data_rates, providers_api):
     """Test the get_latest_rates method of ProvidersAPI with Mock API.
 
     Args:
-        mock_save_data_rate: Mocked function for saving rate data.
+        mock_save_data_rates: Mocked function for bulk saving rate data.
         providers_api: Fixture providing a ProvidersAPI instance.
 
     Tests:
         - Verifies that the method returns correct exchange rates
-        - Confirms that save_data_rate is called once
+        - Confirms that the rates are saved with one save_data_rates call
     """
-    mock_save_data_rate.return_value = {"rate_value": 1.1}
+    mock_save_data_rates.return_value = {"EUR": Decimal("1.1")}
 
     result = await providers_api.get_latest_rates("USD", ["EUR"], "MC")
 
-    assert result == {"EUR": 1.1}
-    mock_save_data_rate.assert_called_once()
+    assert result == {"EUR": Decimal("1.1")}
+    mock_save_data_rates.assert_called_once_with("USD", {"EUR": Decimal("1.1")})
 
 @pytest.mark.asyncio
-@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
-async def test_get_latest_rates_cb(mock_save_data_rate, providers_api):
+@patch("backbase_app.api.providers_api.save_data_rates", new_callable=AsyncMock)
+async def test_get_latest_rates_without_saving(mock_save_data_rates, providers_api):
+    """Test get_latest_rates with save_data disabled.
+
+    Args:
+        mock_save_data_rates: Mocked function for bulk saving rate data.
+        providers_api: Fixture providing a ProvidersAPI instance.
+
+    Tests:
+        - Verifies that the provider rates are returned, None for missing symbols
+        - Confirms that nothing is saved
+    """
+    result = await providers_api.get_latest_rates("USD", ["EUR", "GBP"], "MC", save_data=False)
+
+    assert result == {"EUR": Decimal("1.1"), "GBP": None}
+    mock_save_data_rates.assert_not_called()
+
+@pytest.mark.asyncio
+@patch("backbase_app.api.providers_api.save_data_rates", new_callable=AsyncMock)
+async def test_get_latest_rates_cb(mock_save_data_rates, providers_api):
     """Test the get_latest_rates method of ProvidersAPI with CurrencyBeacon API.
 
     Args:
-        mock_save_data_rate: Mocked function for saving rate data.
+        mock_save_data_rates: Mocked function for bulk saving rate data.
         providers_api: Fixture providing a ProvidersAPI instance.
 
     Tests:
         - Verifies that the method returns correct exchange rates
-        - Confirms that save_data_rate is called once
+        - Confirms that the rates are saved with one save_data_rates call
     """
-    mock_save_data_rate.return_value = {"rate_value": 1.15}
+    mock_save_data_rates.return_value = {"EUR": Decimal("1.15")}
 
     result = await providers_api.get_latest_rates("USD", ["EUR"], "CB")
 
-    assert result == {"EUR": 1.15}
-    mock_save_data_rate.assert_called_once()
+    assert result == {"EUR": Decimal("1.15")}
+    mock_save_data_rates.assert_called_once()
 
 @pytest.mark.asyncio
-@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
-async def test_get_historical_rates_mc(mock_save_data_rate, providers_api):
+@patch("backbase_app.api.providers_api.save_data_rates", new_callable=AsyncMock)
+async def test_get_historical_rates_mc(mock_save_data_rates, providers_api):
     """Test the get_historical_rates method of ProvidersAPI with Mock API.
 
     Args:
-        mock_save_data_rate: Mocked function for saving rate data.
+        mock_save_data_rates: Mocked function for bulk saving rate data.
         providers_api: Fixture providing a ProvidersAPI instance.
 
     Tests:
         - Verifies that the method returns correct historical exchange rates
-        - Confirms that save_data_rate is called once
+        - Confirms that the rates are saved with one save_data_rates call
     """
-    mock_save_data_rate.return_value = {"rate_value": 1.05}
+    mock_save_data_rates.return_value = {"EUR": Decimal("1.05")}
 
     result = await providers_api.get_historical_rates("2025-03-01", "USD", ["EUR"], "MC")
 
-    assert result == {"EUR": 1.05}
-    mock_save_data_rate.assert_called_once()
+    assert result == {"EUR": Decimal("1.05")}
+    mock_save_data_rates.assert_called_once()
 
 @pytest.mark.asyncio
-@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
-async def test_get_historical_rates_cb(mock_save_data_rate, providers_api):
+@patch("backbase_app.api.providers_api.save_data_rates", new_callable=AsyncMock)
+async def test_get_historical_rates_cb(mock_save_data_rates, providers_api):
     """Test the get_historical_rates method of ProvidersAPI with CurrencyBeacon API.
 
     Args:
-        mock_save_data_rate: Mocked function for saving rate data.
+        mock_save_data_rates: Mocked function for bulk saving rate data.
         providers_api: Fixture providing a ProvidersAPI instance.
 
     Tests:
         - Verifies that the method returns correct historical exchange rates
-        - Confirms that save_data_rate is called once
+        - Confirms that the rates are saved with one save_data_rates call
     """
-    mock_save_data_rate.return_value = {"rate_value": 1.08}
+    mock_save_data_rates.return_value = {"EUR": Decimal("1.08")}
 
     result = await providers_api.get_historical_rates("2025-03-01", "USD", ["EUR"], "CB")
 
-    assert result == {"EUR": 1.08}
-    mock_save_data_rate.assert_called_once()
+    assert result == {"EUR": Decimal("1.08")}
+    mock_save_data_rates.assert_called_once()
 
 @pytest.mark.asyncio
-@patch("backbase_app.api.providers_api.save_data_convert", new_callable=AsyncMock)
-async def test_convert_currency_mc(mock_save_data_convert, providers_api):
+@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
+async def test_convert_currency_mc(mock_save_data_rate, providers_api):
     """Test the convert_currency method of ProvidersAPI with Mock API.
 
     Args:
-        mock_save_data_convert: Mocked function for saving conversion data.
+        mock_save_data_rate: Mocked function for saving conversion data.
         providers_api: Fixture providing a ProvidersAPI instance.
 
     Tests:
         - Verifies that the method returns correct converted amount
-        - Confirms that save_data_convert is called once
+        - Confirms that save_data_rate is called once
     """
-    mock_save_data_convert.return_value = None
+    mock_save_data_rate.return_value = None
 
-    result = await providers_api.convert_currency("USD", "EUR", 100, "MC")
+    result = await providers_api.convert_currency("USD", "EUR", Decimal("100"), "MC")
 
-    assert result == {"value": 110}
-    mock_save_data_convert.assert_called_once()
+    assert result == {"amount": Decimal("100"), "value": Decimal("110")}
+    mock_save_data_rate.assert_called_once()
 
 @pytest.mark.asyncio
-@patch("backbase_app.api.providers_api.save_data_convert", new_callable=AsyncMock)
-async def test_convert_currency_cb(mock_save_data_convert, providers_api):
+@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
+async def test_convert_currency_cb(mock_save_data_rate, providers_api):
     """Test the convert_currency method of ProvidersAPI with CurrencyBeacon API.
 
     Args:
-        mock_save_data_convert: Mocked function for saving conversion data.
+        mock_save_data_rate: Mocked function for saving conversion data.
         providers_api: Fixture providing a ProvidersAPI instance.
 
     Tests:
         - Verifies that the method returns correct converted amount
-        - Confirms that save_data_convert is called once
+        - Confirms that save_data_rate is called once
     """
-    mock_save_data_convert.return_value = None
+    mock_save_data_rate.return_value = None
+
+    result = await providers_api.convert_currency("USD", "EUR", Decimal("100"), "CB")
 
-    result = await providers_api.convert_currency("USD", "EUR", 100, "CB")
+    assert result == {"amount": Decimal("100"), "value": Decimal("115")}
+    mock_save_data_rate.assert_called_once()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("raw_value, expected_value, expected_rate", [
+    (0.0001492345, Decimal("0.000149"), Decimal("149.234500")),
+    (0.0000002, Decimal("0.000000"), Decimal("0.200000")),
+])
+@patch("backbase_app.api.providers_api.save_data_rate", new_callable=AsyncMock)
+async def test_convert_currency_tiny_amount(mock_save_data_rate, providers_api, mock_api, raw_value, expected_value, expected_rate):
+    """Test that the stored rate of a tiny amount is derived from the unrounded provider value."""
+    mock_api.convert_currency.return_value = {"value": raw_value}
+
+    result = await providers_api.convert_currency("USD", "JPY", Decimal("0.000001"), "MC")
 
-    assert result == {"value": 115}
-    mock_save_data_convert.assert_called_once()
+    assert result["value"] == expected_value
+    mock_save_data_rate.assert_awaited_once_with("USD", "JPY", expected_rate)
 
 @pytest.mark.asyncio
 @patch("backbase_app.api.providers_api.save_data_time_series", new_callable=AsyncMock)
@@ -195,7 +234,7 @@ async def test_get_time_series_mc(mock_save_data_time_series, providers_api):
 
     result = await providers_api.get_time_series("2025-03-01", "2025-03-01", "USD", ["EUR"], "MC")
 
-    assert result == {"2025-03-01": {"EUR": 1.1, "USD": 1.2}}
+    assert result == {"2025-03-01": {"EUR": Decimal("1.1"), "USD": Decimal("1.2")}}
     mock_save_data_time_series.assert_called_once()
 
 @pytest.mark.asyncio
@@ -215,5 +254,65 @@ async def test_get_time_series_cb(mock_save_data_time_series, providers_api):
 
     result = await providers_api.get_time_series("2025-03-01", "2025-03-01", "USD", ["EUR"], "CB")
 
-    assert result == {"2025-03-01": {"EUR": 1.15, "USD": 1.25}}
+    assert result == {"2025-03-01": {"EUR": Decimal("1.15"), "USD": Decimal("1.25")}}
     mock_save_data_time_series.assert_called_once()
+
+@pytest.mark.django_db
+def test_save_data_rates_bulk_upsert(django_assert_max_num_queries):
+    """Test that save_data_rates writes a whole provider response with a constant number of queries.
+
+    Tests:
+        - Verifies that new rates are inserted and existing rates are updated
+        - Confirms that unknown symbols are reported as None
+        - Confirms that the query count does not grow with the number of symbols
+    """
+    symbols = ["EUR", "GBP", "CHF", "JPY", "CAD", "AUD"]
+    for symbol in ["USD"] + symbols:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+    CurrencyExchangeRate.objects.create(
+        source_currency=Currency.objects.get(symbol="USD"),
+        exchanged_currency=Currency.objects.get(symbol="EUR"),
+        valuation_date="2025-03-01",
+        rate_value=0.5
+    )
+    rates = {symbol: 1.5 for symbol in symbols}
+    rates["XXX"] = 2.0
+
+    with django_assert_max_num_queries(6):
+        result = save_data_rates.func("USD", rates, "2025-03-01")
+
+    assert result == {**{symbol: 1.5 for symbol in symbols}, "XXX": None}
+    assert CurrencyExchangeRate.objects.filter(valuation_date="2025-03-01").count() == len(symbols)
+    assert CurrencyExchangeRate.objects.get(exchanged_currency__symbol="EUR").rate_value == Decimal("1.5")
+
+@pytest.mark.django_db
+def test_build_rate_rows_skips_unknown_and_missing_rates():
+    for symbol in ["USD", "EUR"]:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+
+    rows, cells = build_rate_rows([
+        ("USD", "EUR", "2025-03-01", Decimal("0.85")),
+        ("USD", "XXX", "2025-03-01", Decimal("1.5")),
+        ("USD", "EUR", date(2025, 3, 2), None),
+    ])
+
+    assert [(row.valuation_date, row.rate_value) for row in rows] == [(date(2025, 3, 1), Decimal("0.85"))]
+    assert cells == [("USD", "EUR", date(2025, 3, 1), Decimal("0.85"))]
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("replace", [False, True])
+def test_save_data_time_series_invalidates(replace):
+    """Test that both time series write paths refresh LatestRate and drop the cached rates and cross-rate vectors."""
+    for symbol in ["USD", "EUR"]:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+    rate_cache.clear()
+    cross_rates.clear()
+    rate_cache.set("USD", "EUR", "2025-03-01", Decimal("0.5"))
+    cross_rates.vectors["2025-03-01"] = (float("inf"), None)
+
+    rows = save_data_time_series.func({"2025-03-01": {"EUR": Decimal("0.85")}, "2025-03-02": {"EUR": Decimal("0.86")}}, "USD", replace=replace)
+
+    assert rows == 2
+    assert rate_cache.get("USD", "EUR", "2025-03-01") is None
+    assert "2025-03-01" not in cross_rates.vectors
+    assert LatestRate.objects.get().rate_value == Decimal("0.86")
@@ -0,0 +1,168 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.utils import timezone
+from backbase_app.api.repository_api import RepositoryAPI, get_rate_values, get_rate_values_bulk, read_latest_rate_values
+from backbase_app.api.internal_api import InternalAPI
+from backbase_app.api.generic_api import GenericAPI
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.models import Currency, CurrencyExchangeRate
+
+@pytest.fixture
+def rates(db):
+    """Create USD based rates for EUR and GBP in the database.
+
+    Args:
+        db: Django test database fixture.
+    """
+    rate_cache.clear()
+    cross_rates.clear()
+    usd = Currency.objects.create(code='USD', name='US Dollar', symbol='USD')
+    eur = Currency.objects.create(code='EUR', name='Euro', symbol='EUR')
+    gbp = Currency.objects.create(code='GBP', name='Pound', symbol='GBP')
+    today = timezone.now().date()
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=eur, valuation_date=date(2025, 3, 30), rate_value=Decimal("0.85"))
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=eur, valuation_date=date(2025, 3, 31), rate_value=Decimal("0.86"))
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=gbp, valuation_date=date(2025, 3, 31), rate_value=Decimal("0.75"))
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=eur, valuation_date=today, rate_value=Decimal("0.9"))
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_exchange_rate_data(rates):
+    api = RepositoryAPI()
+
+    response = await api.get_exchange_rate_data("USD", "EUR", "2025-03-31")
+    missing = await api.get_exchange_rate_data("USD", "GBP", "2025-03-30")
+
+    assert response == {"rate_value": Decimal("0.86")}
+    assert missing == {"rate_value": None}
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_exchange_rate_data_cross_rate(rates):
+    """Test that a pair that is not stored is derived from the USD rates of the date."""
+    api = RepositoryAPI()
+
+    response = await api.get_exchange_rate_data("EUR", "GBP", "2025-03-31")
+    missing = await api.get_exchange_rate_data("EUR", "GBP", "2025-03-30")
+
+    assert response == {"rate_value": Decimal("0.872093")}
+    assert missing == {"rate_value": None}
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_currency_rates_list(rates):
+    api = RepositoryAPI()
+
+    response = await api.get_currency_rates_list("2025-03-30", "2025-04-01", "USD", "EUR, GBP")
+
+    assert response == {
+        "2025-03-30": {"EUR": Decimal("0.85")},
+        "2025-03-31": {"EUR": Decimal("0.86"), "GBP": Decimal("0.75")},
+        "2025-04-01": {},
+    }
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_convert_amount(rates):
+    api = RepositoryAPI()
+
+    response = await api.get_convert_amount("USD", "EUR", Decimal("100"))
+    missing = await api.get_convert_amount("USD", "GBP", Decimal("100"))
+
+    assert response["from"] == "USD"
+    assert response["to"] == "EUR"
+    assert response["amount"] == 100
+    assert response["date"] == str(timezone.now().date())
+    assert response["value"] == Decimal("90")
+    assert missing["value"] is None
+
+def test_get_rate_values(rates, django_assert_num_queries):
+    """Test that the stored rates of several currencies are read with one query, then from the cache."""
+    currency_registry.load()
+    with django_assert_num_queries(1):
+        response = get_rate_values.func("USD", ["EUR", "GBP"], "2025-03-31")
+    with django_assert_num_queries(0):
+        cached = get_rate_values.func("USD", ["EUR", "GBP"], "2025-03-31")
+
+    assert response == {"EUR": Decimal("0.86"), "GBP": Decimal("0.75")}
+    assert cached == response
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_rate_values_cross_rate(rates):
+    api = RepositoryAPI()
+
+    response = await api.get_rate_values("EUR", ["GBP", "USD"], "2025-03-31")
+    missing = await api.get_rate_values("EUR", ["GBP"], "2025-03-30")
+
+    assert response == {"GBP": Decimal("0.872093"), "USD": Decimal("1.162791")}
+    assert missing == {"GBP": None}
+
+def test_get_rate_values_bulk(rates, django_assert_num_queries):
+    """Test that many triples are read with one query per source currency, the others being derived."""
+    currency_registry.load()
+    triples = [("USD", "EUR", "2025-03-30"), ("USD", "GBP", "2025-03-31"), ("USD", "EUR", "2025-03-31")]
+    with django_assert_num_queries(1):
+        response = get_rate_values_bulk.func(triples)
+    cross = get_rate_values_bulk.func([("EUR", "GBP", "2025-03-31"), ("USD", "GBP", "2025-03-30"), ("USD", "EUR", "2025-03-31")])
+
+    assert response == {("USD", "EUR", "2025-03-30"): Decimal("0.85"), ("USD", "GBP", "2025-03-31"): Decimal("0.75"), ("USD", "EUR", "2025-03-31"): Decimal("0.86")}
+    assert cross == {("EUR", "GBP", "2025-03-31"): Decimal("0.872093"), ("USD", "GBP", "2025-03-30"): None, ("USD", "EUR", "2025-03-31"): Decimal("0.86")}
+
+def test_get_latest_rate_values(rates, django_assert_num_queries):
+    """Test that the latest rates are read with one query, the ones older than the tolerance being left out."""
+    currency_registry.load()
+    today = timezone.now().date()
+    with django_assert_num_queries(1):
+        response = read_latest_rate_values("USD", ["EUR", "GBP"])
+
+    assert response == {"EUR": (str(today), Decimal("0.9")), "GBP": None}
+    assert read_latest_rate_values("USD", ["JPY"]) == {"JPY": None}
+    assert read_latest_rate_values("USD", ["GBP"], max_age_days=(today - date(2025, 3, 31)).days) == {"GBP": ("2025-03-31", Decimal("0.75"))}
+
+def test_get_latest_rate_values_tolerance(rates, settings):
+    """Test that yesterday's rate is used within LATEST_RATE_MAX_AGE_DAYS and a cross rate is only derived from base rates of one date."""
+    usd, gbp = Currency.objects.get(code='USD'), Currency.objects.get(code='GBP')
+    yesterday = timezone.now().date() - timedelta(days=1)
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=gbp, valuation_date=yesterday, rate_value=Decimal("0.8"))
+
+    settings.LATEST_RATE_MAX_AGE_DAYS = 1
+    assert read_latest_rate_values("USD", ["GBP"]) == {"GBP": (str(yesterday), Decimal("0.8"))}
+    assert read_latest_rate_values("EUR", ["GBP", "USD"]) == {"GBP": None, "USD": (str(timezone.now().date()), Decimal("1.111111"))}
+    settings.LATEST_RATE_MAX_AGE_DAYS = 0
+    assert read_latest_rate_values("USD", ["GBP"]) == {"GBP": None}
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=gbp, valuation_date=timezone.now().date(), rate_value=Decimal("0.81"))
+    assert read_latest_rate_values("EUR", ["GBP"]) == {"GBP": (str(timezone.now().date()), Decimal("0.9"))}
+
+def test_get_latest_rate_values_newer_derived(rates, settings):
+    """Test that a same-day derived rate beats a stale stored pair, and the stored pair wins on the same date."""
+    usd, eur, gbp = (Currency.objects.get(code=code) for code in ('USD', 'EUR', 'GBP'))
+    today = timezone.now().date()
+    CurrencyExchangeRate.objects.create(source_currency=eur, exchanged_currency=gbp, valuation_date=today - timedelta(days=3), rate_value=Decimal("0.7"))
+    CurrencyExchangeRate.objects.create(source_currency=usd, exchanged_currency=gbp, valuation_date=today, rate_value=Decimal("0.81"))
+
+    settings.LATEST_RATE_MAX_AGE_DAYS = 7
+    assert read_latest_rate_values("EUR", ["GBP"]) == {"GBP": (str(today), Decimal("0.9"))}
+    CurrencyExchangeRate.objects.create(source_currency=eur, exchanged_currency=gbp, valuation_date=today, rate_value=Decimal("0.91"))
+    assert read_latest_rate_values("EUR", ["GBP"]) == {"GBP": (str(today), Decimal("0.91"))}
+
+def test_generic_api_internal_mode():
+    """Test that GenericAPI reads in-process unless the HTTP mode is configured."""
+    with patch('backbase_app.api.generic_api.settings.INTERNAL_API_MODE', "repository"):
+        assert isinstance(GenericAPI().internal_api, RepositoryAPI)
+    with patch('backbase_app.api.generic_api.settings.INTERNAL_API_MODE', "http"):
+        assert isinstance(GenericAPI().internal_api, InternalAPI)
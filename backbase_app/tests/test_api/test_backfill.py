@@ -0,0 +1,175 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.test import override_settings
+from backbase_project.celery import app
+from backbase_app.api import backfill
+from backbase_app.api.backfill import count_missing_cells, create_backfill_job, plan_chunks
+from backbase_app.api.circuit_breaker import circuit_breakers
+from backbase_app.external_services.api_mock import MockAPI
+from backbase_app.models import BackfillJob, Currency, CurrencyExchangeRate, ProviderExchange
+from backbase_app.tasks import backfill_done, backfill_failed, backfill_rates
+
+CHUNK_SETTINGS = {"BACKFILL_CHUNK_DAYS": 2, "BACKFILL_CHUNK_SYMBOLS": 1}
+
+@pytest.fixture
+def mock_provider(transactional_db):
+    """Create USD, EUR and GBP currencies and activate the mock provider.
+
+    Args:
+        transactional_db: Django test database fixture committing its data.
+
+    Returns:
+        ProviderExchange: The mock provider.
+    """
+    circuit_breakers.breakers.clear()
+    for symbol in ["USD", "EUR", "GBP"]:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+    return ProviderExchange.objects.create(id_name="MC", name="Mock", activated=True, priority=1)
+
+def test_plan_chunks():
+    chunks = plan_chunks(date(2024, 12, 30), date(2025, 1, 2), ["EUR", "GBP", "JPY"], chunk_days=3, chunk_symbols=2)
+
+    assert chunks == [
+        (date(2024, 12, 30), date(2025, 1, 1), ["EUR", "GBP"]),
+        (date(2024, 12, 30), date(2025, 1, 1), ["JPY"]),
+        (date(2025, 1, 2), date(2025, 1, 2), ["EUR", "GBP"]),
+        (date(2025, 1, 2), date(2025, 1, 2), ["JPY"]),
+    ]
+
+def test_count_missing_cells():
+    series = {"2025-01-01": {"EUR": 1.1, "GBP": 0.8}, "2025-01-02": {"EUR": 1.1, "GBP": None}}
+
+    assert count_missing_cells(series, "2025-01-01", "2025-01-03", ["EUR", "GBP"]) == 3
+    assert count_missing_cells(series, "2025-01-01", "2025-01-01", ["EUR", "GBP"]) == 0
+
+@override_settings(**CHUNK_SETTINGS)
+def test_backfill_stores_every_chunk(mock_provider):
+    call_command("backfill_rates", "--start", "2024-12-30", "--end", "2025-01-02", "--symbols", "EUR,GBP", "--sync")
+
+    job = BackfillJob.objects.get()
+    assert job.status == BackfillJob.DONE
+    assert job.chunks.count() == 4
+    assert job.rows == 8
+    assert job.rows_per_second > 0
+    assert CurrencyExchangeRate.objects.count() == 8
+
+@override_settings(**CHUNK_SETTINGS)
+def test_backfill_resumes_unfinished_chunks(mock_provider):
+    get_time_series = MockAPI.get_time_series
+    unavailable_dates = {"2025-01-01"}
+    calls = []
+
+    async def flaky_time_series(self, start_date, end_date, base="USD", symbols=None):
+        calls.append((start_date, tuple(symbols)))
+        if start_date in unavailable_dates:
+            raise ConnectionError("provider unavailable")
+        return await get_time_series(self, start_date, end_date, base, symbols)
+
+    with patch.object(MockAPI, "get_time_series", flaky_time_series):
+        call_command("backfill_rates", "--start", "2024-12-30", "--end", "2025-01-02", "--symbols", "EUR,GBP", "--sync")
+        job = BackfillJob.objects.get()
+        assert job.status == BackfillJob.FAILED
+        assert job.rows == 4
+
+        unavailable_dates.clear()
+        calls.clear()
+        call_command("backfill_rates", "--resume", str(job.id), "--sync")
+
+    job.refresh_from_db()
+    assert sorted(calls) == [("2025-01-01", ("EUR",)), ("2025-01-01", ("GBP",))]
+    assert job.status == BackfillJob.DONE
+    assert job.rows == 8
+    assert CurrencyExchangeRate.objects.count() == 8
+
+@override_settings(**CHUNK_SETTINGS)
+def test_backfill_task_runs_chunks_as_chord(mock_provider):
+    job = create_backfill_job("USD", date(2024, 12, 30), date(2025, 1, 2), ["EUR", "GBP"])
+
+    app.conf.task_always_eager = True
+    try:
+        backfill_rates.delay(job.id)
+    finally:
+        app.conf.task_always_eager = False
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.DONE
+    assert job.rows == 8
+    assert not job.chunks.exclude(status=BackfillJob.DONE).exists()
+
+@override_settings(**CHUNK_SETTINGS)
+def test_backfill_partial_chunk_fails(mock_provider):
+    """Test that a chunk whose answer misses a date is stored as far as it goes but not marked done."""
+    get_time_series = MockAPI.get_time_series
+    missing_dates = {"2025-01-02"}
+
+    async def partial_time_series(self, start_date, end_date, base="USD", symbols=None):
+        series = await get_time_series(self, start_date, end_date, base, symbols)
+        return {current_date: rates for current_date, rates in series.items() if current_date not in missing_dates}
+
+    with patch.object(MockAPI, "get_time_series", partial_time_series):
+        call_command("backfill_rates", "--start", "2025-01-01", "--end", "2025-01-02", "--symbols", "EUR", "--sync")
+        job = BackfillJob.objects.get()
+        assert job.status == BackfillJob.FAILED
+        assert job.chunks.get().status == BackfillJob.FAILED
+        assert CurrencyExchangeRate.objects.count() == 1
+
+        missing_dates.clear()
+        call_command("backfill_rates", "--resume", str(job.id), "--sync")
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.DONE
+    assert job.rows == 2
+
+@override_settings(**CHUNK_SETTINGS)
+def test_backfill_task_chunk_error_fails_job(mock_provider):
+    """Test that a chunk task raising past the chord fails the backfill instead of leaving it running."""
+    job = create_backfill_job("USD", date(2024, 12, 30), date(2025, 1, 2), ["EUR", "GBP"])
+    failing_chunk = job.chunks.order_by('id').last().id
+    run_backfill_chunk = backfill.run_backfill_chunk
+
+    async def crashing_chunk(chunk_id):
+        if chunk_id == failing_chunk:
+            raise RuntimeError("database unavailable")
+        return await run_backfill_chunk(chunk_id)
+
+    app.conf.task_always_eager = True
+    try:
+        with patch.object(backfill, "run_backfill_chunk", crashing_chunk):
+            backfill_rates.delay(job.id)
+    finally:
+        app.conf.task_always_eager = False
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.FAILED
+    assert job.finished_at is not None
+    assert job.chunks.exclude(status=BackfillJob.DONE).get().id == failing_chunk
+
+@override_settings(**CHUNK_SETTINGS)
+def test_backfill_chord_error_fails_job(mock_provider):
+    """Test that the error callback of the chord records the run as failed."""
+    job = create_backfill_job("USD", date(2024, 12, 30), date(2025, 1, 2), ["EUR", "GBP"])
+    backfill.start_backfill_run(job.id)
+    callback = backfill_done.s(job.id).on_error(backfill_failed.si(job.id))
+
+    app.conf.task_always_eager = True
+    try:
+        with patch.object(app.backend, "fail_from_current_stack"):
+            app.backend.chord_error_from_stack(callback, RuntimeError("chunk lost"))
+    finally:
+        app.conf.task_always_eager = False
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.FAILED
+    assert job.finished_at is not None
@@ -0,0 +1,69 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from backbase_app.api.bulk_load import insert_rates
+from backbase_app.models import Currency, CurrencyExchangeRate
+
+@pytest.fixture
+def currencies(db):
+    """Create USD, EUR and GBP currencies in the database.
+
+    Args:
+        db: Django test database fixture.
+
+    Returns:
+        Dict[str, Currency]: The created currencies by symbol.
+    """
+    return {symbol: Currency.objects.create(code=symbol, name=symbol, symbol=symbol) for symbol in ["USD", "EUR", "GBP"]}
+
+def make_rates(currencies, rate_value):
+    """Build unsaved USD rates for EUR and GBP on two dates.
+
+    Args:
+        currencies: The currencies by symbol.
+        rate_value: The rate of every row.
+
+    Returns:
+        List[CurrencyExchangeRate]: The unsaved rates.
+    """
+    return [
+        CurrencyExchangeRate(
+            source_currency_id=currencies["USD"].id,
+            exchanged_currency_id=currencies[symbol].id,
+            valuation_date=date(2025, 3, day),
+            rate_value=rate_value
+        )
+        for day in (1, 2)
+        for symbol in ("EUR", "GBP")
+    ]
+
+@override_settings(BULK_COPY_MIN_ROWS=1)
+def test_insert_rates_keeps_stored_rates(currencies):
+    insert_rates(make_rates(currencies, Decimal("0.85"))[:1])
+
+    insert_rates(make_rates(currencies, Decimal("0.9")))
+
+    assert CurrencyExchangeRate.objects.count() == 4
+    assert CurrencyExchangeRate.objects.get(exchanged_currency=currencies["EUR"], valuation_date=date(2025, 3, 1)).rate_value == Decimal("0.85")
+    assert CurrencyExchangeRate.objects.get(exchanged_currency=currencies["GBP"], valuation_date=date(2025, 3, 2)).rate_value == Decimal("0.9")
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="COPY is only used on PostgreSQL")
+@override_settings(BULK_COPY_MIN_ROWS=4)
+def test_insert_rates_uses_copy(currencies):
+    with CaptureQueriesContext(connection) as queries:
+        insert_rates(make_rates(currencies, Decimal("0.85")))
+
+    assert any(query["sql"].startswith("COPY rate_load") for query in queries.captured_queries)
@@ -0,0 +1,143 @@
+import pytest
+import threading
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from backbase_app.api.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CLOSED, OPEN, HALF_OPEN
+from backbase_app.models import ProviderExchange
+
+BREAKER_SETTINGS = {
+    "CIRCUIT_BREAKER_WINDOW": 60,
+    "CIRCUIT_BREAKER_MIN_CALLS": 4,
+    "CIRCUIT_BREAKER_ERROR_RATE": 0.5,
+    "CIRCUIT_BREAKER_OPEN_SECONDS": 30,
+    "CIRCUIT_BREAKER_SLOW_CALL": 1,
+    "CIRCUIT_BREAKER_DEMOTE_SCORE": 0.5,
+    "CIRCUIT_BREAKER_SHARED_ALIAS": "",
+}
+
+@pytest.fixture
+def clock():
+    """Patch the wall clock of the circuit breakers.
+
+    Returns:
+        List[float]: Single item list holding the current time, mutable by the test.
+    """
+    now = [1000.0]
+    with patch('backbase_app.api.circuit_breaker.time.time', side_effect=lambda: now[0]):
+        yield now
+
+@override_settings(**BREAKER_SETTINGS)
+def test_breaker_opens_on_error_rate(clock):
+    breaker = CircuitBreaker("CB")
+
+    for succeeded in (True, False, True):
+        breaker.record(succeeded, 0.1)
+    assert breaker.state == CLOSED
+    breaker.record(False, 0.1)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.health_score() == 0
+
+@override_settings(**BREAKER_SETTINGS)
+def test_breaker_half_open_trial(clock):
+    breaker = CircuitBreaker("CB")
+    for _ in range(4):
+        breaker.record(False, 0.1)
+
+    clock[0] += 31
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock[0] += 31
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+@override_settings(**BREAKER_SETTINGS)
+def test_breaker_window(clock):
+    breaker = CircuitBreaker("CB")
+    for _ in range(3):
+        breaker.record(False, 0.1)
+
+    clock[0] += 61
+    breaker.record(False, 0.1)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls"] == 1
+
+@override_settings(**BREAKER_SETTINGS)
+def test_health_score_latency(clock):
+    breaker = CircuitBreaker("CB")
+    for _ in range(4):
+        breaker.record(True, 4)
+
+    assert breaker.health_score() == 0.25
+    assert breaker.stats()["mean_latency"] == 4
+
+@override_settings(**BREAKER_SETTINGS)
+def test_order_demotes_unhealthy_providers(clock):
+    registry = CircuitBreakerRegistry()
+    providers = [ProviderExchange(id_name=id_name) for id_name in ("A", "B", "C", "D")]
+    for _ in range(4):
+        registry.get("A").record(False, 0.1)
+        registry.get("B").record(True, 5)
+
+    ordered = registry.order(providers)
+
+    assert [provider.id_name for provider in ordered] == ["C", "D", "B", "A"]
+
+@override_settings(**{**BREAKER_SETTINGS, "CIRCUIT_BREAKER_SHARED_ALIAS": "breakers"}, CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "breakers": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "breakers"},
+})
+def test_breaker_state_shared(clock):
+    worker = CircuitBreaker("CB")
+    web = CircuitBreaker("CB")
+    for _ in range(4):
+        worker.record(False, 0.1)
+
+    assert not web.allow()
+    assert web.stats()["state"] == OPEN
+
+@pytest.mark.asyncio
+@override_settings(**{**BREAKER_SETTINGS, "CIRCUIT_BREAKER_SHARED_ALIAS": "breakers"}, CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "breakers": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "breakers-async"},
+})
+async def test_breaker_shared_state_off_loop(clock):
+    """Test that async callers read and publish the shared state outside the event loop thread."""
+    threads = []
+
+    def tracked(method):
+        def wrapper(self, *args, **kwargs):
+            threads.append(threading.current_thread())
+            return method(self, *args, **kwargs)
+        return wrapper
+
+    with patch.object(LocMemCache, 'get', tracked(LocMemCache.get)), patch.object(LocMemCache, 'set', tracked(LocMemCache.set)):
+        worker = CircuitBreaker("CB")
+        for _ in range(4):
+            assert await worker.aallow()
+            await worker.arecord(False, 0.1)
+
+        assert not await CircuitBreaker("CB").aallow()
+
+    assert len(threads) == 6
+    assert threading.current_thread() not in threads
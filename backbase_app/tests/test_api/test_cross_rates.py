@@ -0,0 +1,68 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from backbase_app.api.cross_rates import CrossRateEngine, cross_rates
+from backbase_app.api.providers_api import save_data_rates
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.models import Currency, CurrencyExchangeRate
+
+@pytest.fixture
+def currencies(db):
+    """Create USD, EUR, GBP and JPY currencies with USD rates for 2025-03-31.
+
+    Args:
+        db: Django test database fixture.
+
+    Returns:
+        Dict[str, Currency]: The created currencies by symbol.
+    """
+    cross_rates.clear()
+    currencies = {symbol: Currency.objects.create(code=symbol, name=symbol, symbol=symbol) for symbol in ["USD", "EUR", "GBP", "JPY"]}
+    for symbol, rate_value in [("EUR", "0.925"), ("GBP", "0.774"), ("JPY", "149.83")]:
+        CurrencyExchangeRate.objects.create(
+            source_currency=currencies["USD"],
+            exchanged_currency=currencies[symbol],
+            valuation_date=date(2025, 3, 31),
+            rate_value=Decimal(rate_value)
+        )
+    return currencies
+
+def test_rate_derived_from_base(currencies, django_assert_num_queries):
+    engine = CrossRateEngine(base="USD")
+    # the rates saved by the fixture loaded the registry, count its reload too
+    currency_registry.invalidate()
+
+    with django_assert_num_queries(2):
+        assert engine.rate("EUR", "JPY", "2025-03-31") == Decimal("161.978378")
+        assert engine.rate("JPY", "EUR", date(2025, 3, 31)) == Decimal("0.006174")
+        assert engine.rate("USD", "GBP", "2025-03-31") == Decimal("0.774000")
+        assert engine.rate("GBP", "USD", "2025-03-31") == Decimal("1.291990")
+        assert engine.rate("EUR", "EUR", "2025-03-31") == Decimal("1.000000")
+
+    assert engine.rate("EUR", "CHF", "2025-03-31") is None
+    assert engine.rate("EUR", "JPY", "2025-03-30") is None
+
+def test_rate_rounding_half_even(currencies):
+    """Test that a pair is rounded like the 6 decimal places of rate_value."""
+    CurrencyExchangeRate.objects.filter(exchanged_currency=currencies["EUR"]).update(rate_value=Decimal("2"))
+    CurrencyExchangeRate.objects.filter(exchanged_currency=currencies["GBP"]).update(rate_value=Decimal("0.000005"))
+    engine = CrossRateEngine(base="USD")
+
+    assert engine.rate("EUR", "GBP", "2025-03-31") == Decimal("0.000002")
+
+def test_invalidated_by_writes(currencies):
+    assert cross_rates.rate("EUR", "GBP", "2025-03-31") == Decimal("0.836757")
+
+    save_data_rates.func("USD", {"GBP": 0.8}, date(2025, 3, 31))
+
+    assert cross_rates.rate("EUR", "GBP", "2025-03-31") == Decimal("0.864865")
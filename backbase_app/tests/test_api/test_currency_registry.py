@@ -0,0 +1,99 @@
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from backbase_app.api.currency_registry import CurrencyRegistry, currency_registry
+from backbase_app.api.providers_api import save_data_time_series
+from backbase_app.models import Currency, CurrencyExchangeRate
+
+@pytest.fixture
+def currencies(db):
+    """Create USD, EUR and GBP currencies in the database.
+
+    Args:
+        db: Django test database fixture.
+
+    Returns:
+        Dict[str, Currency]: The created currencies by symbol.
+    """
+    return {symbol: Currency.objects.create(code=symbol, name=symbol, symbol=symbol) for symbol in ["USD", "EUR", "GBP"]}
+
+def test_registry_loads_once(currencies, django_assert_num_queries):
+    registry = CurrencyRegistry()
+
+    with django_assert_num_queries(1):
+        assert registry.get_id("USD") == currencies["USD"].id
+        assert registry.get_ids(["EUR", "GBP"]) == {"EUR": currencies["EUR"].id, "GBP": currencies["GBP"].id}
+        assert registry.get_symbol(currencies["EUR"].id) == "EUR"
+        assert registry.find("GBP").code == "GBP"
+
+    with pytest.raises(TypeError):
+        registry.get_snapshot().by_symbol["CHF"] = None
+
+def test_registry_unknown_symbol(currencies):
+    registry = CurrencyRegistry()
+
+    assert registry.find_id("XXX") is None
+    assert registry.get_ids(["USD", "XXX"]) == {"USD": currencies["USD"].id}
+    with pytest.raises(Currency.DoesNotExist):
+        registry.get_id("XXX")
+
+def test_registry_reloads_missing_symbol(currencies, django_assert_num_queries):
+    registry = CurrencyRegistry()
+    registry.get_snapshot()
+    Currency.objects.filter(pk=currencies["GBP"].pk).update(symbol="CHF")
+
+    with django_assert_num_queries(1):
+        assert registry.get_id("CHF") == currencies["GBP"].id
+
+def test_registry_invalidated_by_signals(currencies):
+    currency_registry.get_snapshot()
+
+    chf = Currency.objects.create(code="CHF", name="Franc", symbol="CHF")
+    assert currency_registry.snapshot is None
+    assert currency_registry.get_id("CHF") == chf.id
+
+    chf.delete()
+    assert currency_registry.snapshot is None
+    assert currency_registry.find_id("CHF") is None
+
+def test_save_data_time_series_queries(currencies, django_assert_max_num_queries):
+    """Test that a time series is stored without one currency lookup per row."""
+    data = {f"2025-03-{day:02d}": {"EUR": 0.85, "GBP": 0.75} for day in range(1, 31)}
+    currency_registry.get_snapshot()
+
+    with django_assert_max_num_queries(3):
+        save_data_time_series.func(data, "USD")
+
+    assert CurrencyExchangeRate.objects.count() == 60
+
+def test_registry_unknown_symbol_reloads_once_per_ttl(currencies, django_assert_num_queries):
+    """Test that repeated lookups of an unknown symbol do not reload the Currency table each time."""
+    registry = CurrencyRegistry(miss_ttl=60)
+    registry.get_snapshot()
+
+    with django_assert_num_queries(1):
+        for _ in range(10):
+            assert registry.find_id("XXX") is None
+            assert registry.get_ids(["USD", "XXX"]) == {"USD": currencies["USD"].id}
+
+    # a symbol not missed yet still reloads, and so does any symbol once the misses expire
+    with django_assert_num_queries(1):
+        assert registry.get_ids(["XXX", "YYY"]) == {}
+    registry.misses = {symbol: 0 for symbol in registry.misses}
+    with django_assert_num_queries(1):
+        assert registry.find_id("XXX") is None
+
+def test_registry_miss_dropped_on_invalidate(currencies):
+    currency_registry.invalidate()
+    assert currency_registry.find_id("CHF") is None
+
+    chf = Currency.objects.create(code="CHF", name="Franc", symbol="CHF")
+    assert currency_registry.find_id("CHF") == chf.id
@@ -0,0 +1,159 @@
+import pytest
+import asyncio
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.test import override_settings
+from django.utils import timezone
+from backbase_app.api.circuit_breaker import circuit_breakers
+from backbase_app.api.daily_snapshot import SnapshotIncomplete, take_daily_snapshot
+from backbase_app.external_services.api_currencybeacon import CurrencyBeaconAPI
+from backbase_app.external_services.api_mock import MockAPI
+from backbase_app.models import Currency, CurrencyExchangeRate, ProviderExchange
+from backbase_app.tasks import save_data_today
+
+@pytest.fixture
+def mock_provider(transactional_db):
+    """Create USD, EUR and GBP currencies and activate the mock provider.
+
+    Args:
+        transactional_db: Django test database fixture committing its data.
+
+    Returns:
+        ProviderExchange: The mock provider.
+    """
+    circuit_breakers.breakers.clear()
+    for symbol in ["USD", "EUR", "GBP"]:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+    return ProviderExchange.objects.create(id_name="MC", name="Mock", activated=True, priority=1)
+
+def stored_pairs():
+    """Get the currency pairs stored for today.
+
+    Returns:
+        Set[Tuple[str, str]]: (base, symbol) of each stored rate.
+    """
+    return set(CurrencyExchangeRate.objects.filter(valuation_date=timezone.now().date()).values_list(
+        'source_currency__code', 'exchanged_currency__code'
+    ))
+
+@override_settings(DAILY_SNAPSHOT_BASES=["USD", "EUR"])
+def test_save_data_today_stores_every_base(mock_provider):
+    report = save_data_today()
+
+    assert report["rows"] == 4
+    assert set(report["bases"]) == {"USD", "EUR"}
+    assert report["missing"] == {}
+    assert report["total_seconds"] >= report["fetch_seconds"]
+    assert stored_pairs() == {("USD", "EUR"), ("USD", "GBP"), ("EUR", "USD"), ("EUR", "GBP")}
+
+def without_symbols(get_latest_rates, missing_symbols, calls):
+    """Wrap MockAPI.get_latest_rates so it leaves some symbols out.
+
+    Args:
+        get_latest_rates: The original MockAPI.get_latest_rates.
+        missing_symbols: Symbols left out of the answers, changed by the test.
+        calls: Collects the (base, symbols) of each call.
+
+    Returns:
+        Callable: The wrapped method.
+    """
+    async def latest_rates(self, base="USD", symbols=[]):
+        calls.append((base, tuple(symbols)))
+        data = await get_latest_rates(self, base, symbols)
+        data["rates"] = {symbol: rate for symbol, rate in data["rates"].items() if symbol not in missing_symbols}
+        return data
+    return latest_rates
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_unavailable_base(mock_provider):
+    get_latest_rates = MockAPI.get_latest_rates
+
+    async def failing_latest_rates(self, base="USD", symbols=[]):
+        if base == "EUR":
+            raise ConnectionError("provider unavailable")
+        return await get_latest_rates(self, base, symbols)
+
+    with patch.object(MockAPI, "get_latest_rates", failing_latest_rates):
+        report = await take_daily_snapshot({"USD": ["EUR", "GBP"], "EUR": ["USD", "GBP"]})
+
+    assert report["rows"] == 2
+    assert report["missing"] == {"EUR": ["USD", "GBP"]}
+
+@pytest.mark.asyncio
+async def test_snapshot_fills_missing_symbols_from_next_provider(mock_provider):
+    await ProviderExchange.objects.acreate(id_name="CB", name="CurrencyBeacon", activated=True, priority=0)
+    calls = []
+
+    async def beacon_latest_rates(self, base="USD", symbols=None):
+        calls.append((base, tuple(symbols)))
+        return {"rates": {symbol: 0.5 for symbol in symbols}}
+
+    with patch.object(MockAPI, "get_latest_rates", without_symbols(MockAPI.get_latest_rates, {"GBP"}, [])), \
+            patch.object(CurrencyBeaconAPI, "get_latest_rates", beacon_latest_rates):
+        report = await take_daily_snapshot({"USD": ["EUR", "GBP"]})
+
+    assert calls == [("USD", ("GBP",))]
+    assert report["rows"] == 2
+    assert report["missing"] == {}
+    assert await CurrencyExchangeRate.objects.filter(exchanged_currency__code="GBP").aget() is not None
+
+def test_save_data_today_retries_missing_symbols(mock_provider):
+    missing_symbols = {"GBP"}
+    calls = []
+    get_latest_rates = without_symbols(MockAPI.get_latest_rates, missing_symbols, calls)
+
+    async def recovering_latest_rates(self, base="USD", symbols=[]):
+        data = await get_latest_rates(self, base, symbols)
+        missing_symbols.clear()
+        return data
+
+    with override_settings(DAILY_SNAPSHOT_BASES=["USD"]), patch.object(MockAPI, "get_latest_rates", recovering_latest_rates):
+        result = save_data_today.apply()
+
+    assert result.successful()
+    assert calls == [("USD", ("EUR", "GBP")), ("USD", ("GBP",))]
+    assert result.result["rows"] == 1
+    assert stored_pairs() == {("USD", "EUR"), ("USD", "GBP")}
+
+def test_save_data_today_fails_when_a_symbol_cannot_be_filled(mock_provider):
+    calls = []
+
+    with override_settings(DAILY_SNAPSHOT_BASES=["USD"]), \
+            patch.object(MockAPI, "get_latest_rates", without_symbols(MockAPI.get_latest_rates, {"GBP"}, calls)), \
+            patch.object(save_data_today, "max_retries", 2):
+        result = save_data_today.apply()
+
+    assert result.failed()
+    assert isinstance(result.result, SnapshotIncomplete)
+    assert result.result.missing == {"USD": ["GBP"]}
+    assert len(calls) == 3
+    assert stored_pairs() == {("USD", "EUR")}
+
+@pytest.mark.asyncio
+@override_settings(DAILY_SNAPSHOT_CONCURRENCY=2)
+async def test_snapshot_bounds_concurrent_calls(mock_provider):
+    get_latest_rates = MockAPI.get_latest_rates
+    running = []
+    peak = []
+
+    async def slow_latest_rates(self, base="USD", symbols=[]):
+        running.append(base)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(base)
+        return await get_latest_rates(self, base, symbols)
+
+    with patch.object(MockAPI, "get_latest_rates", slow_latest_rates):
+        report = await take_daily_snapshot({"USD": ["EUR", "GBP"], "EUR": ["USD", "GBP"], "GBP": ["USD", "EUR"]})
+
+    assert max(peak) == 2
+    assert report["rows"] == 6
@@ -0,0 +1,57 @@
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+import json
+from datetime import date
+from decimal import Decimal
+from django.core.serializers.json import DjangoJSONEncoder
+from backbase_app.api.decimals import DecimalJSONEncoder, loads_json, quantize_rate, to_amount, to_decimal, to_rate
+
+def test_to_decimal():
+    assert to_decimal(Decimal("1.10")) == Decimal("1.10")
+    assert str(to_decimal(0.1)) == "0.1"
+    assert str(to_decimal(" 100.50 ")) == "100.50"
+    assert to_decimal(3) == Decimal(3)
+
+@pytest.mark.parametrize("value", ["abc", "", "NaN", "Infinity", float("inf"), None])
+def test_to_decimal_invalid(value):
+    with pytest.raises(ValueError):
+        to_decimal(value)
+
+def test_to_amount():
+    assert to_amount("100") == Decimal("100")
+    assert str(to_amount("100.10")) == "100.10"
+    assert to_amount("999999999999.999999") == Decimal("999999999999.999999")
+
+@pytest.mark.parametrize("value", ["", "0", "0.000", "-1", "+1", "1e23", "1E2", "1_000", " 100", "100 ", "1.", ".5", "1.1234567", "1000000000000", "NaN", "١٠٠"])
+def test_to_amount_invalid(value):
+    with pytest.raises(ValueError):
+        to_amount(value)
+
+def test_to_rate_rounds_half_even():
+    assert str(to_rate("0.8720925")) == "0.872092"
+    assert str(to_rate("0.8720935")) == "0.872094"
+    assert str(to_rate(1.1)) == "1.100000"
+    assert quantize_rate(Decimal("0.86") * Decimal("100.10")) == Decimal("86.086000")
+
+def test_decimal_json_encoder():
+    """Test that Decimals are written as JSON numbers with all their digits, other values like DjangoJSONEncoder."""
+    data = {"date": date(2025, 3, 1), "rate": Decimal("0.100000"), "values": [Decimal("85.085000"), None, 2, 1.5, True], "to": "€", "missing": {}}
+
+    encoded = json.dumps(data, cls=DecimalJSONEncoder)
+
+    assert encoded == '{"date": "2025-03-01", "rate": 0.100000, "values": [85.085000, null, 2, 1.5, true], "to": "\\u20ac", "missing": {}}'
+    assert loads_json(encoded)["rate"] == Decimal("0.100000")
+    assert json.loads(encoded) == json.loads(json.dumps({**data, "rate": 0.1, "values": [85.085, None, 2, 1.5, True]}, cls=DjangoJSONEncoder))
+
+def test_decimal_json_encoder_rejects_non_finite():
+    with pytest.raises(ValueError):
+        json.dumps({"rate": Decimal("NaN")}, cls=DecimalJSONEncoder)
@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.test import override_settings
+from backbase_app.api.provider_registry import ProviderRegistry, provider_registry
+from backbase_app.api.providers_api import ProvidersAPI
+from backbase_app.external_services.api_mock import MockAPI
+from backbase_app.external_services.api_currencybeacon import CurrencyBeaconAPI
+from backbase_app.models import ProviderExchange
+
+@pytest.fixture
+def providers(db):
+    """Create three providers, one of them deactivated.
+
+    Args:
+        db: Django test database fixture.
+    """
+    ProviderExchange.objects.create(id_name="MC", name="Mock", priority=1)
+    ProviderExchange.objects.create(id_name="CB", name="CurrencyBeacon", priority=5, timeout=3, hedge_delay=0.5)
+    ProviderExchange.objects.create(id_name="OFF", name="Disabled", priority=9, activated=False)
+
+def test_snapshot_in_priority_order(providers, django_assert_num_queries):
+    registry = ProviderRegistry()
+
+    with django_assert_num_queries(1):
+        snapshot = registry.get_snapshot()
+        assert registry.get_snapshot() is snapshot
+
+    assert [provider.id_name for provider in snapshot.providers] == ["CB", "MC"]
+    assert snapshot.providers[0].timeout == 3
+    assert snapshot.providers[0].hedge_delay == 0.5
+
+def test_snapshot_refreshed_by_signals(providers):
+    snapshot = provider_registry.get_snapshot()
+
+    ProviderExchange.objects.filter(id_name="MC").update(priority=10)
+    assert provider_registry.get_snapshot() is snapshot
+
+    ProviderExchange.objects.get(id_name="MC").save()
+    refreshed = provider_registry.get_snapshot()
+    assert refreshed.version > snapshot.version
+    assert [provider.id_name for provider in refreshed.providers] == ["MC", "CB"]
+
+    ProviderExchange.objects.get(id_name="CB").delete()
+    assert [provider.id_name for provider in provider_registry.get_snapshot().providers] == ["MC"]
+
+@override_settings(PROVIDER_REGISTRY_TTL=0)
+def test_snapshot_expires(providers, django_assert_num_queries):
+    registry = ProviderRegistry()
+    registry.get_snapshot()
+
+    with patch('backbase_app.api.provider_registry.time.monotonic', return_value=10 ** 9):
+        with django_assert_num_queries(1):
+            registry.get_snapshot()
+
+def test_client_registration():
+    class OtherAPI:
+        pass
+
+    registry = ProviderRegistry()
+    registry.register_client("OT", OtherAPI)
+    registry.register_client("MC2", "backbase_app.external_services.api_mock.MockAPI")
+
+    assert registry.get_client_classes() == {
+        "MC": MockAPI,
+        "CB": CurrencyBeaconAPI,
+        "OT": OtherAPI,
+        "MC2": MockAPI,
+    }
+
+def test_providers_api_uses_registered_clients():
+    with override_settings(PROVIDER_CLIENTS={"MC": "backbase_app.external_services.api_mock.MockAPI"}):
+        api = ProvidersAPI()
+
+    assert list(api.provider_map) == ["MC"]
+    assert isinstance(api.provider_map["MC"], MockAPI)
@@ -0,0 +1,89 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.core.cache import caches
+from django.test import override_settings
+from django.utils import timezone
+from backbase_app.api.rate_cache import RateCache, rate_cache
+from backbase_app.api.providers_api import save_data_rate
+from backbase_app.models import Currency
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "rates": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "rates"},
+}
+
+def test_get_or_load_reads_through():
+    cache = RateCache(max_entries=10, ttl_today=60, ttl_history=3600, shared_alias="")
+    loader = MagicMock(return_value=Decimal("0.85"))
+
+    assert cache.get_or_load("USD", "EUR", "2025-03-01", loader) == Decimal("0.85")
+    assert cache.get_or_load("USD", "EUR", "2025-03-01", loader) == Decimal("0.85")
+
+    loader.assert_called_once()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_missing_rates_are_not_cached():
+    cache = RateCache(max_entries=10, ttl_today=60, ttl_history=3600, shared_alias="")
+    loader = MagicMock(return_value=None)
+
+    assert cache.get_or_load("USD", "EUR", "2025-03-01", loader) is None
+    assert cache.get_or_load("USD", "EUR", "2025-03-01", loader) is None
+
+    assert loader.call_count == 2
+
+def test_lru_eviction():
+    cache = RateCache(max_entries=2, ttl_today=60, ttl_history=3600, shared_alias="")
+    cache.set("USD", "EUR", "2025-03-01", Decimal("1"))
+    cache.set("USD", "GBP", "2025-03-01", Decimal("2"))
+    cache.get("USD", "EUR", "2025-03-01")
+    cache.set("USD", "CHF", "2025-03-01", Decimal("3"))
+
+    assert cache.get("USD", "GBP", "2025-03-01") is None
+    assert cache.get("USD", "EUR", "2025-03-01") == Decimal("1")
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_today_and_history():
+    cache = RateCache(max_entries=10, ttl_today=60, ttl_history=3600, shared_alias="")
+    today = timezone.now().date()
+
+    assert cache.ttl(cache.make_key("USD", "EUR", today)) == 60
+    assert cache.ttl(cache.make_key("USD", "EUR", today - timezone.timedelta(days=1))) == 3600
+
+    with patch('backbase_app.api.rate_cache.time.monotonic', side_effect=[0, 61]):
+        cache.set("USD", "EUR", today, Decimal("1"))
+        assert cache.get("USD", "EUR", today) is None
+
+@override_settings(CACHES=LOCMEM_CACHES)
+def test_shared_tier():
+    writer = RateCache(max_entries=10, ttl_today=60, ttl_history=3600, shared_alias="rates")
+    reader = RateCache(max_entries=10, ttl_today=60, ttl_history=3600, shared_alias="rates")
+
+    writer.set("USD", "EUR", "2025-03-01", Decimal("0.85"))
+
+    assert reader.get("USD", "EUR", "2025-03-01") == Decimal("0.85")
+    assert reader.stats()["shared_hits"] == 1
+    writer.invalidate("USD", "EUR", "2025-03-01")
+    assert caches["rates"].get("rate:USD:EUR:2025-03-01") is None
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_save_data_rate_invalidates():
+    await Currency.objects.acreate(code='USD', name='US Dollar', symbol='USD')
+    await Currency.objects.acreate(code='EUR', name='Euro', symbol='EUR')
+    rate_cache.set("USD", "EUR", "2025-03-01", Decimal("0.5"))
+
+    await save_data_rate("USD", "EUR", 0.85, "2025-03-01")
+
+    assert rate_cache.get("USD", "EUR", "2025-03-01") is None
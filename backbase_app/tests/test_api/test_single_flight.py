@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.test import override_settings
+from backbase_app.api.single_flight import SingleFlight
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "flights": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "flights"},
+}
+
+def slow_call(calls, result, delay=0.05):
+    """Build a provider call answering after a delay.
+
+    Args:
+        calls: List collecting one entry per call.
+        result: The result of the call, raised if it is an exception.
+        delay: Seconds before answering.
+
+    Returns:
+        Callable: The provider call.
+    """
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return call
+
+def test_make_key_ignores_symbol_order():
+    assert SingleFlight.make_key("historical", "USD", ["GBP", "EUR"], "2025-03-01") == \
+        SingleFlight.make_key("historical", "USD", ["EUR", "GBP"], "2025-03-01")
+
+@pytest.mark.asyncio
+@override_settings(SINGLE_FLIGHT_SHARED_ALIAS="")
+async def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    key = flight.make_key("historical", "USD", ["EUR"], "2025-03-01")
+    calls = []
+
+    results = await asyncio.gather(*(flight.do(key, slow_call(calls, {"EUR": 0.85})) for _ in range(50)))
+    again = await flight.do(key, slow_call(calls, {"EUR": 0.86}))
+
+    assert results == [{"EUR": 0.85}] * 50
+    assert again == {"EUR": 0.86}
+    assert len(calls) == 2
+    assert flight.stats() == {"calls": 2, "coalesced": 49, "shared_hits": 0, "wait_timeouts": 0, "in_flight": 0}
+
+@pytest.mark.asyncio
+@override_settings(SINGLE_FLIGHT_SHARED_ALIAS="")
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+
+    await asyncio.gather(
+        flight.do(flight.make_key("historical", "USD", ["EUR"], "2025-03-01"), slow_call(calls, {"EUR": 0.85})),
+        flight.do(flight.make_key("historical", "USD", ["EUR"], "2025-03-02"), slow_call(calls, {"EUR": 0.86})),
+        flight.do(flight.make_key("latest", "USD", ["EUR"], "2025-03-01"), slow_call(calls, {"EUR": 0.87})),
+    )
+
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+@override_settings(SINGLE_FLIGHT_SHARED_ALIAS="")
+async def test_failure_is_shared_by_waiting_callers():
+    flight = SingleFlight()
+    key = flight.make_key("historical", "USD", ["EUR"], "2025-03-01")
+    calls = []
+
+    results = await asyncio.gather(*(flight.do(key, slow_call(calls, ConnectionError("down"))) for _ in range(5)), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+@override_settings(SINGLE_FLIGHT_SHARED_ALIAS="flights", CACHES=LOCMEM_CACHES)
+async def test_shared_lock_coalesces_processes():
+    """Test that a second process waits for the call holding the shared lock and reads its result."""
+    web, worker = SingleFlight(), SingleFlight()
+    key = web.make_key("historical", "USD", ["EUR"], "2025-03-01")
+    calls = []
+
+    results = await asyncio.gather(
+        web.do(key, slow_call(calls, {"EUR": 0.85}, delay=0.2)),
+        worker.do(key, slow_call(calls, {"EUR": 0.85}, delay=0.2)),
+    )
+
+    assert results == [{"EUR": 0.85}, {"EUR": 0.85}]
+    assert len(calls) == 1
+    assert worker.stats()["shared_hits"] == 1
+
+@pytest.mark.asyncio
+@override_settings(SINGLE_FLIGHT_SHARED_ALIAS="flights", CACHES=LOCMEM_CACHES, SINGLE_FLIGHT_WAIT=0.1, SINGLE_FLIGHT_LOCK_TIMEOUT=30)
+async def test_shared_lock_wait_gives_up():
+    """Test that a process makes its own call when the lock holder takes longer than SINGLE_FLIGHT_WAIT."""
+    web, worker = SingleFlight(), SingleFlight()
+    key = web.make_key("historical", "USD", ["EUR"], "2025-03-02")
+    calls = []
+
+    await asyncio.gather(
+        web.do(key, slow_call(calls, {"EUR": 0.85}, delay=0.5)),
+        worker.do(key, slow_call(calls, {"EUR": 0.85}, delay=0)),
+    )
+
+    assert len(calls) == 2
+    assert worker.stats()["wait_timeouts"] == 1
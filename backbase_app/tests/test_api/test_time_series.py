@@ -0,0 +1,80 @@
+from datetime import date
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from decimal import Decimal
+from backbase_app.api.time_series import GapRange, assemble_time_series, coalesce_gaps, find_gaps, iter_dates
+
+def test_iter_dates():
+    assert list(iter_dates("2024-02-28", "2024-03-01")) == ["2024-02-28", "2024-02-29", "2024-03-01"]
+    assert list(iter_dates("2024-03-02", "2024-03-01")) == []
+
+def test_assemble_time_series():
+    rows = [
+        (date(2025, 3, 29), "EUR", Decimal("0.84")),
+        (date(2025, 3, 30), "EUR", Decimal("0.85")),
+        (date(2025, 3, 30), "GBP", Decimal("0.75")),
+        (date(2025, 4, 1), "EUR", Decimal("0.86")),
+        (date(2025, 4, 2), "EUR", Decimal("0.87")),
+    ]
+
+    series = assemble_time_series(rows, "2025-03-30", "2025-04-01")
+
+    assert list(series) == [
+        ("2025-03-30", {"EUR": Decimal("0.85"), "GBP": Decimal("0.75")}),
+        ("2025-03-31", {}),
+        ("2025-04-01", {"EUR": Decimal("0.86")}),
+    ]
+
+def test_assemble_time_series_streams_rows():
+    """Test that rows are consumed lazily, one date at a time."""
+    consumed = []
+
+    def rows():
+        for day in (1, 2, 3):
+            consumed.append(day)
+            yield (f"2025-03-0{day}", "EUR", Decimal("0.85"))
+
+    series = assemble_time_series(rows(), "2025-03-01", "2025-03-03")
+
+    assert next(series) == ("2025-03-01", {"EUR": Decimal("0.85")})
+    assert consumed == [1, 2]
+
+def test_find_gaps():
+    data = {
+        "2025-03-02": {"EUR": 0.85},
+        "2025-03-01": {"EUR": 0.85, "GBP": 0.75},
+        "2025-03-03": {},
+        "2025-03-04": {"EUR": None, "GBP": 0.75},
+    }
+
+    gaps = find_gaps(data, ["EUR", "GBP"])
+
+    assert gaps == {"2025-03-02": {"GBP"}, "2025-03-03": {"EUR", "GBP"}, "2025-03-04": {"EUR"}}
+    assert list(gaps) == ["2025-03-02", "2025-03-03", "2025-03-04"]
+
+def test_coalesce_gaps():
+    gaps = {
+        "2025-03-02": {"GBP"},
+        "2025-03-03": {"EUR"},
+        "2025-03-06": {"EUR"},
+        "2025-03-20": {"JPY"},
+    }
+
+    assert coalesce_gaps(gaps) == [
+        GapRange("2025-03-02", "2025-03-03", ("EUR", "GBP"), ("2025-03-02", "2025-03-03")),
+        GapRange("2025-03-06", "2025-03-06", ("EUR",), ("2025-03-06",)),
+        GapRange("2025-03-20", "2025-03-20", ("JPY",), ("2025-03-20",)),
+    ]
+    assert coalesce_gaps(gaps, merge_days=2) == [
+        GapRange("2025-03-02", "2025-03-06", ("EUR", "GBP"), ("2025-03-02", "2025-03-03", "2025-03-06")),
+        GapRange("2025-03-20", "2025-03-20", ("JPY",), ("2025-03-20",)),
+    ]
+    assert coalesce_gaps({}) == []
@@ -10,6 +10,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
 import django
 django.setup()
 import re
+from decimal import Decimal
 from backbase_app.external_services.api_currencybeacon import CurrencyBeaconAPI
 
 @pytest.mark.asyncio
@@ -24,8 +25,8 @@ async def test_get_latest_rates():
         response = await api.get_latest_rates(base='USD', symbols=symbols)
     
     assert response['base'] == 'USD'
-    assert response['rates']['EUR'] == 0.85
-    assert response['rates']['GBP'] == 0.75
+    assert response['rates']['EUR'] == Decimal("0.85")
+    assert response['rates']['GBP'] == Decimal("0.75")
 
 @pytest.mark.asyncio
 async def test_convert_currency():
@@ -35,12 +36,12 @@ async def test_convert_currency():
     
     with aioresponses() as m:
         m.get(re.compile(r".*convert.*"), payload=mock_response)
-        response = await api.convert_currency('USD', 'EUR', 100)
+        response = await api.convert_currency('USD', 'EUR', Decimal('100'))
     
     assert response['from'] == 'USD'
     assert response['to'] == 'EUR'
     assert response['amount'] == 100
-    assert response['value'] == 85.0
+    assert response['value'] == Decimal("85.0")
 
 @pytest.mark.asyncio
 async def test_get_historical_rates():
@@ -54,8 +55,8 @@ async def test_get_historical_rates():
     
     assert response['date'] == '2025-03-01'
     assert response['base'] == 'USD'
-    assert response['rates']['EUR'] == 0.85
-    assert response['rates']['GBP'] == 0.75
+    assert response['rates']['EUR'] == Decimal("0.85")
+    assert response['rates']['GBP'] == Decimal("0.75")
 
 @pytest.mark.asyncio
 async def test_get_time_series():
@@ -68,5 +69,5 @@ async def test_get_time_series():
         response = await api.get_time_series('2025-03-01', '2025-03-02', base='USD', symbols=['EUR', 'GBP'])
     
     assert '2025-03-01' in response
-    assert response['2025-03-01']['EUR'] == 0.85
-    assert response['2025-03-02']['GBP'] == 0.76
\ No newline at end of file
+    assert response['2025-03-01']['EUR'] == Decimal("0.85")
+    assert response['2025-03-02']['GBP'] == Decimal("0.76")
\ No newline at end of file
@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from backbase_app.external_services.http_session import SessionManager
+
+@pytest.mark.asyncio
+async def test_get_session_is_reused():
+    manager = SessionManager()
+
+    session = manager.get_session()
+
+    assert manager.get_session() is session
+    await manager.close()
+    assert session.closed
+    assert manager.get_session() is not session
+    await manager.close()
+
+@pytest.mark.asyncio
+@override_settings(HTTP_CLIENT_LIMIT=20, HTTP_CLIENT_LIMIT_PER_HOST=5, HTTP_CLIENT_DNS_CACHE_TTL=60)
+async def test_session_connector_settings():
+    manager = SessionManager()
+
+    connector = manager.get_session().connector
+
+    assert connector.limit == 20
+    assert connector.limit_per_host == 5
+    assert connector.use_dns_cache
+    await manager.close()
+
+def test_close_all():
+    manager = SessionManager()
+    loop = asyncio.new_event_loop()
+
+    async def open_session():
+        return manager.get_session()
+
+    session = loop.run_until_complete(open_session())
+    manager.close_all()
+
+    assert session.closed
+    assert manager.sessions == {}
+    loop.close()
+
+def test_short_lived_loops_close_their_session():
+    """Test that the session of each short-lived loop is closed when the loop shuts down."""
+    manager = SessionManager()
+    sessions = []
+
+    async def open_session():
+        await asyncio.sleep(0)
+        sessions.append(manager.get_session())
+
+    for _ in range(25):
+        asyncio.run(open_session())
+    for _ in range(25):
+        async_to_sync(open_session)()
+
+    assert len(set(map(id, sessions))) == 50
+    assert all(session.closed for session in sessions)
+    assert manager.sessions == {}
+    assert manager.closers == {}
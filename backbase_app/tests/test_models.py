@@ -1,3 +1,4 @@
+from django.core import serializers
 from django.test import TestCase
 import sys
 import os
@@ -7,16 +8,21 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
 
 import django
 django.setup()
-from backbase_app.models import Currency, CurrencyExchangeRate, ProviderExchange
+from backbase_app.models import Currency, CurrencyExchangeRate, LatestRate, ProviderExchange
+from backbase_app.api.bulk_load import insert_rates
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.rate_cache import rate_cache
+import json
 from datetime import date
 from decimal import Decimal
 
 class CurrencyModelTest(TestCase):
     def setUp(self):
-        self.currency = Currency.objects.create(code='123456789', name='US Dollar', symbol='USD')
+        self.currency = Currency.objects.create(code='USD', name='US Dollar', symbol='USD')
 
     def test_currency_creation(self):
-        self.assertEqual(self.currency.code, '123456789')
+        self.assertEqual(self.currency.code, 'USD')
         self.assertEqual(self.currency.name, 'US Dollar')
         self.assertEqual(self.currency.symbol, 'USD')
 
@@ -25,8 +31,8 @@ class CurrencyModelTest(TestCase):
 
 class CurrencyExchangeRateModelTest(TestCase):
     def setUp(self):
-        self.usd = Currency.objects.create(code='123456789', name='US Dollar', symbol='USD')
-        self.eur = Currency.objects.create(code='1234567890', name='Euro', symbol='EUR')
+        self.usd = Currency.objects.create(code='USD', name='US Dollar', symbol='USD')
+        self.eur = Currency.objects.create(code='EUR', name='Euro', symbol='EUR')
         self.exchange_rate = CurrencyExchangeRate.objects.create(
             source_currency=self.usd,
             exchanged_currency=self.eur,
@@ -42,6 +48,142 @@ class CurrencyExchangeRateModelTest(TestCase):
     def test_exchange_rate_str(self):
         self.assertEqual(str(self.exchange_rate), "USD - EUR")
 
+class CurrencyExchangeRateManagerTest(TestCase):
+    def setUp(self):
+        self.usd = Currency.objects.create(code='USD', name='US Dollar', symbol='USD')
+        self.eur = Currency.objects.create(code='EUR', name='Euro', symbol='EUR')
+        self.gbp = Currency.objects.create(code='GBP', name='Pound', symbol='GBP')
+
+    def test_upsert_creates_in_one_query(self):
+        # plus the upsert of the latest rate of the pair, the registry naming the cached rates is already loaded
+        currency_registry.load()
+        with self.assertNumQueries(2):
+            CurrencyExchangeRate.objects.upsert((self.usd.id, self.eur.id), date(2025, 3, 1), Decimal("0.85"))
+
+        self.assertEqual(CurrencyExchangeRate.objects.get().rate_value, Decimal("0.85"))
+
+    def test_upsert_replaces_in_one_query(self):
+        CurrencyExchangeRate.objects.upsert((self.usd.id, self.eur.id), date(2025, 3, 1), Decimal("0.85"))
+
+        with self.assertNumQueries(2):
+            CurrencyExchangeRate.objects.upsert((self.usd.id, self.eur.id), date(2025, 3, 1), Decimal("0.9"))
+
+        self.assertEqual(CurrencyExchangeRate.objects.count(), 1)
+        self.assertEqual(CurrencyExchangeRate.objects.get().rate_value, Decimal("0.9"))
+
+    def test_bulk_upsert_one_query_per_batch(self):
+        CurrencyExchangeRate.objects.upsert((self.usd.id, self.eur.id), date(2025, 3, 1), Decimal("0.85"))
+        rates = [
+            CurrencyExchangeRate(source_currency=self.usd, exchanged_currency=currency, valuation_date=date(2025, 3, day), rate_value=Decimal("0.9"))
+            for day in (1, 2)
+            for currency in (self.eur, self.gbp)
+        ]
+
+        # two batches, then one upsert of the latest rates
+        with self.assertNumQueries(3):
+            CurrencyExchangeRate.objects.bulk_upsert(rates, batch_size=2)
+
+        self.assertEqual(CurrencyExchangeRate.objects.count(), 4)
+        self.assertEqual(CurrencyExchangeRate.objects.filter(rate_value=Decimal("0.9")).count(), 4)
+
+    def test_save_runs_a_single_insert(self):
+        rate = CurrencyExchangeRate(source_currency=self.usd, exchanged_currency=self.eur, valuation_date=date(2025, 3, 1), rate_value=Decimal("0.85"))
+
+        # plus the upsert of the latest rate of the pair, the registry naming the cached rates is already loaded
+        currency_registry.load()
+        with self.assertNumQueries(2):
+            rate.save()
+
+class LatestRateTest(TestCase):
+    def setUp(self):
+        self.usd = Currency.objects.create(code='USD', name='US Dollar', symbol='USD')
+        self.eur = Currency.objects.create(code='EUR', name='Euro', symbol='EUR')
+        self.pair = (self.usd.id, self.eur.id)
+
+    def latest(self):
+        return LatestRate.objects.values_list('valuation_date', 'rate_value').get()
+
+    def test_upsert_keeps_the_newest_rate(self):
+        CurrencyExchangeRate.objects.upsert(self.pair, date(2025, 3, 2), Decimal("0.86"))
+        CurrencyExchangeRate.objects.upsert(self.pair, date(2025, 3, 1), Decimal("0.85"))
+        self.assertEqual(self.latest(), (date(2025, 3, 2), Decimal("0.86")))
+
+        CurrencyExchangeRate.objects.upsert(self.pair, date(2025, 3, 2), Decimal("0.87"))
+        self.assertEqual(self.latest(), (date(2025, 3, 2), Decimal("0.87")))
+
+    def test_insert_keeps_the_stored_rate(self):
+        """Test that a rate skipped by insert_rates does not replace the latest rate of its date."""
+        CurrencyExchangeRate.objects.upsert(self.pair, date(2025, 3, 2), Decimal("0.86"))
+
+        insert_rates([
+            CurrencyExchangeRate(source_currency=self.usd, exchanged_currency=self.eur, valuation_date=date(2025, 3, day), rate_value=Decimal("0.9"))
+            for day in (1, 2)
+        ])
+        self.assertEqual(self.latest(), (date(2025, 3, 2), Decimal("0.86")))
+
+        insert_rates([CurrencyExchangeRate(source_currency=self.usd, exchanged_currency=self.eur, valuation_date=date(2025, 3, 3), rate_value=Decimal("0.9"))])
+        self.assertEqual(self.latest(), (date(2025, 3, 3), Decimal("0.9")))
+
+    def test_delete_and_change_rebuild_the_latest_rate(self):
+        CurrencyExchangeRate.objects.upsert(self.pair, date(2025, 3, 1), Decimal("0.85"))
+        CurrencyExchangeRate.objects.upsert(self.pair, date(2025, 3, 2), Decimal("0.86"))
+
+        CurrencyExchangeRate.objects.get(valuation_date=date(2025, 3, 2)).delete()
+        self.assertEqual(self.latest(), (date(2025, 3, 1), Decimal("0.85")))
+
+        rate = CurrencyExchangeRate.objects.get()
+        rate.valuation_date = date(2025, 2, 28)
+        rate.save()
+        self.assertEqual(self.latest(), (date(2025, 2, 28), Decimal("0.85")))
+
+        rate.delete()
+        self.assertFalse(LatestRate.objects.exists())
+
+    def test_save_and_delete_drop_the_cached_rates(self):
+        """Test that a rate edited one at a time (admin, REST API) is not served stale from the caches."""
+        rate_cache.clear()
+        cross_rates.clear()
+        rate = CurrencyExchangeRate.objects.create(source_currency=self.usd, exchanged_currency=self.eur, valuation_date=date(2025, 3, 1), rate_value=Decimal("0.85"))
+
+        def cache(*dates):
+            for valuation_date in dates:
+                rate_cache.set('USD', 'EUR', valuation_date, Decimal("0.85"))
+                cross_rates.vectors[str(valuation_date)] = (float('inf'), None)
+
+        def cached(valuation_date):
+            return rate_cache.get('USD', 'EUR', valuation_date) is not None or str(valuation_date) in cross_rates.vectors
+
+        cache(date(2025, 3, 1))
+        rate.rate_value = Decimal("0.9")
+        rate.save()
+        self.assertFalse(cached(date(2025, 3, 1)))
+
+        # moving the rate to another date drops what was cached for both dates
+        cache(date(2025, 3, 1), date(2025, 3, 2))
+        rate = CurrencyExchangeRate.objects.get()
+        rate.valuation_date = date(2025, 3, 2)
+        rate.save()
+        self.assertFalse(cached(date(2025, 3, 1)))
+        self.assertFalse(cached(date(2025, 3, 2)))
+
+        cache(date(2025, 3, 2))
+        rate.delete()
+        self.assertFalse(cached(date(2025, 3, 2)))
+
+    def test_raw_save_is_left_alone(self):
+        """Test that rates saved by loaddata neither write LatestRate nor touch the caches."""
+        fixture = json.dumps([{"model": "backbase_app.currencyexchangerate", "pk": 1, "fields": {
+            "source_currency": self.usd.id, "exchanged_currency": self.eur.id, "valuation_date": "2025-03-01", "rate_value": "0.85"}}])
+        rate_cache.set('USD', 'EUR', date(2025, 3, 1), Decimal("0.8"))
+
+        for deserialized in serializers.deserialize("json", fixture):
+            deserialized.save()
+
+        self.assertTrue(CurrencyExchangeRate.objects.exists())
+        self.assertFalse(LatestRate.objects.exists())
+        self.assertEqual(rate_cache.get('USD', 'EUR', date(2025, 3, 1)), Decimal("0.8"))
+        rate_cache.clear()
+
 class ProviderExchangeModelTest(TestCase):
     def setUp(self):
         self.provider = ProviderExchange.objects.create(id_name='PROV1', name='Provider One', priority=10, activated=True)
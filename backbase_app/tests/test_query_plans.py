@@ -0,0 +1,116 @@
+import pytest
+import re
+from datetime import date
+from decimal import Decimal
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from backbase_app.api.cross_rates import CrossRateEngine
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.repository_api import get_rate_value, get_rates_series, is_range_stored
+from backbase_app.models import Currency, CurrencyExchangeRate
+
+RATE_TABLE = CurrencyExchangeRate._meta.db_table
+CURRENCY_TABLE = Currency._meta.db_table
+
+# name: (hot path, whether it must be answered from the index alone)
+# a full unique key lookup reads a single row, so SQLite uses the unique index for it
+HOT_PATHS = {
+    "pair lookup": (lambda: get_rate_value.func("USD", "EUR", "2025-03-01"), False),
+    "pair lookup endpoint": (lambda: Client().get('/api/v1/currency_exchange_api/', {
+        'source_currency': 'USD', 'exchanged_currency': 'EUR', 'valuation_date': '2025-03-02'
+    }), False),
+    "base range": (lambda: get_rates_series.func("2025-03-01", "2025-03-31", "USD", ["EUR", "GBP"]), True),
+    "base range endpoint": (lambda: Client().get('/api/v1/currency_rates_list_api/', {
+        'start_date': '2025-03-01', 'end_date': '2025-03-31', 'base': 'USD', 'symbols': 'EUR,GBP'
+    }), True),
+    "range count": (lambda: is_range_stored.func("2025-03-01", "2025-03-31", "USD", ["EUR", "GBP"]), True),
+    "cross rate vector": (lambda: CrossRateEngine(base="USD").load_vector("2025-03-01"), True),
+}
+
+@pytest.fixture
+def rates(db):
+    """Store a few USD rates so every hot path reaches the database.
+
+    Args:
+        db: Django test database fixture.
+    """
+    rate_cache.clear()
+    currencies = {symbol: Currency.objects.create(code=symbol, name=symbol, symbol=symbol) for symbol in ["USD", "EUR", "GBP"]}
+    for day in (1, 2):
+        for symbol in ("EUR", "GBP"):
+            CurrencyExchangeRate.objects.create(
+                source_currency=currencies["USD"],
+                exchanged_currency=currencies[symbol],
+                valuation_date=date(2025, 3, day),
+                rate_value=Decimal("0.85")
+            )
+
+def explain(sql):
+    """Get the query plan of a query on the current database.
+
+    Args:
+        sql: The query, with its parameters inlined.
+
+    Returns:
+        List[str]: The lines of the plan.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # tiny test tables are cheaper to scan, only a missing index should make the planner scan
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+            plan = [row[0] for row in cursor.fetchall()]
+            cursor.execute("RESET enable_seqscan")
+            return plan
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+def capture_rate_queries(hot_path):
+    """Run a hot path and collect its SELECT queries on the exchange rate table.
+
+    Args:
+        hot_path: Function running the hot path.
+
+    Returns:
+        List[str]: The captured queries.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        hot_path()
+    # .iterator() reads are run through a server-side cursor on PostgreSQL
+    sql_queries = [re.sub(r"^DECLARE .+? CURSOR .*?FOR ", "", query["sql"]) for query in queries.captured_queries]
+    return [sql for sql in sql_queries if sql.startswith("SELECT") and RATE_TABLE in sql]
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_query_plan(rates, name):
+    """Fail when a hot query scans the exchange rate table, sorts it or joins Currency."""
+    hot_path, covering = HOT_PATHS[name]
+    sql_queries = capture_rate_queries(hot_path)
+    assert sql_queries, f"{name} did not query {RATE_TABLE}"
+
+    for sql in sql_queries:
+        plan = explain(sql)
+        plan_text = "\n".join(plan)
+        assert not re.search(rf"\b{CURRENCY_TABLE}\b", plan_text), f"{name} joins {CURRENCY_TABLE}:\n{plan_text}"
+
+        if connection.vendor == "postgresql":
+            assert f"Seq Scan on {RATE_TABLE}" not in plan_text, f"{name} scans {RATE_TABLE}:\n{plan_text}"
+            assert "Sort" not in plan_text, f"{name} sorts {RATE_TABLE}:\n{plan_text}"
+        else:
+            rate_lines = [line for line in plan if RATE_TABLE in line]
+            assert rate_lines, plan_text
+            for line in rate_lines:
+                assert line.startswith("SEARCH") and " INDEX " in line, f"{name} scans {RATE_TABLE}:\n{plan_text}"
+                if covering:
+                    assert "USING COVERING INDEX" in line, f"{name} does not search a covering index:\n{plan_text}"
+            assert "TEMP B-TREE" not in plan_text, f"{name} sorts {RATE_TABLE}:\n{plan_text}"
@@ -0,0 +1,115 @@
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 2 ** 20,
+    'cache_size': -2048,
+}
+
+def open_database(path, timeout=0.1):
+    """Open a new SQLite connection to a database file.
+
+    Args:
+        path: The database file.
+        timeout: Seconds to wait for a lock.
+
+    Returns:
+        DatabaseWrapper: The connected database wrapper.
+    """
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(path), 'OPTIONS': {'timeout': timeout}}, alias='sqlite_profile')
+    wrapper.ensure_connection()
+    return wrapper
+
+def pragma(wrapper, name):
+    """Read a pragma of a connection.
+
+    Args:
+        wrapper: The database wrapper.
+        name: The pragma name.
+
+    Returns:
+        Any: The pragma value.
+    """
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+def read_while_writing(path):
+    """Commit a write while another connection keeps a read transaction open.
+
+    Args:
+        path: The database file.
+
+    Returns:
+        int: The number of rows seen by the open read transaction after the write.
+    """
+    setup = open_database(path)
+    with setup.cursor() as cursor:
+        cursor.execute("CREATE TABLE rate (value REAL)")
+        cursor.execute("INSERT INTO rate VALUES (1.0)")
+    setup.close()
+
+    reader = open_database(path)
+    writer = open_database(path)
+    try:
+        with reader.cursor() as cursor:
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT COUNT(*) FROM rate")
+            with writer.cursor() as write_cursor:
+                write_cursor.execute("INSERT INTO rate VALUES (2.0)")
+            cursor.execute("SELECT COUNT(*) FROM rate")
+            return cursor.fetchone()[0]
+    finally:
+        reader.close()
+        writer.close()
+
+def test_settings_profile_uses_wal():
+    assert settings.SQLITE_PRAGMAS['journal_mode'] == 'WAL'
+    assert settings.SQLITE_PRAGMAS['synchronous'] == 'NORMAL'
+
+@pytest.mark.django_db
+@override_settings(SQLITE_PRAGMAS=PROFILE)
+def test_new_connection_applies_pragmas(tmp_path):
+    wrapper = open_database(tmp_path / "rates.sqlite3")
+    try:
+        assert pragma(wrapper, "journal_mode") == "wal"
+        assert pragma(wrapper, "synchronous") == 1
+        assert pragma(wrapper, "mmap_size") == 2 ** 20
+        assert pragma(wrapper, "cache_size") == -2048
+    finally:
+        wrapper.close()
+
+@pytest.mark.django_db
+@override_settings(SQLITE_PRAGMAS={})
+def test_new_connection_keeps_defaults_without_profile(tmp_path):
+    wrapper = open_database(tmp_path / "rates.sqlite3")
+    try:
+        assert pragma(wrapper, "journal_mode") == "delete"
+    finally:
+        wrapper.close()
+
+@pytest.mark.django_db
+@override_settings(SQLITE_PRAGMAS=PROFILE)
+def test_wal_writer_does_not_wait_for_readers(tmp_path):
+    assert read_while_writing(tmp_path / "rates.sqlite3") == 1
+
+@pytest.mark.django_db
+@override_settings(SQLITE_PRAGMAS={})
+def test_rollback_journal_writer_waits_for_readers(tmp_path):
+    with pytest.raises(OperationalError, match="database is locked"):
+        read_while_writing(tmp_path / "rates.sqlite3")
@@ -0,0 +1,294 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+import json
+import warnings
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.test import AsyncClient, Client
+from django.utils import timezone
+from backbase_app.api.generic_api import GenericAPI, get_generic_api
+from backbase_app.models import Currency, CurrencyExchangeRate
+
+@pytest.fixture
+def mock_generic_api():
+    """Create a mocked GenericAPI instance served by the views.
+
+    Returns:
+        MagicMock: A mocked instance of GenericAPI.
+    """
+    mock = MagicMock(spec=GenericAPI)
+    mock.get_exchange_rate_data = AsyncMock(return_value={"rate_value": 0.85})
+    mock.get_currency_rates_list = AsyncMock(return_value={"2025-03-01": {"EUR": 0.85}})
+    mock.get_convert_amount = AsyncMock(return_value={"amount": Decimal("100.10"), "value": Decimal("85.085000")})
+    mock.get_exchange_rate_data_bulk = AsyncMock(return_value=[{"rate_value": 0.85}])
+    mock.get_convert_amount_batch = AsyncMock(return_value={"conversions": {"EUR": {"rate": Decimal("0.850000"), "values": [Decimal("85.000000")]}}})
+    with patch('backbase_app.views.get_generic_api', return_value=mock):
+        yield mock
+
+@pytest.mark.asyncio
+async def test_get_exchange_rate_data(mock_generic_api):
+    response = await AsyncClient().get('/api/v1/exchange_rate_data/', {
+        'source_currency': 'USD', 'exchanged_currency': 'EUR', 'valuation_date': '2025-03-01'
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"rate_value": 0.85}
+    mock_generic_api.get_exchange_rate_data.assert_awaited_once_with('USD', 'EUR', '2025-03-01')
+
+@pytest.mark.asyncio
+async def test_get_exchange_rate_data_invalid_date(mock_generic_api):
+    response = await AsyncClient().get('/api/v1/exchange_rate_data/', {
+        'source_currency': 'USD', 'exchanged_currency': 'EUR', 'valuation_date': '01-03-2025'
+    })
+
+    assert response.status_code == 400
+    mock_generic_api.get_exchange_rate_data.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_exchange_rate_data_bulk(mock_generic_api):
+    triples = [
+        {"source_currency": "USD", "exchanged_currency": "EUR", "valuation_date": "2025-03-01"},
+        {"source_currency": "EUR", "exchanged_currency": "GBP", "valuation_date": "2025-03-02"},
+    ]
+    response = await AsyncClient().post('/api/v1/exchange_rate_data/bulk/', {"triples": triples}, content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"rate_value": 0.85}]}
+    mock_generic_api.get_exchange_rate_data_bulk.assert_awaited_once_with([("USD", "EUR", "2025-03-01"), ("EUR", "GBP", "2025-03-02")])
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [
+    "not json",
+    {"triples": []},
+    {"triples": [{"source_currency": "USD", "exchanged_currency": "EUR"}]},
+    {"triples": [{"source_currency": "USD", "exchanged_currency": "EUR", "valuation_date": "2025-02-30"}]},
+])
+async def test_get_exchange_rate_data_bulk_invalid(mock_generic_api, body):
+    response = await AsyncClient().post('/api/v1/exchange_rate_data/bulk/', body, content_type='application/json')
+
+    assert response.status_code == 400
+    mock_generic_api.get_exchange_rate_data_bulk.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_exchange_rate_data_bulk_too_many(mock_generic_api, settings):
+    settings.BULK_RATES_MAX_TRIPLES = 1
+    triple = {"source_currency": "USD", "exchanged_currency": "EUR", "valuation_date": "2025-03-01"}
+    response = await AsyncClient().post('/api/v1/exchange_rate_data/bulk/', {"triples": [triple, triple]}, content_type='application/json')
+
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_currency_rates_list(mock_generic_api):
+    response = await AsyncClient().get('/api/v1/currency_rates_list/', {
+        'start_date': '2025-03-01', 'end_date': '2025-03-01', 'base': 'USD', 'symbols': 'EUR'
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"2025-03-01": {"EUR": 0.85}}
+
+@pytest.mark.asyncio
+async def test_get_convert_amount(mock_generic_api):
+    """Test that the amount is parsed as Decimal and the result is written digit for digit."""
+    response = await AsyncClient().get('/api/v1/convert_amount/', {
+        'currency_base': 'USD', 'currency_to_convert': 'EUR', 'amount': '100.10'
+    })
+
+    assert response.status_code == 200
+    assert response.content == b'{"amount": 100.10, "value": 85.085000}'
+    mock_generic_api.get_convert_amount.assert_awaited_once_with('USD', 'EUR', Decimal("100.10"))
+
+@pytest.mark.asyncio
+async def test_get_convert_amount_invalid_amount(mock_generic_api):
+    for amount in ('abc', 'NaN', 'Infinity', '1e23', '0', '0.00', '-5', '1_000', ' 100', '100 ', '+100', '1.1234567', '1000000000000'):
+        response = await AsyncClient().get('/api/v1/convert_amount/', {
+            'currency_base': 'USD', 'currency_to_convert': 'EUR', 'amount': amount
+        })
+
+        assert response.status_code == 400
+    mock_generic_api.get_convert_amount.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_convert_amount_batch(mock_generic_api):
+    response = await AsyncClient().get('/api/v1/convert_amount/batch/', {
+        'currency_base': 'USD', 'currencies_to_convert': 'EUR,GBP,EUR', 'amounts': '100,2.5'
+    })
+
+    assert response.status_code == 200
+    assert response.content == b'{"conversions": {"EUR": {"rate": 0.850000, "values": [85.000000]}}}'
+    mock_generic_api.get_convert_amount_batch.assert_awaited_once_with('USD', ['EUR', 'GBP'], [Decimal("100"), Decimal("2.5")])
+
+@pytest.mark.asyncio
+async def test_get_convert_amount_batch_invalid_amount(mock_generic_api):
+    response = await AsyncClient().get('/api/v1/convert_amount/batch/', {
+        'currency_base': 'USD', 'currencies_to_convert': 'EUR', 'amounts': '100,abc'
+    })
+
+    assert response.status_code == 400
+    mock_generic_api.get_convert_amount_batch.assert_not_awaited()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("amounts", ["100,0", "1e23", "100,1_000"])
+async def test_get_convert_amount_batch_out_of_range(mock_generic_api, amounts):
+    response = await AsyncClient().get('/api/v1/convert_amount/batch/', {
+        'currency_base': 'USD', 'currencies_to_convert': 'EUR', 'amounts': amounts
+    })
+
+    assert response.status_code == 400
+    mock_generic_api.get_convert_amount_batch.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_convert_amount_overflow(mock_generic_api):
+    """Test that a converted value too large to be rounded to 6 decimal places answers 400."""
+    mock_generic_api.get_convert_amount.side_effect = InvalidOperation
+
+    response = await AsyncClient().get('/api/v1/convert_amount/', {
+        'currency_base': 'USD', 'currency_to_convert': 'EUR', 'amount': '999999999999'
+    })
+
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_invalid_method(mock_generic_api):
+    response = await AsyncClient().post('/api/v1/convert_amount/')
+
+    assert response.status_code == 405
+
+@pytest.mark.asyncio
+async def test_get_metrics():
+    response = await AsyncClient().get('/api/v1/metrics/')
+
+    assert response.status_code == 200
+    assert {"hits", "misses", "size", "hit_ratio"} <= set(response.json()["rate_cache"])
+
+def test_get_generic_api_is_shared():
+    """Test that the views reuse one GenericAPI instance across requests."""
+    assert get_generic_api() is get_generic_api()
+
+@pytest.fixture
+def stored_rates(db):
+    """Store USD rates for EUR and GBP from 2025-03-01 to 2025-03-03.
+
+    Args:
+        db: Django test database fixture.
+    """
+    currencies = {symbol: Currency.objects.create(code=symbol, name=symbol, symbol=symbol) for symbol in ["USD", "EUR", "GBP"]}
+    for day in (1, 2, 3):
+        for symbol, rate_value in [("EUR", "0.85"), ("GBP", "0.75")]:
+            CurrencyExchangeRate.objects.create(
+                source_currency=currencies["USD"],
+                exchanged_currency=currencies[symbol],
+                valuation_date=date(2025, 3, day),
+                rate_value=Decimal(rate_value)
+            )
+
+async def read_streaming(response):
+    """Read the whole body of an async streaming response.
+
+    Args:
+        response: The streaming response.
+
+    Returns:
+        str: The decoded body.
+    """
+    return b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_currency_rates_list_stream_json(stored_rates, mock_generic_api):
+    response = await AsyncClient().get('/api/v1/currency_rates_list/', {
+        'start_date': '2025-03-01', 'end_date': '2025-03-03', 'base': 'USD', 'symbols': 'EUR,GBP', 'stream': 'json'
+    })
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/json"
+    assert json.loads(await read_streaming(response)) == {
+        f"2025-03-0{day}": {"EUR": 0.85, "GBP": 0.75} for day in (1, 2, 3)
+    }
+    mock_generic_api.get_currency_rates_list.assert_not_awaited()
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_currency_rates_list_stream_ndjson(stored_rates, mock_generic_api):
+    response = await AsyncClient().get('/api/v1/currency_rates_list/', {
+        'start_date': '2025-03-02', 'end_date': '2025-03-03', 'base': 'USD', 'symbols': 'EUR', 'stream': 'ndjson'
+    })
+
+    lines = (await read_streaming(response)).splitlines()
+
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert lines == [
+        '{"date": "2025-03-02", "rates": {"EUR": 0.850000}}',
+        '{"date": "2025-03-03", "rates": {"EUR": 0.850000}}',
+    ]
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_get_currency_rates_list_stream_incomplete(stored_rates, mock_generic_api):
+    """Test that missing rates are fetched from the providers before streaming."""
+    mock_generic_api.get_currency_rates_list.return_value = {}
+
+    response = await AsyncClient().get('/api/v1/currency_rates_list/', {
+        'start_date': '2025-03-01', 'end_date': '2025-03-04', 'base': 'USD', 'symbols': 'EUR', 'stream': 'json'
+    })
+
+    assert response.json() == {}
+    mock_generic_api.get_currency_rates_list.assert_awaited_once_with('2025-03-01', '2025-03-04', 'USD', 'EUR')
+
+@pytest.mark.asyncio
+async def test_get_currency_rates_list_stream_invalid(mock_generic_api):
+    response = await AsyncClient().get('/api/v1/currency_rates_list/', {
+        'start_date': '2025-03-01', 'end_date': '2025-03-01', 'base': 'USD', 'symbols': 'EUR', 'stream': 'xml'
+    })
+
+    assert response.status_code == 400
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_currency_rates_list_api_stream(stored_rates, settings):
+    """Test that rows are streamed over ASGI one chunk at a time, without buffering the body."""
+    settings.STREAM_CHUNK_SIZE = 2
+    params = {'start_date': '2025-03-01', 'end_date': '2025-03-03', 'base': 'USD', 'symbols': 'EUR,GBP'}
+
+    expected = (await AsyncClient().get('/api/v1/currency_rates_list_api/', params)).json()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        json_response = await AsyncClient().get('/api/v1/currency_rates_list_api/', {**params, 'stream': 'json'})
+        ndjson_response = await AsyncClient().get('/api/v1/currency_rates_list_api/', {**params, 'stream': 'ndjson'})
+        json_chunks = [chunk async for chunk in json_response.streaming_content]
+        ndjson_chunks = [chunk async for chunk in ndjson_response.streaming_content]
+
+    assert len(expected) == 6
+    assert json_response.is_async and len(json_chunks) > 3
+    assert len(ndjson_chunks) == 3
+    assert json.loads(b"".join(json_chunks)) == expected
+    assert [json.loads(line) for line in b"".join(ndjson_chunks).splitlines()] == expected
+
+@pytest.mark.django_db
+def test_latest_rate_api(stored_rates, settings):
+    """Test that the latest rate of each symbol is served, stale ones as null."""
+    settings.LATEST_RATE_MAX_AGE_DAYS = 1
+    today = timezone.now().date()
+    CurrencyExchangeRate.objects.create(
+        source_currency=Currency.objects.get(code="USD"),
+        exchanged_currency=Currency.objects.get(code="EUR"),
+        valuation_date=today,
+        rate_value=Decimal("0.9")
+    )
+
+    response = Client().get('/api/v1/latest_rate_api/', {'source_currency': 'USD', 'symbols': 'EUR, GBP'})
+    invalid = Client().get('/api/v1/latest_rate_api/', {'source_currency': 'USD'})
+
+    assert response.status_code == 200
+    assert response.json() == {"EUR": {"valuation_date": str(today), "rate_value": 0.9}, "GBP": None}
+    assert invalid.status_code == 400
@@ -1,19 +1,23 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from backbase_app.views import (CurrencyExchangeViewSet, CurrencyViewSet, 
-                                get_exchange_rate_data, CurrencyExchangeAPIViewSet, 
-                                CurrencyRateListAPIViewSet, get_currency_rates_list,
-                                get_convert_amount)
+                                get_exchange_rate_data, get_exchange_rate_data_bulk, CurrencyExchangeAPIViewSet, 
+                                CurrencyRateListAPIViewSet, LatestRateAPIViewSet, get_currency_rates_list,
+                                get_convert_amount, get_convert_amount_batch, get_metrics)
 
 router = DefaultRouter()
 router.register(r'currency_exchange', CurrencyExchangeViewSet, basename='currency_exchange')
 router.register(r'currency_exchange_api', CurrencyExchangeAPIViewSet, basename='currency_exchange_api')
 router.register(r'currency_rates_list_api', CurrencyRateListAPIViewSet, basename='currency_rates_list_api')
+router.register(r'latest_rate_api', LatestRateAPIViewSet, basename='latest_rate_api')
 router.register(r'currency', CurrencyViewSet, basename='currency')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('exchange_rate_data/', get_exchange_rate_data),
+    path('exchange_rate_data/bulk/', get_exchange_rate_data_bulk),
     path('currency_rates_list/', get_currency_rates_list),
     path('convert_amount/', get_convert_amount),
+    path('convert_amount/batch/', get_convert_amount_batch),
+    path('metrics/', get_metrics),
 ]
\ No newline at end of file
@@ -1,9 +1,12 @@
 from django.shortcuts import render
-from django.http import JsonResponse, HttpRequest, HttpResponse
+from django.conf import settings
+from django.http import JsonResponse, HttpRequest, HttpResponse, StreamingHttpResponse
 from django.utils.dateparse import parse_date
 from django.views.decorators.csrf import csrf_exempt
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from datetime import date
+import json
+from decimal import InvalidOperation
 
 from rest_framework import viewsets
 from rest_framework.response import Response
@@ -11,26 +14,15 @@ from rest_framework.request import Request
 
 from backbase_app.models import CurrencyExchangeRate, Currency
 from backbase_app.serializers import CurrencyExchangeSerializer, CurrencySerializer
-from backbase_app.api.generic_api import GenericAPI
-
-import asyncio
-
-def run_asyncio_task(async_func: Callable, *args: Any, **kwargs: Any) -> Any:
-    """
-    Runs an async function in a new event loop.
-    
-    Args:
-        async_func: The async function to run
-        *args: Positional arguments for the async function
-        **kwargs: Keyword arguments for the async function
-        
-    Returns:
-        Any: The result of the async function
-    """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    return loop.run_until_complete(async_func(*args, **kwargs))
-
+from backbase_app.api.generic_api import get_generic_api
+from backbase_app.api.rate_cache import rate_cache
+from backbase_app.api.circuit_breaker import circuit_breakers
+from backbase_app.api.currency_registry import currency_registry
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.single_flight import single_flight
+from backbase_app.api.repository_api import is_range_stored, iter_rates_series, read_latest_rate_values
+from backbase_app.api.decimals import AMOUNT_MAX, DecimalJSONEncoder, to_amount
+from backbase_app.streaming import STREAM_CONTENT_TYPES, encode_rows, encode_time_series, get_stream_format, iter_chunks
 
 class CurrencyViewSet(viewsets.ModelViewSet):
     """
@@ -77,8 +69,8 @@ class CurrencyExchangeAPIViewSet(viewsets.ModelViewSet):
         if parsed_date is None:
             raise ValueError("Invalid date format. It must be in YYYY-MM-DD format.")
         if source_currency is not None and exchanged_currency is not None and valuation_date is not None:
-            queryset = queryset.filter(source_currency__symbol=source_currency,
-                                       exchanged_currency__symbol=exchanged_currency,
+            queryset = queryset.filter(source_currency_id=currency_registry.find_id(source_currency),
+                                       exchanged_currency_id=currency_registry.find_id(exchanged_currency),
                                        valuation_date=valuation_date).order_by('-valuation_date')
         return queryset
 
@@ -86,6 +78,9 @@ class CurrencyExchangeAPIViewSet(viewsets.ModelViewSet):
         """
         Returns a single exchange rate value for the filtered queryset.
         
+        Lookups of a currency pair and date are served through the rate cache,
+        and derived from the cross-rate base when the pair is not stored.
+        
         Args:
             request: The HTTP request object
             
@@ -94,13 +89,46 @@ class CurrencyExchangeAPIViewSet(viewsets.ModelViewSet):
         """
         try:
             queryset = self.get_queryset()
-            if queryset.exists():
-                rate_value = queryset.values_list('rate_value', flat=True).first()
-                return Response({'rate_value': rate_value})
-            return Response({'rate_value': None})
+            source_currency = request.query_params.get('source_currency', None)
+            exchanged_currency = request.query_params.get('exchanged_currency', None)
+            valuation_date = request.query_params.get('valuation_date', None)
+            load_rate_value = lambda: queryset.values_list('rate_value', flat=True).first()
+            if source_currency is not None and exchanged_currency is not None and valuation_date is not None:
+                rate_value = rate_cache.get_or_load(source_currency, exchanged_currency, valuation_date, load_rate_value)
+                if rate_value is None:
+                    rate_value = cross_rates.rate(source_currency, exchanged_currency, valuation_date)
+            else:
+                rate_value = load_rate_value()
+            return Response({'rate_value': rate_value})
         except ValueError as e:
             return Response({'error': str(e)}, status=400)
 
+class LatestRateAPIViewSet(viewsets.ViewSet):
+    """
+    ViewSet for handling latest rate API requests.
+    Returns the newest rates of a source currency against several currencies, read from LatestRate.
+    """
+
+    def list(self, request: Request) -> Response:
+        """
+        Returns the date and value of the latest rate of each target currency.
+        
+        Args:
+            request: The HTTP request object
+            
+        Returns:
+            Response: JSON response containing the latest rate of each symbol (None if it is not available) or error message
+        """
+        source_currency = request.query_params.get('source_currency', None)
+        symbols = request.query_params.get('symbols', None)
+        if not source_currency or not symbols:
+            return Response({'error': 'Invalid parameters'}, status=400)
+        latest = read_latest_rate_values(source_currency, list(map(str.strip, symbols.split(','))))
+        return Response({
+            symbol: {'valuation_date': value[0], 'rate_value': value[1]} if value is not None else None
+            for symbol, value in latest.items()
+        })
+
 class CurrencyRateListAPIViewSet(viewsets.ModelViewSet):
     """
     ViewSet for handling currency rate list API requests.
@@ -133,33 +161,51 @@ class CurrencyRateListAPIViewSet(viewsets.ModelViewSet):
             raise ValueError("Invalid date format. It must be in YYYY-MM-DD format.")
         if start_date is not None and end_date is not None and base is not None and symbols is not None:
             queryset = queryset.filter(
-                source_currency__symbol=base,
-                exchanged_currency__symbol__in=list(map(str.strip, symbols.split(','))),
+                source_currency_id=currency_registry.find_id(base),
+                exchanged_currency_id__in=currency_registry.get_ids(map(str.strip, symbols.split(','))).values(),
                 valuation_date__gte=start_date,
                 valuation_date__lte=end_date
             ).order_by('-valuation_date')
         return queryset
 
-    def list(self, request: Request) -> Response:
+    def list(self, request: Request) -> Union[Response, StreamingHttpResponse]:
         """
         Returns a list of exchange rates for the filtered queryset.
         
+        Currency symbols are resolved through the currency registry instead of
+        joining the Currency table twice. With ?stream=json or ?stream=ndjson the
+        rows are read and sent in chunks instead of being serialized at once.
+        
         Args:
             request: The HTTP request object
             
         Returns:
-            Response: JSON response containing the list of rates or error message
+            Union[Response, StreamingHttpResponse]: JSON response containing the list of rates or error message
         """
         try:
-            queryset = self.get_queryset()
-            data = queryset.values('source_currency__symbol', 'exchanged_currency__symbol', 'rate_value', 'valuation_date')
-            return Response(data)
+            stream_format = get_stream_format(request.query_params)
+            queryset = self.get_queryset().values_list('source_currency_id', 'exchanged_currency_id', 'rate_value', 'valuation_date')
+            if stream_format is not None:
+                queryset = queryset.iterator(chunk_size=settings.STREAM_CHUNK_SIZE)
+            data = (
+                {
+                    'source_currency__symbol': currency_registry.get_symbol(source_currency_id),
+                    'exchanged_currency__symbol': currency_registry.get_symbol(exchanged_currency_id),
+                    'rate_value': rate_value,
+                    'valuation_date': valuation_date,
+                }
+                for source_currency_id, exchanged_currency_id, rate_value, valuation_date in queryset
+            )
+            if stream_format is not None:
+                # an async iterator, so ASGI servers send each chunk as it is read instead of buffering the body
+                return StreamingHttpResponse(encode_rows(iter_chunks(data), stream_format), content_type=STREAM_CONTENT_TYPES[stream_format])
+            return Response(list(data))
         except ValueError as e:
             return Response({'error': str(e)}, status=400)
 
 
 @csrf_exempt
-def get_exchange_rate_data(request: HttpRequest) -> HttpResponse:
+async def get_exchange_rate_data(request: HttpRequest) -> HttpResponse:
     """
     View function to get exchange rate data for a specific currency pair and date.
     
@@ -172,7 +218,7 @@ def get_exchange_rate_data(request: HttpRequest) -> HttpResponse:
     if request.method != 'GET':
         return JsonResponse({'error': 'Invalid method'}, status=405)
     
-    generic_api = GenericAPI()
+    generic_api = get_generic_api()
 
     source_currency = request.GET.get('source_currency', None)
     exchanged_currency = request.GET.get('exchanged_currency', None)
@@ -185,15 +231,70 @@ def get_exchange_rate_data(request: HttpRequest) -> HttpResponse:
     if not source_currency or not exchanged_currency or not valuation_date:
         return JsonResponse({'error': 'Invalid parameters'}, status=400)
         
-    data = run_asyncio_task(generic_api.get_exchange_rate_data, source_currency, exchanged_currency, valuation_date)
+    data = await generic_api.get_exchange_rate_data(source_currency, exchanged_currency, valuation_date)
+
+    return JsonResponse(data, encoder=DecimalJSONEncoder)
+
+@csrf_exempt
+async def get_exchange_rate_data_bulk(request: HttpRequest) -> HttpResponse:
+    """
+    View function to get the exchange rates of many currency pairs and dates in one call.
+    
+    Args:
+        request: The HTTP request object whose JSON body holds a "triples" list of
+            {"source_currency", "exchanged_currency", "valuation_date"} objects
+        
+    Returns:
+        HttpResponse: JSON response containing the rate of each triple, in the order of the request, or error message
+        
+    Raises:
+        HTTP 405: If the request method is not POST
+        HTTP 400: If the body is not valid JSON, a triple is incomplete or has an invalid date,
+            or there are more than BULK_RATES_MAX_TRIPLES triples
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid method'}, status=405)
+
+    generic_api = get_generic_api()
+
+    try:
+        triples = json.loads(request.body).get('triples', None)
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    if not isinstance(triples, list) or not triples:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    if len(triples) > settings.BULK_RATES_MAX_TRIPLES:
+        return JsonResponse({'error': f'Too many triples. At most {settings.BULK_RATES_MAX_TRIPLES} are accepted.'}, status=400)
+
+    triples_list = []
+    for triple in triples:
+        if not isinstance(triple, dict):
+            return JsonResponse({'error': 'Invalid parameters'}, status=400)
+        source_currency = triple.get('source_currency', None)
+        exchanged_currency = triple.get('exchanged_currency', None)
+        valuation_date = triple.get('valuation_date', None)
+        if not all(isinstance(value, str) and value for value in (source_currency, exchanged_currency, valuation_date)):
+            return JsonResponse({'error': 'Invalid parameters'}, status=400)
+        try:
+            parsed_date = parse_date(valuation_date)
+        except ValueError:
+            parsed_date = None
+        if parsed_date is None:
+            return JsonResponse({'error': 'Invalid date format. It must be in YYYY-MM-DD format.'}, status=400)
+        triples_list.append((source_currency, exchanged_currency, parsed_date.isoformat()))
+
+    data = await generic_api.get_exchange_rate_data_bulk(triples_list)
 
-    return JsonResponse(data)
+    return JsonResponse({'results': data}, encoder=DecimalJSONEncoder)
 
 @csrf_exempt
-def get_currency_rates_list(request: HttpRequest) -> HttpResponse:
+async def get_currency_rates_list(request: HttpRequest) -> HttpResponse:
     """
     View function to get a list of exchange rates for multiple currencies over a date range.
     
+    With ?stream=json or ?stream=ndjson the stored rates are streamed one date at
+    a time while they are read. Missing rates are first fetched from the providers.
+    
     Args:
         request: The HTTP request object containing query parameters
         
@@ -203,7 +304,7 @@ def get_currency_rates_list(request: HttpRequest) -> HttpResponse:
     if request.method != 'GET':
         return JsonResponse({'error': 'Invalid method'}, status=405)
     
-    generic_api = GenericAPI()
+    generic_api = get_generic_api()
 
     start_date = request.GET.get('start_date', None)
     end_date = request.GET.get('end_date', None)
@@ -217,15 +318,30 @@ def get_currency_rates_list(request: HttpRequest) -> HttpResponse:
         return JsonResponse({'error': 'Invalid date format. It must be in YYYY-MM-DD format.'}, status=400)
     if not start_date or not end_date or not base or not symbols:
         return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    try:
+        stream_format = get_stream_format(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if stream_format is not None:
+        symbols_list = list(map(str.strip, symbols.split(',')))
+        if not await is_range_stored(start_date, end_date, base, symbols_list):
+            data = await generic_api.get_currency_rates_list(start_date, end_date, base, symbols)
+            if not data:
+                return JsonResponse(data, encoder=DecimalJSONEncoder)
+        return StreamingHttpResponse(
+            encode_time_series(iter_rates_series(start_date, end_date, base, symbols_list), stream_format),
+            content_type=STREAM_CONTENT_TYPES[stream_format]
+        )
 
-    data = run_asyncio_task(generic_api.get_currency_rates_list, start_date, end_date, base, symbols)
+    data = await generic_api.get_currency_rates_list(start_date, end_date, base, symbols)
 
-    return JsonResponse(data)
+    return JsonResponse(data, encoder=DecimalJSONEncoder)
 
 
 
 @csrf_exempt
-def get_convert_amount(request: HttpRequest) -> HttpResponse:
+async def get_convert_amount(request: HttpRequest) -> HttpResponse:
     """
     View function to convert an amount from one currency to another.
     
@@ -240,12 +356,12 @@ def get_convert_amount(request: HttpRequest) -> HttpResponse:
         
     Raises:
         HTTP 405: If the request method is not GET
-        HTTP 400: If any required parameters are missing
+        HTTP 400: If any required parameters are missing or the amount is not a positive number below AMOUNT_MAX
     """
     if request.method != 'GET':
         return JsonResponse({'error': 'Invalid method'}, status=405)
     
-    generic_api = GenericAPI()
+    generic_api = get_generic_api()
 
     currency_base = request.GET.get('currency_base', None)
     currency_to_convert = request.GET.get('currency_to_convert', None)
@@ -253,7 +369,73 @@ def get_convert_amount(request: HttpRequest) -> HttpResponse:
 
     if not currency_base or not currency_to_convert or not amount:
         return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    try:
+        amount = to_amount(amount)
+    except ValueError:
+        return JsonResponse({'error': f'Invalid amount. It must be a positive number below {AMOUNT_MAX}.'}, status=400)
+
+    try:
+        data = await generic_api.get_convert_amount(currency_base, currency_to_convert, amount)
+    except InvalidOperation:
+        return JsonResponse({'error': 'Invalid amount. The converted value is out of range.'}, status=400)
 
-    data = run_asyncio_task(generic_api.get_convert_amount, currency_base, currency_to_convert, amount)
+    return JsonResponse(data, encoder=DecimalJSONEncoder)
+
+@csrf_exempt
+async def get_convert_amount_batch(request: HttpRequest) -> HttpResponse:
+    """
+    View function to convert amounts from one currency into several currencies in one call.
+    
+    Args:
+        request: The HTTP request object containing query parameters:
+            - currency_base: The source currency code (e.g., USD)
+            - currencies_to_convert: Comma-separated target currency codes (e.g., EUR,GBP,JPY)
+            - amounts: Comma-separated amounts to convert (e.g., 10,250.5), or amount for a single one
+            
+    Returns:
+        HttpResponse: JSON response containing the rate and converted amounts of each target currency or error message
+        
+    Raises:
+        HTTP 405: If the request method is not GET
+        HTTP 400: If any required parameters are missing or an amount is not a positive number below AMOUNT_MAX
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Invalid method'}, status=405)
+
+    generic_api = get_generic_api()
+
+    currency_base = request.GET.get('currency_base', None)
+    currencies_to_convert = request.GET.get('currencies_to_convert', None)
+    amounts = request.GET.get('amounts', None) or request.GET.get('amount', None)
+
+    if not currency_base or not currencies_to_convert or not amounts:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    try:
+        amounts_list = [to_amount(amount) for amount in amounts.split(',')]
+    except ValueError:
+        return JsonResponse({'error': f'Invalid amount. Amounts must be positive numbers below {AMOUNT_MAX}.'}, status=400)
+    symbols_list = list(dict.fromkeys(filter(None, map(str.strip, currencies_to_convert.split(',')))))
+
+    try:
+        data = await generic_api.get_convert_amount_batch(currency_base, symbols_list, amounts_list)
+    except InvalidOperation:
+        return JsonResponse({'error': 'Invalid amount. The converted values are out of range.'}, status=400)
+
+    return JsonResponse(data, encoder=DecimalJSONEncoder)
+
+def get_metrics(request: HttpRequest) -> HttpResponse:
+    """
+    View function exposing internal counters used to size and monitor the service.
+    
+    Args:
+        request: The HTTP request object
+        
+    Returns:
+        HttpResponse: JSON response containing the rate cache counters, the providers' circuit breakers, the cross-rate engine
+            and the coalesced provider calls
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Invalid method'}, status=405)
 
-    return JsonResponse(data)
\ No newline at end of file
+    return JsonResponse({'rate_cache': rate_cache.stats(), 'circuit_breakers': circuit_breakers.stats(), 'cross_rates': cross_rates.stats(),
+                         'single_flight': single_flight.stats()})
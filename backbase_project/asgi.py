@@ -2,6 +2,9 @@
 ASGI config for backbase_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The public endpoints are async views, so serve this application with an ASGI
+server (e.g. ``uvicorn backbase_project.asgi:application``) to run them on a
+single event loop.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import worker_process_shutdown
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
 
@@ -10,6 +11,11 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
 
+@worker_process_shutdown.connect
+def close_http_sessions(**kwargs):
+    from backbase_app.external_services.http_session import session_manager
+    session_manager.close_all()
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from celery.schedules import crontab
 
@@ -77,12 +78,65 @@ WSGI_APPLICATION = 'backbase_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE=postgresql selects PostgreSQL (docker-compose "postgres" service),
+# otherwise the local SQLite file is used
+DATABASE_ENGINE: str = os.environ.get("DATABASE_ENGINE", "sqlite")
+
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("POSTGRES_DB", "mycurrency"),
+            'USER': os.environ.get("POSTGRES_USER", "mycurrency"),
+            'PASSWORD': os.environ.get("POSTGRES_PASSWORD", "mycurrency"),
+            'HOST': os.environ.get("POSTGRES_HOST", "localhost"),
+            'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+            # .iterator() reads use server-side cursors, disable them behind a transaction-mode PgBouncer
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get("POSTGRES_DISABLE_SERVER_SIDE_CURSORS", "") == "1",
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get("POSTGRES_POOL", "1") == "1":
+        # one psycopg connection pool per process (web process or Celery worker child)
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "2")),
+                'max_size': int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "10")),
+                'timeout': 10,
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get("POSTGRES_CONN_MAX_AGE", "600"))
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# SQLite performance profile for single-node installs, applied to every new SQLite
+# connection by backbase_app.sqlite. Set SQLITE_TUNING=0 to keep SQLite's defaults.
+SQLITE_TUNING: bool = os.environ.get("SQLITE_TUNING", "1") == "1"
+SQLITE_PRAGMAS: dict = {
+    'journal_mode': 'WAL',        # readers no longer wait for writers
+    'synchronous': 'NORMAL',      # fsync on checkpoints only, safe with WAL
+    'mmap_size': 256 * 2 ** 20,   # read pages through a 256MiB memory map
+    'cache_size': -64 * 2 ** 10,  # 64MiB page cache per connection (negative: KiB)
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
+
+if DATABASE_ENGINE != "postgresql" and SQLITE_TUNING:
+    DATABASES['default']['OPTIONS'] = {
+        # seconds a connection waits for the write lock before "database is locked"
+        'timeout': int(os.environ.get("SQLITE_TIMEOUT", "20")),
+        # take the write lock when the transaction starts, a deferred transaction that
+        # upgrades from read to write fails at once instead of waiting for the timeout
+        'transaction_mode': 'IMMEDIATE',
     }
-}
+
+# Time series of at least this many rows are written with COPY on PostgreSQL
+BULK_COPY_MIN_ROWS: int = 1000
 
 
 # Password validation
@@ -126,6 +180,22 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Provider failures, circuit breaker changes and bulk throughput are logged by the backbase_app loggers
+LOGGING: dict = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backbase_app': {
+            'handlers': ['console'],
+            'level': os.environ.get("BACKBASE_LOG_LEVEL", "INFO"),  # DEBUG also logs each provider attempt
+            'propagate': False,
+        },
+    },
+}
+
 REDIS_URL = "redis"
 
 CELERY_BROKER_URL = f'redis://{REDIS_URL}:6379/0'
@@ -159,9 +229,88 @@ REST_FRAMEWORK = {
 }
 
 
+# "repository" reads rates in-process, "http" goes through API_URL_INTERNAL (split deployments)
+INTERNAL_API_MODE: str = os.environ.get("INTERNAL_API_MODE", "repository")
+
 API_URL_INTERNAL: str = "http://127.0.0.1:8000/"
 API_VERSION_INTERNAL: str = "api/v1/"
 
+# API client of each provider, by ProviderExchange.id_name
+PROVIDER_CLIENTS: dict = {
+    "MC": "backbase_app.external_services.api_mock.MockAPI",
+    "CB": "backbase_app.external_services.api_currencybeacon.CurrencyBeaconAPI",
+}
+
+# Seconds the in-memory provider list is used before being reloaded
+PROVIDER_REGISTRY_TTL: float = 60
+
+# How providers are tried on a miss: "sequential", "hedged" (next provider after its
+# ProviderExchange.hedge_delay) or "all" (every provider at once)
+PROVIDER_FAILOVER_MODE: str = os.environ.get("PROVIDER_FAILOVER_MODE", "sequential")
+
+# Circuit breaker of each provider
+CIRCUIT_BREAKER_WINDOW: float = 60  # seconds of calls used for the error rate and latency
+CIRCUIT_BREAKER_MIN_CALLS: int = 5
+CIRCUIT_BREAKER_ERROR_RATE: float = 0.5  # error rate that opens the breaker
+CIRCUIT_BREAKER_OPEN_SECONDS: float = 30  # seconds before a half-open trial call
+CIRCUIT_BREAKER_SLOW_CALL: float = 2  # mean latency above which the health score decreases
+CIRCUIT_BREAKER_DEMOTE_SCORE: float = 0.5  # health score under which a provider is tried after healthy ones
+CIRCUIT_BREAKER_SHARED_ALIAS: str = os.environ.get("CIRCUIT_BREAKER_SHARED_ALIAS", "")  # CACHES alias, empty to disable
+
+# Unknown currency symbols reload the Currency table at most once per TTL (api/currency_registry.py)
+CURRENCY_REGISTRY_MISS_TTL: float = 10  # seconds a symbol missing after a reload is not looked up again
+
+# Read-through cache of exchange rates
+RATE_CACHE_MAX_ENTRIES: int = 10000
+RATE_CACHE_TTL_TODAY: float = 60
+RATE_CACHE_TTL_HISTORY: float = 60 * 60 * 24
+RATE_CACHE_SHARED_ALIAS: str = os.environ.get("RATE_CACHE_SHARED_ALIAS", "")  # name of a CACHES alias, empty to disable
+
+# Concurrent provider calls for the same rates are coalesced into one (api/single_flight.py)
+SINGLE_FLIGHT_SHARED_ALIAS: str = os.environ.get("SINGLE_FLIGHT_SHARED_ALIAS", "")  # CACHES alias holding the cross-process lock, empty to disable
+SINGLE_FLIGHT_LOCK_TIMEOUT: int = 30  # seconds the lock is kept when its holder dies
+SINGLE_FLIGHT_WAIT: float = 10  # seconds a process waits for another one's call before making its own
+SINGLE_FLIGHT_RESULT_TTL: int = 5  # seconds the result of a call is kept for the waiting processes
+SINGLE_FLIGHT_POLL_INTERVAL: float = 0.05
+
+# Time series requests fetch only missing rates from providers
+TIME_SERIES_GAP_MERGE_DAYS: int = 2  # complete days a provider call may span to cover two gaps at once
+
+# Rows read per query chunk by the streaming responses (?stream=json or ?stream=ndjson)
+STREAM_CHUNK_SIZE: int = 2000
+
+# Backfills (manage.py backfill_rates) are split into chunks fetched with one provider
+# time series call each, spread across the Celery workers
+BACKFILL_CHUNK_DAYS: int = 365  # dates per chunk, providers limit the range of a time series call
+BACKFILL_CHUNK_SYMBOLS: int = 50  # symbols per chunk
+
+# Cross rates derived from the rates of a single base currency
+CROSS_RATE_BASE: str = "USD"  # base currency stored by save_data_today
+CROSS_RATE_MAX_DATES: int = 64  # dates whose rate vector is kept in memory
+
+# Conversions and latest rate lookups read the newest stored rate of each pair (LatestRate)
+LATEST_RATE_MAX_AGE_DAYS: int = int(os.environ.get("LATEST_RATE_MAX_AGE_DAYS", 1))  # older rates are fetched from the providers, 0 for today only
+
+# Daily snapshot (tasks.save_data_today): latest rates of these bases, fetched concurrently.
+# Keep CROSS_RATE_BASE in the list, cross rates are derived from its rates
+DAILY_SNAPSHOT_BASES: list = [base for base in os.environ.get("DAILY_SNAPSHOT_BASES", CROSS_RATE_BASE).split(",") if base]
+DAILY_SNAPSHOT_CONCURRENCY: int = 4  # bases fetched at once
+DAILY_SNAPSHOT_SLOT_SECONDS: float = 300  # a longer run is reported as overrunning its cron slot
+DAILY_SNAPSHOT_MAX_RETRIES: int = 5  # retries fetching the symbols no provider could fill
+DAILY_SNAPSHOT_RETRY_BACKOFF: int = 60  # seconds before the first retry, doubled at each retry
+DAILY_SNAPSHOT_RETRY_BACKOFF_MAX: int = 3600
+
+# Bulk exchange rate lookups (POST /api/v1/exchange_rate_data/bulk/)
+BULK_RATES_MAX_TRIPLES: int = 10000  # (source, target, date) triples accepted per request
+BULK_RATES_CONCURRENCY: int = 8  # provider calls made at once for the missing rates
+
+# Pooled HTTP client sessions shared by the provider and internal API clients
+HTTP_CLIENT_LIMIT: int = 100
+HTTP_CLIENT_LIMIT_PER_HOST: int = 10
+HTTP_CLIENT_KEEPALIVE_TIMEOUT: float = 30
+HTTP_CLIENT_DNS_CACHE_TTL: int = 300
+HTTP_CLIENT_TIMEOUT: float = 30
+
 API_KEY_CURRENCYBE: str = "mE41rNwTjgGW9xfz1mBY9JSQCSP3BqKF"
 API_URL_CURRENCYBE: str = "https://api.currencybeacon.com/"
 API_VERSION_CURRENCYBE: str = "v1/"
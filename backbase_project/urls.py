@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 urlpatterns = [
@@ -7,6 +8,9 @@ urlpatterns = [
 
 ]
 
+# uvicorn does not serve static files like runserver, the admin assets are served by Django when DEBUG is on
+urlpatterns += staticfiles_urlpatterns()
+
 admin.site.site_header = "My Currency"
 admin.site.site_title = "Administration My Currency"
 admin.site.index_title = "Welcome to Administrator My Currency"
@@ -0,0 +1,69 @@
+"""
+Throughput, in triples per second, of resolving many (source, target, date)
+exchange rates: one get_exchange_rate_data call per triple against a single
+get_exchange_rate_data_bulk call. The rate cache and the cross rates are
+cleared before each run so both paths read the database.
+
+Usage:
+    python benchmarks/bench_bulk_rates.py [triples] [symbols] [days]
+"""
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from common import create_benchmark_db, seed_rates
+
+from backbase_app.api.cross_rates import cross_rates
+from backbase_app.api.generic_api import GenericAPI
+from backbase_app.api.rate_cache import rate_cache
+
+START = date(2024, 1, 1)
+
+
+def make_triples(count: int, symbols: List[str], days: int) -> List[Tuple[str, str, str]]:
+    """
+    Build random triples of stored (USD based) and cross-derived (EUR based) rates.
+
+    Args:
+        count: Number of triples
+        symbols: Stored target currency codes
+        days: Number of stored dates from START
+
+    Returns:
+        List[Tuple[str, str, str]]: (source currency, target currency, date) of each rate
+    """
+    return [
+        (random.choice(["USD", "EUR"]), random.choice(symbols[1:]), (START + timedelta(days=random.randrange(days))).isoformat())
+        for _ in range(count)
+    ]
+
+
+def main(count: int, symbols_count: int, days: int) -> None:
+    create_benchmark_db()
+    symbols = ["EUR"] + [f"{index:03d}" for index in range(symbols_count - 1)]
+    seed_rates("USD", symbols, START, days)
+    triples = make_triples(count, symbols, days)
+    generic_api = GenericAPI()
+    loop = asyncio.new_event_loop()
+
+    async def one_by_one() -> None:
+        for triple in triples:
+            await generic_api.get_exchange_rate_data(*triple)
+
+    for name, run in (("one call per triple", one_by_one), ("bulk lookup", lambda: generic_api.get_exchange_rate_data_bulk(triples))):
+        rate_cache.clear()
+        cross_rates.clear()
+        started = time.perf_counter()
+        loop.run_until_complete(run())
+        elapsed = time.perf_counter() - started
+        print(f"{name:<24} {count:6d} triples {elapsed * 1000:9.2f}ms {count / elapsed:10.0f} triples/s")
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    import sys
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*(arguments + [5000, 20, 250][len(arguments):]))
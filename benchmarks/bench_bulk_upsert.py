@@ -0,0 +1,45 @@
+"""
+Queries and time needed to store one provider response: one save_data_rate
+call per symbol against a single save_data_rates bulk upsert.
+
+Usage:
+    python benchmarks/bench_bulk_upsert.py [symbols]
+"""
+import random
+import time
+
+from common import create_benchmark_db
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from backbase_app.api.providers_api import save_data_rate, save_data_rates
+from backbase_app.models import Currency
+
+
+def main(symbols_count: int) -> None:
+    create_benchmark_db()
+    symbols = [f"{index:03d}" for index in range(symbols_count)]
+    for symbol in ["USD"] + symbols:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+
+    # the second round writes the same dates again, so every row is updated
+    for label in ("insert", "update"):
+        rates = {symbol: round(random.uniform(0.1, 2), 6) for symbol in symbols}
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for symbol, rate_value in rates.items():
+                save_data_rate.func("USD", symbol, rate_value, "2025-01-01")
+            elapsed = time.perf_counter() - started
+        print(f"per-symbol save_data_rate ({label}, {symbols_count} symbols): {len(queries):5d} queries {elapsed * 1000:8.2f}ms")
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            save_data_rates.func("USD", rates, "2025-01-02")
+            elapsed = time.perf_counter() - started
+        print(f"bulk save_data_rates    ({label}, {symbols_count} symbols): {len(queries):5d} queries {elapsed * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 150)
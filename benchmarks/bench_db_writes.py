@@ -0,0 +1,103 @@
+"""
+Write throughput of save_data_time_series on the configured database, alone
+and with several threads writing at once like Celery workers do. On PostgreSQL
+the bulk_create and COPY paths are both measured.
+
+Usage:
+    python benchmarks/bench_db_writes.py [writers] [days] [symbols]
+    DATABASE_ENGINE=postgresql python benchmarks/bench_db_writes.py
+"""
+import random
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from common import create_benchmark_db
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from backbase_app.api.providers_api import save_data_time_series
+from backbase_app.models import Currency
+
+START = date(2000, 1, 1)
+
+
+def make_series(first_day: int, days: int, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Build a random time series.
+
+    Args:
+        first_day: Offset of the first date from START
+        days: Number of dates
+        symbols: Target currency codes
+
+    Returns:
+        Dict[str, Dict[str, float]]: Rates for each date and symbol
+    """
+    return {
+        (START + timedelta(days=first_day + day)).isoformat(): {symbol: round(random.uniform(0.1, 2), 6) for symbol in symbols}
+        for day in range(days)
+    }
+
+
+def run_writers(writers: int, days: int, symbols: List[str], first_day: int) -> None:
+    """
+    Store one time series per writer thread at once and print the throughput.
+
+    Args:
+        writers: Number of threads writing at once
+        days: Number of dates written by each thread
+        symbols: Target currency codes
+        first_day: Offset of the first date from START
+    """
+    series = [make_series(first_day + writer * days, days, symbols) for writer in range(writers)]
+    errors: List[Exception] = []
+
+    def write(data: Dict[str, Dict[str, float]]) -> None:
+        try:
+            save_data_time_series.func(data, "USD")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write, args=(data,)) for data in series]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    rows = (writers - len(errors)) * days * len(symbols)
+    path = "COPY" if connection.vendor == "postgresql" and days * len(symbols) >= settings.BULK_COPY_MIN_ROWS else "bulk_create"
+    label = f"{connection.vendor} {path}, {writers} writer(s)"
+    print(f"{label:<40} {rows:7d} rows {elapsed * 1000:9.2f}ms {rows / elapsed:10.0f} rows/s  failed writers={len(errors)}")
+    if errors:
+        print(f"    {type(errors[0]).__name__}: {errors[0]}")
+
+
+def main(writers: int, days: int, symbols_count: int) -> None:
+    create_benchmark_db(on_disk=True)
+    symbols = [f"{index:03d}" for index in range(symbols_count)]
+    for symbol in ["USD"] + symbols:
+        Currency.objects.create(code=symbol, name=symbol, symbol=symbol)
+
+    rounds = [settings.BULK_COPY_MIN_ROWS]
+    if connection.vendor == "postgresql":
+        # also measure bulk_create on PostgreSQL
+        rounds.insert(0, 10 ** 9)
+    first_day = 0
+    for copy_min_rows in rounds:
+        with override_settings(BULK_COPY_MIN_ROWS=copy_min_rows):
+            for writer_count in (1, writers):
+                run_writers(writer_count, days, symbols, first_day)
+                first_day += writer_count * days
+
+
+if __name__ == "__main__":
+    import sys
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*(arguments + [10, 365, 50][len(arguments):]))
@@ -0,0 +1,88 @@
+"""
+Latency of the conversion hot path, from a stored rate to the JSON body: the
+former float path (float(rate) * float(amount), DjangoJSONEncoder) against the
+Decimal path (rate * amount quantized to 6 places, DecimalJSONEncoder), for a
+single conversion and for a batch conversion.
+
+Usage:
+    python benchmarks/bench_decimal_convert.py [symbols] [amounts] [iterations]
+"""
+import random
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from common import latency_stats, report, timed
+
+from django.http import JsonResponse
+
+from backbase_app.api.decimals import DecimalJSONEncoder, quantize_rate, to_decimal
+
+
+def make_rates(count: int) -> Dict[str, Decimal]:
+    """
+    Build random rates as read from the database.
+
+    Args:
+        count: Number of target currencies
+
+    Returns:
+        Dict[str, Decimal]: The rate of each target currency, with 6 decimal places
+    """
+    return {f"{index:03d}": Decimal(str(round(random.uniform(0.1, 2), 6))).quantize(Decimal("0.000001")) for index in range(count)}
+
+
+def float_batch(rates: Dict[str, Decimal], amounts: List[str]) -> Callable[[], Any]:
+    """
+    Build the former batch conversion path, converting each stored rate to float once.
+
+    Args:
+        rates: The stored rate of each target currency
+        amounts: The amounts, as received in the query string
+
+    Returns:
+        Callable[[], Any]: Builds the JSON response of the batch
+    """
+    values = [float(amount) for amount in amounts]
+    return lambda: JsonResponse({"amounts": values, "conversions": {
+        symbol: {"rate": rate, "values": [rate * value for value in values]}
+        for symbol, rate in ((symbol, float(rate)) for symbol, rate in rates.items())
+    }})
+
+
+def decimal_batch(rates: Dict[str, Decimal], amounts: List[str]) -> Callable[[], Any]:
+    """
+    Build the Decimal batch conversion path.
+
+    Args:
+        rates: The stored rate of each target currency
+        amounts: The amounts, as received in the query string
+
+    Returns:
+        Callable[[], Any]: Builds the JSON response of the batch
+    """
+    values = [to_decimal(amount) for amount in amounts]
+    return lambda: JsonResponse({"amounts": values, "conversions": {
+        symbol: {"rate": rate, "values": [quantize_rate(rate * value) for value in values]} for symbol, rate in rates.items()
+    }}, encoder=DecimalJSONEncoder)
+
+
+def main(symbols_count: int, amounts_count: int, iterations: int) -> None:
+    rates = make_rates(symbols_count)
+    amounts = [f"{random.uniform(1, 10000):.2f}" for _ in range(amounts_count)]
+    rate, amount = next(iter(rates.values())), amounts[0]
+
+    paths = {
+        "single conversion, float": lambda: JsonResponse({"amount": amount, "value": float(rate) * float(amount)}),
+        "single conversion, Decimal": lambda: JsonResponse({"amount": to_decimal(amount), "value": quantize_rate(rate * to_decimal(amount))}, encoder=DecimalJSONEncoder),
+        f"batch {symbols_count}x{amounts_count}, float": float_batch(rates, amounts),
+        f"batch {symbols_count}x{amounts_count}, Decimal": decimal_batch(rates, amounts),
+    }
+    for title, path in paths.items():
+        timed(path, iterations // 10)
+        report(title, latency_stats(timed(path, iterations)))
+
+
+if __name__ == "__main__":
+    import sys
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*(arguments + [20, 5, 20000][len(arguments):]))
@@ -0,0 +1,72 @@
+"""
+Connection reuse of the pooled session manager against a local aiohttp stub
+server: a new ClientSession per call (the old provider clients) against the
+shared session from session_manager.
+
+The stub counts the TCP connections it accepts, so the difference is the
+number of handshakes (and DNS lookups of "localhost") saved.
+
+Usage:
+    python benchmarks/bench_http_session.py [iterations]
+"""
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from common import latency_stats, report
+
+from backbase_app.external_services.http_session import session_manager
+
+
+async def start_stub_server():
+    connections = set()
+
+    async def latest(request: web.Request) -> web.Response:
+        connections.add(request.transport)
+        return web.json_response({"response": {"base": "USD", "rates": {"EUR": 0.85}}})
+
+    app = web.Application()
+    app.router.add_get('/v1/latest', latest)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://localhost:{port}/v1/latest", connections
+
+
+async def measure(call, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def main(iterations: int) -> None:
+    runner, url, connections = await start_stub_server()
+
+    async def new_session_per_call():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                await response.json()
+
+    async def pooled_session():
+        async with session_manager.get_session().get(url) as response:
+            await response.json()
+
+    for name, call in (("new session per call", new_session_per_call), ("pooled session", pooled_session)):
+        connections.clear()
+        samples = await measure(call, iterations)
+        report(f"{name} ({len(connections)} connections)", latency_stats(samples))
+
+    await session_manager.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    import sys
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
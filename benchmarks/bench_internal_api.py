@@ -0,0 +1,54 @@
+"""
+Latency of GenericAPI's internal lookups: HTTP loopback (InternalAPI) against
+the in-process repository engine (RepositoryAPI).
+
+The HTTP mode is served by the project's WSGI application on a local port, so
+it pays the same round-trip and DRF dispatch as the loopback in production.
+
+Usage:
+    python benchmarks/bench_internal_api.py [iterations]
+"""
+import asyncio
+import threading
+from datetime import date
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+from common import create_benchmark_db, seed_rates, latency_stats, timed, report
+
+from django.core.wsgi import get_wsgi_application
+from backbase_app.api.internal_api import InternalAPI
+from backbase_app.api.repository_api import RepositoryAPI
+
+SYMBOLS = ["EUR", "GBP", "CHF", "JPY", "CAD"]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def main(iterations: int = 300) -> None:
+    create_benchmark_db()
+    seed_rates("USD", SYMBOLS, date(2025, 1, 1), 90)
+
+    server = make_server('127.0.0.1', 0, get_wsgi_application(), handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    http_api = InternalAPI()
+    http_api.base_url = f"http://127.0.0.1:{server.server_port}/api/v1/"
+    repository_api = RepositoryAPI()
+    loop = asyncio.new_event_loop()
+
+    for name, api in (("http loopback", http_api), ("in-process repository", repository_api)):
+        rate = timed(lambda: loop.run_until_complete(api.get_exchange_rate_data("USD", "EUR", "2025-02-01")), iterations)
+        report(f"{name} / exchange_rate_data", latency_stats(rate))
+        rates_list = timed(lambda: loop.run_until_complete(api.get_currency_rates_list("2025-01-01", "2025-03-31", "USD", ", ".join(SYMBOLS))), iterations // 10)
+        report(f"{name} / currency_rates_list", latency_stats(rates_list))
+
+    server.shutdown()
+    loop.close()
+
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,144 @@
+"""
+Concurrent read/write throughput on a SQLite file: reader processes loading a
+week of rates like web workers while writer processes store the rates of a new
+date like save_data_today on Celery workers, with SQLite's default rollback
+journal against the SQLITE_PRAGMAS profile (WAL, synchronous=NORMAL, mmap,
+page cache, busy timeout and immediate transactions).
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py [readers] [writers] [seconds]
+"""
+import multiprocessing
+import random
+import time
+from datetime import date, timedelta
+from typing import List
+
+from common import create_benchmark_db, latency_stats, seed_rates
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from backbase_app.api.providers_api import save_data_rates
+from backbase_app.api.repository_api import get_rates_series
+
+START = date(2000, 1, 1)
+SEEDED_DAYS = 365
+SYMBOLS = [f"{index:03d}" for index in range(50)]
+READ_DAYS = 7
+
+# (pragmas, connection OPTIONS) of each measured profile
+PROFILES = {
+    "rollback journal": ({}, {}),
+    "tuned (WAL)": (settings.SQLITE_PRAGMAS, settings.DATABASES['default'].get('OPTIONS', {})),
+}
+
+
+def read(deadline: float, results: multiprocessing.Queue) -> None:
+    """
+    Load random stored ranges until the deadline.
+
+    Args:
+        deadline: perf_counter value at which to stop
+        results: Receives the duration of each read in seconds and the errors
+    """
+    samples: List[float] = []
+    errors: List[str] = []
+    try:
+        while time.perf_counter() < deadline:
+            start_date = START + timedelta(days=random.randrange(SEEDED_DAYS - READ_DAYS))
+            end_date = start_date + timedelta(days=READ_DAYS - 1)
+            started = time.perf_counter()
+            try:
+                get_rates_series.func(start_date.isoformat(), end_date.isoformat(), "USD", SYMBOLS)
+                samples.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        connection.close()
+        results.put(("read", samples, errors))
+
+
+def write(deadline: float, first_day: int, results: multiprocessing.Queue) -> None:
+    """
+    Store the rates of one new date at a time, like save_data_today, until the deadline.
+
+    Args:
+        deadline: perf_counter value at which to stop
+        first_day: Offset of the first written date from START
+        results: Receives the number of rows of each successful write and the errors
+    """
+    rows: List[int] = []
+    errors: List[str] = []
+    try:
+        while time.perf_counter() < deadline:
+            rates = {symbol: round(random.uniform(0.1, 2), 6) for symbol in SYMBOLS}
+            saved = save_data_rates.func("USD", rates, START + timedelta(days=first_day))
+            first_day += 1
+            # save_data_rates prints its errors and returns no rate for the symbols it could not save
+            if all(rate_value is None for rate_value in saved.values()):
+                errors.append("save_data_rates failed")
+            else:
+                rows.append(len(rates))
+    finally:
+        connection.close()
+        results.put(("write", rows, errors))
+
+
+def run_profile(name: str, readers: int, writers: int, seconds: float) -> None:
+    """
+    Run readers and writers at once on a fresh database file and print their throughput.
+
+    Args:
+        name: Key of the profile in PROFILES
+        readers: Number of reading processes
+        writers: Number of writing processes
+        seconds: Duration of the run
+    """
+    pragmas, options = PROFILES[name]
+    connection.close()
+    connection.settings_dict['OPTIONS'] = dict(options)
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        create_benchmark_db(on_disk=True)
+        seed_rates("USD", SYMBOLS, START, SEEDED_DAYS)
+        connection.close()
+
+        # forked processes inherit the test database settings and open their own connection
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        deadline = time.perf_counter() + seconds
+        processes = [context.Process(target=read, args=(deadline, results)) for _ in range(readers)]
+        processes += [
+            context.Process(target=write, args=(deadline, SEEDED_DAYS + writer * 100000, results))
+            for writer in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    read_samples = [sample for kind, values, _ in collected if kind == "read" for sample in values]
+    written_rows = [rows for kind, values, _ in collected if kind == "write" for rows in values]
+    read_errors = [error for kind, _, errors in collected if kind == "read" for error in errors]
+    write_errors = [error for kind, _, errors in collected if kind == "write" for error in errors]
+    stats = latency_stats(read_samples) if read_samples else {"p50": 0.0, "p99": 0.0}
+    print(
+        f"{name:<18} reads={len(read_samples) / seconds:8.1f}/s  read p50={stats['p50']:8.2f}ms  p99={stats['p99']:9.2f}ms  "
+        f"writes={sum(written_rows) / seconds:9.0f} rows/s  failed reads={len(read_errors)}  failed writes={len(write_errors)}"
+    )
+    for error in (read_errors + write_errors)[:1]:
+        print(f"    {error}")
+
+
+def main(readers: int, writers: int, seconds: float) -> None:
+    if connection.vendor != "sqlite":
+        raise SystemExit("This benchmark measures SQLite, unset DATABASE_ENGINE")
+    for name in PROFILES:
+        run_profile(name, readers, writers, seconds)
+
+
+if __name__ == "__main__":
+    import sys
+    arguments = [int(argument) for argument in sys.argv[1:]]
+    main(*(arguments + [4, 2, 10][len(arguments):]))
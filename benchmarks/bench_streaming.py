@@ -0,0 +1,58 @@
+"""
+Peak memory and time to first byte of the rate list endpoint for a multi-year
+range: the buffered DRF response against ?stream=json and ?stream=ndjson.
+
+Usage:
+    python benchmarks/bench_streaming.py [years] [symbols]
+"""
+import time
+import tracemalloc
+from datetime import date
+
+from common import create_benchmark_db, seed_rates
+
+from django.test import Client
+
+START = date(2020, 1, 1)
+
+
+def measure(params: dict) -> None:
+    """
+    Request the rate list endpoint and print its peak memory and time to first byte.
+
+    Args:
+        params: Query parameters of the request
+    """
+    client = Client(HTTP_HOST='localhost')
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get('/api/v1/currency_rates_list_api/', params)
+    if response.streaming:
+        content = iter(response.streaming_content)
+        size = len(next(content))
+        first_byte = time.perf_counter() - started
+        size += sum(len(chunk) for chunk in content)
+    else:
+        first_byte = time.perf_counter() - started
+        size = len(response.content)
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    label = params.get('stream', 'buffered')
+    print(f"{label:<10} peak={peak / 2 ** 20:8.2f}MiB  first byte={first_byte * 1000:9.2f}ms  total={total * 1000:9.2f}ms  body={size / 2 ** 20:6.2f}MiB")
+
+
+def main(years: int, symbols_count: int) -> None:
+    create_benchmark_db()
+    symbols = [f"{index:03d}" for index in range(symbols_count)]
+    end = date(START.year + years, 1, 1)
+    seed_rates("USD", symbols, START, (end - START).days)
+
+    params = {'start_date': START.isoformat(), 'end_date': end.isoformat(), 'base': 'USD', 'symbols': ','.join(symbols)}
+    for stream_format in (None, 'json', 'ndjson'):
+        measure({**params, 'stream': stream_format} if stream_format else params)
+
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3, int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,61 @@
+"""
+Time needed to group a multi-year time series by date: the former nested loop
+over dates and rows against the single-pass assemble_time_series, in memory
+and end to end through the repository with 50 symbols.
+
+Usage:
+    python benchmarks/bench_time_series.py [symbols]
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from common import create_benchmark_db, latency_stats, report, seed_rates, timed
+
+from backbase_app.api.repository_api import get_rates_series
+from backbase_app.api.time_series import assemble_time_series, iter_dates
+
+START = date(2020, 1, 1)
+YEARS = (1, 2, 5)
+LEGACY_MAX_YEARS = 2
+
+
+def nested_loop(data: List[Dict[str, Any]], start_date: str, end_date: str) -> Dict[str, Dict[str, float]]:
+    """
+    Group rows the way InternalAPI.get_currency_rates_list used to: every date scans every row.
+    """
+    data_return: Dict[str, Dict[str, float]] = {}
+    for current_date in iter_dates(start_date, end_date):
+        data_return[current_date] = {}
+        for rate in data:
+            if rate["valuation_date"] == current_date:
+                data_return[current_date][rate["exchanged_currency__symbol"]] = rate["rate_value"]
+    return data_return
+
+
+def main(symbols_count: int) -> None:
+    create_benchmark_db()
+    symbols = [f"{index:03d}" for index in range(symbols_count)]
+    days = (date(START.year + max(YEARS), 1, 1) - START).days
+    seed_rates("USD", symbols, START, days)
+
+    for years in YEARS:
+        start_date = START.isoformat()
+        end_date = (date(START.year + years, 1, 1) - timedelta(days=1)).isoformat()
+        data = [
+            {"valuation_date": current_date, "exchanged_currency__symbol": symbol, "rate_value": 1.0}
+            for current_date in iter_dates(start_date, end_date)
+            for symbol in symbols
+        ]
+        rows = [(rate["valuation_date"], rate["exchanged_currency__symbol"], rate["rate_value"]) for rate in data]
+        label = f"{years}y, {len(rows)} rows"
+
+        # the nested loop is quadratic, larger ranges would take minutes
+        if years <= LEGACY_MAX_YEARS:
+            report(f"nested loop ({label})", latency_stats(timed(lambda: nested_loop(data, start_date, end_date), 1)))
+        report(f"assembler ({label})", latency_stats(timed(lambda: dict(assemble_time_series(rows, start_date, end_date)), 5)))
+        report(f"repository ({label})", latency_stats(timed(lambda: get_rates_series.func(start_date, end_date, "USD", symbols), 5)))
+
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
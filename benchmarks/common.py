@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backbase_project.settings')
+
+import django
+django.setup()
+
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from django.db import connection
+
+
+def create_benchmark_db(on_disk: bool = False) -> None:
+    """
+    Create a throwaway test database so benchmarks never touch db.sqlite3.
+
+    Args:
+        on_disk: Use a temporary SQLite file instead of a shared in-memory
+            database, whose table locks do not behave like the file's
+    """
+    if on_disk and connection.vendor == "sqlite":
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+
+
+def seed_rates(base: str, symbols: List[str], start: date, days: int) -> None:
+    """
+    Store random rates of a base currency for every symbol and day.
+
+    Args:
+        base: The base currency code
+        symbols: List of target currency codes
+        start: First valuation date
+        days: Number of consecutive days to store
+    """
+    from backbase_app.models import Currency, CurrencyExchangeRate
+
+    currencies: Dict[str, Currency] = {}
+    for symbol in [base] + symbols:
+        currencies[symbol], _ = Currency.objects.get_or_create(code=symbol, defaults={'name': symbol, 'symbol': symbol})
+    rows = [
+        CurrencyExchangeRate(
+            source_currency=currencies[base],
+            exchanged_currency=currencies[symbol],
+            valuation_date=start + timedelta(days=day),
+            rate_value=Decimal(str(round(random.uniform(0.1, 2), 6)))
+        )
+        for day in range(days)
+        for symbol in symbols
+    ]
+    CurrencyExchangeRate.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarise latency samples in milliseconds.
+
+    Args:
+        samples: Durations in seconds
+
+    Returns:
+        Dict[str, float]: p50, p99 and mean latency in milliseconds
+    """
+    ordered = sorted(samples)
+    p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p99": ordered[p99_index] * 1000,
+        "mean": statistics.fmean(ordered) * 1000,
+    }
+
+
+def timed(func: Callable[[], Any], iterations: int) -> List[float]:
+    """
+    Run a function several times and collect the duration of each call.
+
+    Args:
+        func: The function to call
+        iterations: Number of calls
+
+    Returns:
+        List[float]: Duration of each call in seconds
+    """
+    samples: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(title: str, stats: Dict[str, float]) -> None:
+    """
+    Print one benchmark result line.
+
+    Args:
+        title: Name of the measured path
+        stats: Latency stats as returned by latency_stats
+    """
+    print(f"{title:<48} p50={stats['p50']:8.3f}ms  p99={stats['p99']:8.3f}ms  mean={stats['mean']:8.3f}ms")